@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, CompanyProfile, Job, JobApplication, Message
+from .models import User, CompanyProfile, Job, JobApplication, Message, MessageThread, Skill, SkillAlias
+from .search import fts_available, search_job_ids
 
 
 @admin.register(User)
@@ -37,7 +38,13 @@ class JobAdmin(admin.ModelAdmin):
     list_display = ('title', 'company', 'location', 'employment_type', 'posted_at', 'salary_type')
     list_filter = ('employment_type', 'experience_level', 'salary_type', 'is_remote', 'company')
     search_fields = ('title', 'description', 'company__company_name', 'location')
-    ordering = ('-posted_at',) 
+    ordering = ('-posted_at',)
+
+    def get_search_results(self, request, queryset, search_term):
+        # Use the FTS index instead of LIKE scans over every text column
+        if search_term and fts_available():
+            return queryset.filter(id__in=search_job_ids(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
 
 
 @admin.register(JobApplication)
@@ -52,4 +59,24 @@ class JobApplicationAdmin(admin.ModelAdmin):
 class MessageAdmin(admin.ModelAdmin):
     list_display = ('application', 'sender', 'text', 'timestamp', 'is_read')
     list_filter = ('is_read', 'timestamp', 'sender')
-    search_fields = ('text', 'sender__email', 'application__id') 
\ No newline at end of file
+    search_fields = ('text', 'sender__email', 'application__id')
+
+
+@admin.register(MessageThread)
+class MessageThreadAdmin(admin.ModelAdmin):
+    list_display = ('application', 'participant', 'other_user', 'last_message_time', 'unread_count')
+    search_fields = ('participant__email', 'other_user__email', 'application__id')
+    ordering = ('-activity_at',)
+
+
+class SkillAliasInline(admin.TabularInline):
+    model = SkillAlias
+    extra = 1
+
+
+@admin.register(Skill)
+class SkillAdmin(admin.ModelAdmin):
+    list_display = ('name',)
+    search_fields = ('name', 'aliases__name')
+    ordering = ('name',)
+    inlines = [SkillAliasInline]
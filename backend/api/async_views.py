@@ -0,0 +1,118 @@
+"""
+Async versions of the endpoints every open dashboard polls.
+
+``unread_message_count``, ``message_threads`` and ``application_messages`` are hit
+every few seconds per browser tab, and ``application_messages?wait=`` long-polls.
+Under ASGI these coroutines await the database and long-poll wake-ups without
+holding a worker thread for the length of the request. They authenticate with
+AsyncJWTAuthentication and return the same JSON as the DRF views of the same name
+in api/views.py, which still serve every other method (POST, OPTIONS) of these URLs.
+"""
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+from . import views
+from .authentication import AsyncJWTAuthentication, user_company_id
+from .models import JobApplication, MessageThread
+from .pagination import InvalidCursor, akeyset_page
+from .projections import MESSAGE_COLUMNS, message_record
+from .renderers import ORJSONRenderer
+from .threads import aunread_count, await_messages, long_poll_seconds, thread_summary
+from .versions import aconditional
+
+
+def _render(data, status=status.HTTP_200_OK, headers=None):
+    # The DRF views' renderer, so both produce the same bytes
+    return HttpResponse(ORJSONRenderer().render(data), status=status, content_type='application/json', headers=headers)
+
+
+def async_reads(fallback):
+    """Serve GET and HEAD with the decorated coroutine and other methods with the DRF view ``fallback``.
+
+    The coroutine runs only for authenticated users, with ``request.user`` set.
+    """
+    fallback = sync_to_async(fallback)
+
+    def decorator(view):
+        @csrf_exempt
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await fallback(request, *args, **kwargs)
+            authenticator = AsyncJWTAuthentication()
+            try:
+                request.user = await authenticator.aauthenticate(request)
+            except APIException as exc:
+                data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+                return _render(
+                    data, status=status.HTTP_401_UNAUTHORIZED,
+                    headers={'WWW-Authenticate': authenticator.authenticate_header(request)},
+                )
+            return await view(request, *args, **kwargs)
+        return wrapped
+    return decorator
+
+
+@async_reads(views.unread_message_count)
+async def unread_message_count(request):
+    return _render({'unread_count': await aunread_count(request.user)})
+
+
+@async_reads(views.message_threads)
+async def message_threads(request):
+    """List the current user's conversation threads, most recent activity first (cursor-paginated)"""
+    threads = (
+        MessageThread.objects.filter(participant=request.user)
+        .select_related('application__job', 'other_user')
+    )
+    try:
+        page, next_cursor = await akeyset_page(threads, request.GET, 'activity_at', default_page_size=50)
+    except InvalidCursor as exc:
+        return _render({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    return _render({'results': [thread_summary(thread) for thread in page], 'next_cursor': next_cursor})
+
+
+async def _application_messages_versions(request, application_id):
+    # Long polls wait for new data rather than answering 304 straight away
+    if 'wait' in request.GET:
+        return None
+    # Only participants get validators; anyone else falls through to the view's 403/404
+    other_user_id = await (
+        MessageThread.objects.filter(application_id=application_id, participant=request.user)
+        .values_list('other_user_id', flat=True).afirst()
+    )
+    if other_user_id is None:
+        return None
+    # Senders' details are embedded
+    return [f'messages:{application_id}', f'user:{request.user.pk}', f'user:{other_user_id}']
+
+
+@async_reads(views.application_messages)
+@aconditional(_application_messages_versions)
+async def application_messages(request, application_id):
+    """List messages for a job application (company or applicant only); POST goes to the DRF view"""
+    try:
+        application = await JobApplication.objects.select_related('job').aget(id=application_id)
+    except JobApplication.DoesNotExist:
+        return _render({'detail': 'No JobApplication matches the given query.'}, status=status.HTTP_404_NOT_FOUND)
+    user = request.user
+    if user.pk != application.applicant_id and application.job.company_id != user_company_id(user):
+        return _render({'detail': 'Not authorized.'}, status=status.HTTP_403_FORBIDDEN)
+    # ?after_id= returns only newer messages; adding ?wait=<seconds> long-polls for them
+    messages = application.messages.values_list(*MESSAGE_COLUMNS)
+    try:
+        after_id = request.GET.get('after_id')
+        after_id = int(after_id) if after_id is not None else None
+        wait = long_poll_seconds(request.GET.get('wait', 0))
+    except ValueError:
+        return _render({'detail': 'after_id must be an integer and wait a number.'}, status=status.HTTP_400_BAD_REQUEST)
+    if after_id is not None:
+        messages = messages.filter(id__gt=after_id).order_by('id')
+        if wait:
+            return _render([message_record(row) for row in await await_messages(messages, application.id, wait)])
+    return _render([message_record(row) async for row in messages])
@@ -0,0 +1,149 @@
+"""
+JWT tokens and authentication.
+
+Tokens from ``UserRefreshToken.for_user`` carry the user's ``role`` (``company`` or
+``seeker``) and ``company_profile_id`` as claims, so clients can route without
+fetching the profile first. The claims are a snapshot from when the token was
+issued; the server does not authorize from them.
+
+``CachedJWTAuthentication`` resolves the token's user through the cache instead of
+a query per request. The cached user is loaded with its company profile, so
+``user_company_id(user)`` and ``hasattr(user, 'company_profile')`` need no query
+either. Each entry is stored with the user's ``auth:<id>`` version stamp
+(api/versions.py), read before the user was loaded, and is used only while that
+stamp is current. Saving or deleting the user or their company profile bumps the
+stamp once the transaction commits (api/signals.py), so a deactivated user or a
+changed password is seen on the next request. That includes an entry that another
+request loaded just before the change and stored just after it. Like every stamp,
+it reaches other processes only through a shared cache backend (see CACHES).
+Entries live at most ``AUTH_USER_CACHE_SECONDS``.
+
+``QueryTokenJWTAuthentication`` also takes the access token from ``?token=``, for
+plain links such as a resume download, which cannot set an Authorization header.
+
+``AsyncJWTAuthentication`` is the same for the async views, with the blocking steps
+done through the async cache and ORM. Header parsing and token validation are pure
+computation and are reused as they are, as are the error types, so failures render
+exactly as they do from the DRF views.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed, NotAuthenticated
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from .models import CompanyProfile
+from .versions import bump, get_versions
+
+
+def user_company_id(user):
+    """The id of the user's company profile, or None for job seekers"""
+    try:
+        return user.company_profile.id
+    except CompanyProfile.DoesNotExist:
+        return None
+
+
+class UserRefreshToken(RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        company_id = user_company_id(user)
+        token['role'] = 'seeker' if company_id is None else 'company'
+        token['company_profile_id'] = company_id
+        return token
+
+
+def _cache_key(user_id):
+    return f'auth-user:{user_id}'
+
+
+def _version_name(user_id):
+    return f'auth:{user_id}'
+
+
+def forget_user(user_id):
+    """Drop the user's cached entry now, and retire it everywhere once the current transaction commits"""
+    cache.delete(_cache_key(user_id))
+    bump(_version_name(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+
+    def _user_id(self, validated_token):
+        try:
+            return validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+    def _users(self):
+        return self.user_model.objects.select_related('company_profile')
+
+    def _check(self, user, validated_token):
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return user
+
+    def _cached(self, user_id, entry):
+        """The current version stamp and the user of ``entry`` if it was stored under it, else None"""
+        # Read before any load, so a change committed during the load leaves the entry stale
+        version, = get_versions([_version_name(user_id)])
+        if entry is not None and entry[0] == version:
+            return version, entry[1]
+        return version, None
+
+    def get_user(self, validated_token):
+        user_id = self._user_id(validated_token)
+        version, user = self._cached(user_id, cache.get(_cache_key(user_id)))
+        if user is None:
+            try:
+                user = self._users().get(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            cache.set(_cache_key(user_id), (version, user), settings.AUTH_USER_CACHE_SECONDS)
+        return self._check(user, validated_token)
+
+
+class QueryTokenJWTAuthentication(CachedJWTAuthentication):
+
+    def authenticate(self, request):
+        if self.get_header(request) is not None:
+            return super().authenticate(request)
+        raw_token = request.query_params.get('token')
+        if not raw_token:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        return self.get_user(validated_token), validated_token
+
+
+class AsyncJWTAuthentication(CachedJWTAuthentication):
+
+    async def aauthenticate(self, request):
+        """The authenticated user; raises NotAuthenticated or AuthenticationFailed"""
+        header = self.get_header(request)
+        raw_token = self.get_raw_token(header) if header is not None else None
+        if raw_token is None:
+            raise NotAuthenticated()
+        return await self.aget_user(self.get_validated_token(raw_token))
+
+    async def aget_user(self, validated_token):
+        """Async get_user"""
+        user_id = self._user_id(validated_token)
+        # Stamps are cache reads, which the local-memory backend answers without blocking
+        version, user = self._cached(user_id, await cache.aget(_cache_key(user_id)))
+        if user is None:
+            try:
+                user = await self._users().aget(**{api_settings.USER_ID_FIELD: user_id})
+            except self.user_model.DoesNotExist as e:
+                raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+            await cache.aset(_cache_key(user_id), (version, user), settings.AUTH_USER_CACHE_SECONDS)
+        return self._check(user, validated_token)
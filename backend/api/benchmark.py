@@ -0,0 +1,111 @@
+"""
+Endpoint latency benchmark.
+
+Replays every scenario in api/scenarios.py through the test client against the
+current database (normally one filled by ``seed_data``) and reports, per request,
+p50/p95/p99 latency, query count and response size. Writes run inside a savepoint
+that is rolled back, so each iteration sees the same data. The report is plain
+JSON with sorted keys, meant to be committed or diffed between runs. A response
+with an unexpected status aborts the run.
+"""
+import platform
+from time import perf_counter
+
+import django
+import numpy as np
+from django.db import connection, transaction
+
+from .facets import job_facets
+from .instrumentation import collect_queries
+from .matching import candidate_matrix, skill_aliases, skill_matrix
+from .models import CompanyProfile, Job, JobApplication, Message, User
+from .scenarios import SCENARIOS, client_for, fixture_ids, send, unexpected_status
+from .seed import EMAIL_PREFIX
+from .versions import clear_keeping
+
+
+# Version stamps the in-memory indexes follow
+INDEX_STAMPS = ('jobs', 'candidates', 'skills')
+
+
+def pick_fixtures():
+    """The seeker and company of the oldest application that has messages, seeded ones first"""
+    messages = Message.objects.select_related(
+        'application__applicant', 'application__job__company__user',
+    ).order_by('id')
+    message = (
+        messages.filter(application__applicant__email__startswith=EMAIL_PREFIX).first()
+        or messages.first()
+    )
+    if message is None:
+        raise RuntimeError('The benchmark needs at least one message; run seed_data first.')
+    application = message.application
+    return {
+        'users': {None: None, 'seeker': application.applicant, 'company': application.job.company.user},
+        'ids': fixture_ids(application, message),
+    }
+
+
+def _percentiles(samples):
+    p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+    return {'p50_ms': round(float(p50), 2), 'p95_ms': round(float(p95), 2), 'p99_ms': round(float(p99), 2)}
+
+
+def run_scenario(client, method, path, data, ids, iterations, warmup, cold):
+    timings = []
+    for iteration in range(warmup + iterations):
+        with transaction.atomic():
+            if cold:
+                # Cold responses, not cold indexes: those were built once up front
+                clear_keeping(INDEX_STAMPS)
+            with collect_queries() as stats:
+                start = perf_counter()
+                response, body = send(client, method, path, data, ids)
+                elapsed = perf_counter() - start
+            transaction.set_rollback(True)
+        if unexpected_status(path, response.status_code):
+            # Timing an error page would pass for the endpoint's latency
+            raise RuntimeError(f'{method.upper()} {path.format(**ids)} returned {response.status_code}')
+        if iteration >= warmup:
+            timings.append(elapsed)
+    return {
+        'status': response.status_code,
+        'queries': stats.count,
+        'bytes': len(body),
+        **_percentiles(timings),
+    }
+
+
+def run_benchmark(names=None, iterations=50, warmup=3, cold=False):
+    fixtures = pick_fixtures()
+    # Build the in-memory indexes up front; their cost is a one-off per process
+    for index in (skill_aliases, skill_matrix, candidate_matrix, job_facets):
+        index.get()
+    results = {}
+    for name, scenarios in SCENARIOS.items():
+        if names and name not in names:
+            continue
+        for method, path, role, data in scenarios:
+            key = f'{method.upper()} {path} ({name})'
+            results[key] = run_scenario(
+                client_for(fixtures['users'][role]), method, path, data, fixtures['ids'],
+                iterations, warmup, cold,
+            )
+    # Writes were rolled back
+    for index in (skill_aliases, skill_matrix, candidate_matrix, job_facets):
+        index.invalidate()
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'database': f'{connection.vendor} {connection.Database.sqlite_version}' if connection.vendor == 'sqlite' else connection.vendor,
+            'iterations': iterations,
+            'warmup': warmup,
+            'cache': 'cold' if cold else 'warm',
+        },
+        'rows': {
+            model.__name__: model.objects.count()
+            for model in (User, CompanyProfile, Job, JobApplication, Message)
+        },
+        'results': results,
+    }
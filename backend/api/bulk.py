@@ -0,0 +1,154 @@
+"""
+Bulk job import from CSV or NDJSON.
+
+Rows are read and validated one at a time from the upload stream, so memory stays
+bounded by the batch size rather than the file size. Valid rows are inserted with
+``bulk_create`` in batches inside one transaction; the company snapshot and card
+data are computed once for the whole import. ``bulk_create`` skips ``save()`` and
+``post_save``, so the work those normally do is done here in bulk; the in-memory
+indexes are rebuilt once after the commit instead of being patched job by job.
+"""
+import codecs
+import csv
+import json
+
+from django.db import transaction
+from rest_framework import serializers
+
+from .cards import refresh_company_cards
+from .models import Job
+from .skills import clean_skills, link_skills
+from .versions import bump
+
+
+BATCH_SIZE = 500
+MAX_ROWS = 50000
+MAX_REPORTED_ERRORS = 1000
+
+LIST_FIELDS = ('requirements', 'benefits')
+
+
+class BulkImportError(ValueError):
+    pass
+
+
+class JobImportSerializer(serializers.ModelSerializer):
+    """Validates one imported row; company and snapshot come from the importer"""
+    requirements = serializers.ListField(child=serializers.CharField(), required=False)
+    benefits = serializers.ListField(child=serializers.CharField(), required=False)
+
+    class Meta:
+        model = Job
+        fields = [
+            'title', 'description', 'requirements', 'location', 'salary_min', 'salary_max',
+            'salary_type', 'employment_type', 'experience_level', 'application_deadline',
+            'benefits', 'is_remote', 'other_details',
+        ]
+
+    def validate_requirements(self, value):
+        return clean_skills(value)
+
+
+def _parse_list(value):
+    """A CSV list cell: a JSON array or ``;``-separated items"""
+    if value.startswith('['):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return value  # reported by the serializer as not a list
+    return [item.strip() for item in value.split(';') if item.strip()]
+
+
+def _csv_rows(lines):
+    for row in csv.DictReader(lines):
+        cleaned = {}
+        for field, value in row.items():
+            if field is None:  # more cells than headers
+                continue
+            value = (value or '').strip()
+            if value == '':
+                continue  # let the serializer apply defaults / nulls
+            if field in LIST_FIELDS:
+                value = _parse_list(value)
+            cleaned[field] = value
+        yield cleaned
+
+
+def iter_rows(stream, fmt):
+    """Yield ``(row_number, data_or_exception)`` from a binary stream of CSV or NDJSON"""
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    if fmt == 'csv':
+        rows = _csv_rows(lines)
+        row_number = 0
+        while True:
+            row_number += 1
+            try:
+                yield row_number, next(rows)
+            except StopIteration:
+                return
+            except (ValueError, csv.Error) as exc:
+                # The reader can't resync after a decode/quoting error; stop there
+                yield row_number, exc
+                return
+    else:
+        row_number = 0
+        for line in lines:
+            line = line.strip()
+            if not line:
+                continue
+            row_number += 1
+            try:
+                yield row_number, json.loads(line)
+            except ValueError as exc:
+                yield row_number, exc
+
+
+def import_jobs(company, stream, fmt, dry_run=False):
+    """Validate and insert jobs for ``company``; returns ``(created, errors, error_count)``"""
+    if fmt not in ('csv', 'ndjson'):
+        raise BulkImportError('format must be csv or ndjson.')
+    snapshot = company.snapshot()
+    # One serializer for every row: building its fields dominates per-instance cost
+    serializer = JobImportSerializer()
+    created = 0
+    errors = []
+    error_count = 0
+    batch = []
+
+    def flush():
+        nonlocal created
+        if batch and not dry_run:
+            inserted = Job.objects.bulk_create(batch)
+            refresh_company_cards(company, jobs=inserted)
+            link_skills(Job, [(job.pk, job.requirements) for job in inserted], replace=False)
+        created += len(batch)
+        batch.clear()
+
+    with transaction.atomic():
+        for row_number, data in iter_rows(stream, fmt):
+            if row_number > MAX_ROWS:
+                raise BulkImportError(f'Imports are limited to {MAX_ROWS} rows.')
+            if isinstance(data, Exception):
+                row_errors = {'non_field_errors': [f'Unreadable row: {data}']}
+            elif not isinstance(data, dict):
+                row_errors = {'non_field_errors': ['Each row must be an object.']}
+            else:
+                try:
+                    validated = serializer.run_validation(data)
+                except serializers.ValidationError as exc:
+                    row_errors = serializers.as_serializer_error(exc)
+                else:
+                    batch.append(Job(company=company, company_snapshot=snapshot, **validated))
+                    if len(batch) >= BATCH_SIZE:
+                        flush()
+                    continue
+            error_count += 1
+            if len(errors) < MAX_REPORTED_ERRORS:
+                errors.append({'row': row_number, 'errors': row_errors})
+        flush()
+
+        if created and not dry_run:
+            # The matrices and the facet index follow the jobs stamp: one rebuild after
+            # the commit rather than keeping every inserted job around to patch it in
+            bump('jobs')
+    return created, errors, error_count
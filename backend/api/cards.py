@@ -0,0 +1,103 @@
+"""
+Job-card read model.
+
+Each Job carries a precomputed ``card``: exactly what JobSerializer returns for it,
+company info included. Listing endpoints serve the stored cards straight from one
+indexed query instead of serializing rows and dereferencing ``job.company`` per row.
+Cards are rebuilt when the job is saved and when its company profile changes.
+"""
+from django.db import connections, router, transaction
+from rest_framework import serializers
+
+from .images import derivative_urls
+from .models import Job
+
+
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+CARD_BATCH_SIZE = 500
+
+
+def company_info(company):
+    return {
+        'company_name': company.company_name,
+        'industry': company.industry,
+        'description': company.description,
+        'logo': company.logo.url if company.logo else None,
+        # getattr: historical models in migrations before 0013 lack the field
+        'logo_derivatives': derivative_urls(getattr(company, 'logo_derivatives', None)),
+        'linkedin': company.linkedin,
+        'portfolio': company.portfolio,
+    }
+
+
+def build_job_card(job, info):
+    """Card for ``job`` given its company's ``company_info``; mirrors JobSerializer output"""
+    return {
+        'id': job.id,
+        'company': job.company_id,
+        'company_info': info,
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'location': job.location,
+        'posted_at': _datetime_field.to_representation(job.posted_at),
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max,
+        'salary_type': job.salary_type,
+        'employment_type': job.employment_type,
+        'experience_level': job.experience_level,
+        'application_deadline': _date_field.to_representation(job.application_deadline),
+        'benefits': job.benefits,
+        'is_remote': job.is_remote,
+        'company_snapshot': job.company_snapshot,
+        'other_details': job.other_details,
+    }
+
+
+def refresh_job_card(job):
+    card = build_job_card(job, company_info(job.company))
+    # update() rather than save() so post_save doesn't fire again
+    Job.objects.filter(pk=job.pk).update(card=card)
+    job.card = card
+
+
+def _write_cards(model, jobs):
+    """Store ``job.card`` for each job with one executemany UPDATE.
+
+    bulk_update() builds a CASE expression over the whole batch, which costs
+    more than the cards themselves on large imports.
+    """
+    field = model._meta.get_field('card')
+    connection = connections[router.db_for_write(model)]
+    qn = connection.ops.quote_name
+    sql = f'UPDATE {qn(model._meta.db_table)} SET {qn(field.column)} = %s WHERE {qn(model._meta.pk.column)} = %s'
+    with connection.cursor() as cursor:
+        cursor.executemany(sql, [(field.get_db_prep_save(job.card, connection), job.pk) for job in jobs])
+
+
+def refresh_company_cards(company, jobs=None):
+    """Rebuild the cards of every job of ``company``, computing its info once"""
+    info = company_info(company)
+    # company.jobs rather than Job so historical models work in migrations
+    model = company.jobs.model
+    if jobs is None:
+        jobs = company.jobs.all().iterator(chunk_size=CARD_BATCH_SIZE)
+    # One transaction, not one commit per updated row. On the primary: the manager's
+    # db is the read alias, the query-only replica when one is configured.
+    with transaction.atomic(using=router.db_for_write(model)):
+        batch = []
+        for job in jobs:
+            job.card = build_job_card(job, info)
+            batch.append(job)
+            if len(batch) >= CARD_BATCH_SIZE:
+                _write_cards(model, batch)
+                batch = []
+        if batch:
+            _write_cards(model, batch)
+
+
+def job_cards(job_ids):
+    """Cards for ``job_ids`` keyed by id, in one query (missing/deleted jobs are absent)"""
+    return dict(Job.objects.filter(id__in=job_ids).values_list('id', 'card'))
@@ -0,0 +1,61 @@
+"""
+SQLite connection tuning and read-replica routing for the production profile.
+
+``configure_sqlite`` runs on every new connection and applies ``SQLITE_PRAGMAS``
+(WAL, busy timeout, ...). ``ReplicaRouter`` sends reads to the ``replica`` alias
+and writes to ``default``. Once a request has written, or while a transaction is
+open, its reads stay on ``default`` so it sees its own writes even if the replica
+lags. Keeping the replica file up to date is left to the deployment (Litestream,
+LiteFS, a periodic ``.backup``, ...).
+"""
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+REPLICA_DB_ALIAS = 'replica'
+
+# Set once the current request has written; reset when the next request starts
+_wrote = ContextVar('wrote_to_primary', default=False)
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """connection_created handler applying SQLITE_PRAGMAS to SQLite connections"""
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(getattr(settings, 'SQLITE_PRAGMAS', {}))
+    if connection.alias == REPLICA_DB_ALIAS:
+        # The replica is written by replication only; WAL mode is the primary's to set
+        pragmas.pop('journal_mode', None)
+        pragmas['query_only'] = 'ON'
+    if not pragmas:
+        return
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+
+
+def reset_primary_pin(sender, **kwargs):
+    """request_started handler: a new request may read from the replica again"""
+    _wrote.set(False)
+
+
+class ReplicaRouter:
+    """Route reads to the replica and writes (and reads after them) to the primary"""
+
+    def db_for_read(self, model, **hints):
+        if _wrote.get() or connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return REPLICA_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        _wrote.set(True)
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
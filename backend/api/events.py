@@ -0,0 +1,172 @@
+"""
+Push delivery of per-user events over Server-Sent Events.
+
+Views and signal handlers call ``publish(user_ids, event_type, data)``; the
+``events/stream/`` endpoint (ASGI only) holds one connection per browser tab and
+forwards every event addressed to its user. The broker is chosen by the
+``EVENTS_BROKER`` setting, so the in-process default can later be replaced by a
+cross-process one (Redis pub/sub, ...) implementing the same two methods.
+
+A stream is authenticated like the async views (``AsyncJWTAuthentication``) and
+checked again on every keepalive and before every event: once the access token
+has expired, or the user is deactivated or changes their password, the stream ends.
+"""
+import asyncio
+import json
+import threading
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.module_loading import import_string
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from .authentication import AsyncJWTAuthentication
+
+
+KEEPALIVE_SECONDS = 15
+SUBSCRIPTION_QUEUE_SIZE = 100
+
+
+class Subscription:
+    """One connected client: an asyncio queue bound to the event loop that reads it"""
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=SUBSCRIPTION_QUEUE_SIZE)
+
+    def deliver(self, event):
+        # Called from any thread; a client too slow to drain its queue loses events
+        def put():
+            if not self.queue.full():
+                self.queue.put_nowait(event)
+        self.loop.call_soon_threadsafe(put)
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Fan-out to subscribers connected to this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, user_id):
+        subscription = Subscription(self, user_id)
+        with self._lock:
+            self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for subscription in subscribers:
+            try:
+                subscription.deliver(event)
+            except RuntimeError:  # the subscriber's event loop has shut down
+                self.unsubscribe(subscription)
+
+
+_broker = None
+
+
+def get_broker():
+    global _broker
+    if _broker is None:
+        _broker = import_string(getattr(settings, 'EVENTS_BROKER', 'api.events.InProcessBroker'))()
+    return _broker
+
+
+def publish(user_ids, event_type, data):
+    """Send an event to every connected client of ``user_ids`` once the transaction commits"""
+    event = {'type': event_type, 'data': data}
+
+    def send():
+        broker = get_broker()
+        for user_id in set(user_ids):
+            broker.publish(user_id, event)
+    transaction.on_commit(send)
+
+
+def format_sse(event):
+    payload = json.dumps(event['data'], cls=DjangoJSONEncoder)
+    return f"event: {event['type']}\ndata: {payload}\n\n"
+
+
+async def _authenticate(auth, request):
+    """The validated token from a Bearer header or, for EventSource clients, ``?token=``, and its user"""
+    raw_token = None
+    header = auth.get_header(request)
+    if header is not None:
+        raw_token = auth.get_raw_token(header)
+    if raw_token is None:
+        raw_token = request.GET.get('token')
+    if not raw_token:
+        return None, None
+    try:
+        validated_token = auth.get_validated_token(raw_token)
+        return validated_token, await auth.aget_user(validated_token)
+    except (InvalidToken, TokenError, AuthenticationFailed):
+        return None, None
+
+
+async def _still_valid(auth, validated_token):
+    """Whether the stream's token has not expired and its user may still sign in"""
+    try:
+        validated_token.check_exp(current_time=aware_utcnow())
+        # A cache hit unless the user changed (api/authentication.py)
+        await auth.aget_user(validated_token)
+    except (TokenError, AuthenticationFailed):
+        return False
+    return True
+
+
+async def event_stream(request):
+    """Server-Sent Events stream of the authenticated user's events"""
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse({'detail': 'Event streaming requires the ASGI server.'}, status=501)
+    auth = AsyncJWTAuthentication()
+    validated_token, user = await _authenticate(auth, request)
+    if user is None:
+        return JsonResponse({'detail': 'Authentication credentials were not provided or are invalid.'}, status=401)
+
+    subscription = get_broker().subscribe(user.id)
+
+    async def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(subscription.get(), timeout=KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    event = None
+                if not await _still_valid(auth, validated_token):
+                    # The client reconnects and is refused until it has a new token
+                    return
+                yield ': keepalive\n\n' if event is None else format_sse(event)
+        finally:
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
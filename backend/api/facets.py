@@ -0,0 +1,300 @@
+"""
+In-memory faceted index over jobs.
+
+Every job occupies a row slot; each facet stores one small integer code per row.
+A combined filter is an AND of per-facet ``isin`` masks, and per-facet counts are a
+``bincount`` of the codes under the mask of all *other* facets (so a chip shows how
+many jobs you would get by adding that value). No SQL runs once the index is built.
+After a job change commits, the writing process patches its index; it follows the
+``jobs`` version stamp (api/versions.py), so other processes rebuild theirs.
+
+Locations are grouped case- and whitespace-insensitively. The index remembers the
+stored spellings behind each group, so ``facet_filter_q`` selects exactly the rows
+it counts.
+"""
+import threading
+
+import numpy as np
+from django.db.models import Q
+from django.db.models.functions import Coalesce
+
+from .models import Job
+from .versions import get_versions
+
+
+FACETS = (
+    'employment_type', 'experience_level', 'salary_type', 'is_remote',
+    'location', 'company', 'salary',
+)
+
+# Lower bound (inclusive) and label of each salary bucket, keyed on salary_max or salary_min
+SALARY_BUCKETS = (
+    (150000, '150k+'),
+    (100000, '100k-150k'),
+    (60000, '60k-100k'),
+    (30000, '30k-60k'),
+    (0, '<30k'),
+)
+SALARY_UNSPECIFIED = 'unspecified'
+
+_FIELDS = (
+    'id', 'employment_type', 'experience_level', 'salary_type', 'is_remote',
+    'location', 'company_id', 'salary_min', 'salary_max',
+)
+_LOCATION = _FIELDS.index('location')
+
+
+def normalize_location(value):
+    return ' '.join((value or '').split()).casefold()
+
+
+def salary_bucket(salary_min, salary_max):
+    salary = salary_max if salary_max is not None else salary_min
+    if salary is None:
+        return SALARY_UNSPECIFIED
+    for lower, label in SALARY_BUCKETS:
+        if salary >= lower:
+            return label
+    return SALARY_BUCKETS[-1][1]
+
+
+def job_facet_values(employment_type, experience_level, salary_type, is_remote,
+                     location, company_id, salary_min, salary_max):
+    """Facet value strings of one job, in FACETS order"""
+    return (
+        employment_type,
+        experience_level,
+        salary_type,
+        'true' if is_remote else 'false',
+        normalize_location(location),
+        str(company_id),
+        salary_bucket(salary_min, salary_max),
+    )
+
+
+def parse_facet_filters(params):
+    """Read facet filters from query params; repeat a param to OR several values.
+
+    ``company_id`` is accepted as an alias of ``company`` (the dashboards send it).
+    """
+    filters = {}
+    for facet in FACETS:
+        values = list(params.getlist(facet))
+        if facet == 'company':
+            values += params.getlist('company_id')
+        if facet == 'is_remote':
+            values = ['true' if v.lower() in ('1', 'true', 'yes') else 'false' for v in values]
+        if facet == 'location':
+            values = [normalize_location(v) for v in values]
+        values = [v for v in values if v != '']
+        if values:
+            filters[facet] = values
+    return filters
+
+
+def facet_filter_q(filters, index):
+    """SQL equivalent of ``index.query``'s filter, for paging through the matching rows.
+
+    Expects a queryset annotated with ``salary_ref`` (see ``annotate_salary_ref``).
+    """
+    condition = Q()
+    for facet, values in filters.items():
+        if facet == 'is_remote':
+            condition &= Q(is_remote__in=[v == 'true' for v in values])
+        elif facet == 'company':
+            condition &= Q(company_id__in=[int(v) for v in values if v.isdigit()])
+        elif facet == 'location':
+            # The stored spellings: SQL cannot fold case and whitespace as normalize_location does
+            condition &= Q(location__in=index.spellings(values))
+        elif facet == 'salary':
+            condition &= _any(_salary_bucket_q(v) for v in values)
+        else:
+            condition &= Q(**{f'{facet}__in': values})
+    return condition
+
+
+def annotate_salary_ref(queryset):
+    return queryset.annotate(salary_ref=Coalesce('salary_max', 'salary_min'))
+
+
+def _any(conditions):
+    combined = Q(pk__in=[])
+    for condition in conditions:
+        combined |= condition
+    return combined
+
+
+def _salary_bucket_q(label):
+    if label == SALARY_UNSPECIFIED:
+        return Q(salary_ref__isnull=True)
+    bounds = [lower for lower, _ in SALARY_BUCKETS]
+    for i, (lower, bucket) in enumerate(SALARY_BUCKETS):
+        if bucket == label:
+            # The lowest bucket also holds negative salaries
+            condition = Q(salary_ref__gte=lower) if i < len(bounds) - 1 else Q(salary_ref__isnull=False)
+            if i > 0:
+                condition &= Q(salary_ref__lt=bounds[i - 1])
+            return condition
+    return Q(pk__in=[])
+
+
+class FacetIndex:
+    def __init__(self, capacity=1024):
+        self._lock = threading.RLock()
+        self._slots = {}
+        self._free = []
+        self._size = 0
+        self._job_ids = np.zeros(capacity, dtype=np.int64)
+        self._alive = np.zeros(capacity, dtype=bool)
+        self._codes = {facet: np.zeros(capacity, dtype=np.int32) for facet in FACETS}
+        self._values = {facet: [] for facet in FACETS}
+        self._lookup = {facet: {} for facet in FACETS}
+        # {normalized location: stored spellings}; kept when their jobs go, which only widens filters
+        self._spellings = {}
+
+    @classmethod
+    def from_db(cls):
+        index = cls(capacity=max(Job.objects.count(), 1024))
+        for row in Job.objects.values_list(*_FIELDS).iterator(chunk_size=5000):
+            index._put_row(row)
+        return index
+
+    def __len__(self):
+        return len(self._slots)
+
+    def _code(self, facet, value):
+        lookup = self._lookup[facet]
+        code = lookup.get(value)
+        if code is None:
+            code = lookup[value] = len(self._values[facet])
+            self._values[facet].append(value)
+        return code
+
+    def _grow(self):
+        capacity = len(self._job_ids) * 2
+        self._job_ids = np.resize(self._job_ids, capacity)
+        self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+        for facet in FACETS:
+            self._codes[facet] = np.resize(self._codes[facet], capacity)
+
+    def _put(self, job_id, values):
+        slot = self._slots.get(job_id)
+        if slot is None:
+            if self._free:
+                slot = self._free.pop()
+            else:
+                if self._size == len(self._job_ids):
+                    self._grow()
+                slot = self._size
+                self._size += 1
+            self._slots[job_id] = slot
+            self._job_ids[slot] = job_id
+            self._alive[slot] = True
+        for facet, value in zip(FACETS, values):
+            self._codes[facet][slot] = self._code(facet, value)
+
+    def _put_row(self, row):
+        self._put(row[0], job_facet_values(*row[1:]))
+        location = row[_LOCATION] or ''
+        self._spellings.setdefault(normalize_location(location), set()).add(location)
+
+    def update(self, row):
+        """Add or replace a job from its ``_FIELDS`` values"""
+        with self._lock:
+            self._put_row(row)
+
+    def spellings(self, locations):
+        """Stored spellings of the normalized ``locations``"""
+        with self._lock:
+            return sorted({spelling for key in locations for spelling in self._spellings.get(key, ())})
+
+    def remove(self, job_id):
+        with self._lock:
+            slot = self._slots.pop(job_id, None)
+            if slot is not None:
+                self._alive[slot] = False
+                self._free.append(slot)
+
+    def query(self, filters):
+        """Return ``(job_ids, facet_counts)`` for the AND of ``filters``.
+
+        ``filters`` maps facet name to a list of accepted values (OR'ed).
+        ``facet_counts`` maps facet name to ``{value: count}``.
+        """
+        with self._lock:
+            n = self._size
+            alive = self._alive[:n]
+            codes = {facet: self._codes[facet][:n] for facet in FACETS}
+            values = {facet: list(self._values[facet]) for facet in FACETS}
+            masks = {}
+            for facet, wanted in filters.items():
+                accepted = [self._lookup[facet][v] for v in wanted if v in self._lookup[facet]]
+                masks[facet] = np.isin(codes[facet], accepted)
+
+            matched = alive.copy()
+            for mask in masks.values():
+                matched &= mask
+
+            counts = {}
+            for facet in FACETS:
+                if facet in masks:
+                    others = alive.copy()
+                    for other, mask in masks.items():
+                        if other != facet:
+                            others &= mask
+                else:
+                    others = matched
+                tally = np.bincount(codes[facet][others], minlength=len(values[facet]))
+                counts[facet] = {value: int(c) for value, c in zip(values[facet], tally) if c}
+            return self._job_ids[:n][matched].copy(), counts
+
+
+class _IndexCache:
+    """Process-local FacetIndex, built on first use and rebuilt when the ``jobs`` stamp moves"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._index = None
+        self._version = None
+        self._generation = 0
+
+    def get(self):
+        # Read before building, so a change committed during the build is seen next time
+        version, = get_versions(['jobs'])
+        index = self._index
+        if index is None or version != self._version:
+            with self._lock:
+                generation = self._generation
+                if self._index is not None and version == self._version:
+                    return self._index
+                index = FacetIndex.from_db()
+                # A job changed mid-build and may be missing; rebuild next time
+                if generation == self._generation:
+                    self._index, self._version = index, version
+        return index
+
+    def refresh(self, job_id, version):
+        """Patch ``job_id`` from the database for the change that advanced ``jobs`` to ``version``.
+
+        The index is dropped instead if any other change came in between.
+        """
+        self._generation += 1
+        index = self._index
+        if index is None:
+            return
+        if version is None or version != self._version + 1:
+            self._index = None
+            return
+        row = Job.objects.filter(pk=job_id).values_list(*_FIELDS).first()
+        if row is None:
+            index.remove(job_id)
+        else:
+            index.update(row)
+        self._version = version
+
+    def invalidate(self):
+        self._generation += 1
+        self._index = None
+
+
+job_facets = _IndexCache()
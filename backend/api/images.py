@@ -0,0 +1,147 @@
+"""
+Resized image derivatives for company logos and profile pictures.
+
+Uploads are kept as they are; after the saving transaction commits, a small worker
+pool renders each image at a few fixed sizes as WebP and JPEG, stores the files
+under ``derivatives/`` and records their names on the model
+(``logo_derivatives`` / ``profile_picture_derivatives``). Serializers and job cards
+expose them as URLs via ``derivative_urls``, so listings can send a 128px thumbnail
+instead of the original upload.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections, transaction
+from django.db.models import Q
+from django.dispatch import Signal
+from PIL import Image, ImageOps
+
+
+logger = logging.getLogger(__name__)
+
+# Longest side in pixels; images are never upscaled
+DERIVATIVE_SIZES = {
+    'small': 128,
+    'medium': 256,
+    'large': 512,
+}
+WEBP_QUALITY = 80
+JPEG_QUALITY = 82
+
+# Sent with ``sender=<model class>, instance=<refreshed instance>, field=<name>``
+# once an instance's derivatives are stored (or cleared).
+derivatives_ready = Signal()
+
+
+def derivatives_field(field):
+    return f'{field}_derivatives'
+
+
+def derivative_urls(derivatives):
+    """``{size: {'webp': url, 'jpeg': url}}`` for a stored derivatives dict, or None"""
+    if not derivatives:
+        return None
+    return {
+        size: {fmt: default_storage.url(name) for fmt, name in files.items()}
+        for size, files in derivatives.items()
+        if size in DERIVATIVE_SIZES
+    }
+
+
+def _encode(image, fmt):
+    buffer = BytesIO()
+    if fmt == 'webp':
+        image.save(buffer, 'WEBP', quality=WEBP_QUALITY, method=4)
+    else:
+        if image.mode != 'RGB':
+            # JPEG has no alpha: flatten transparent logos onto white
+            background = Image.new('RGB', image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel('A') if 'A' in image.getbands() else None)
+            image = background
+        image.save(buffer, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    return buffer.getvalue()
+
+
+def render_derivatives(source_name):
+    """Render and store every derivative of ``source_name``; returns the derivatives dict"""
+    stem = os.path.splitext(source_name)[0]
+    derivatives = {'source': source_name}
+    with default_storage.open(source_name, 'rb') as source, Image.open(source) as original:
+        image = ImageOps.exif_transpose(original)
+        image = image.convert('RGBA' if 'A' in image.getbands() or 'transparency' in image.info else 'RGB')
+        # Largest first, each resized from the previous one
+        for size, pixels in sorted(DERIVATIVE_SIZES.items(), key=lambda item: -item[1]):
+            image.thumbnail((pixels, pixels), Image.LANCZOS, reducing_gap=3.0)
+            derivatives[size] = {
+                fmt: default_storage.save(f'derivatives/{stem}_{pixels}.{ext}', ContentFile(_encode(image, fmt)))
+                for fmt, ext in (('webp', 'webp'), ('jpeg', 'jpg'))
+            }
+    return derivatives
+
+
+def delete_derivatives(derivatives):
+    for size, files in (derivatives or {}).items():
+        if size in DERIVATIVE_SIZES:
+            for name in files.values():
+                default_storage.delete(name)
+
+
+def build_derivatives(model, pk, field, force=False):
+    """Bring one instance's derivatives in line with its current image (synchronous)"""
+    target = derivatives_field(field)
+    row = model._default_manager.filter(pk=pk).values(field, target).first()
+    if row is None:
+        return
+    source, current = row[field], row[target]
+    if not force and (current or {}).get('source') == (source or None):
+        return
+    derivatives = render_derivatives(source) if source else None
+    # Only store them if the image wasn't replaced while we were rendering
+    same_image = Q(**{field: source}) if source else Q(**{field: ''}) | Q(**{f'{field}__isnull': True})
+    updated = model._default_manager.filter(same_image, pk=pk).update(**{target: derivatives})
+    if not updated:
+        delete_derivatives(derivatives)
+        return
+    delete_derivatives(current)
+    instance = model._default_manager.get(pk=pk)
+    derivatives_ready.send(sender=model, instance=instance, field=field)
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=getattr(settings, 'IMAGE_DERIVATIVE_WORKERS', 2),
+                thread_name_prefix='image-derivatives',
+            )
+    return _executor
+
+
+def _run(model, pk, field):
+    try:
+        build_derivatives(model, pk, field)
+    except Exception:
+        logger.exception('Building %s derivatives failed for %s %s', field, model.__name__, pk)
+    finally:
+        close_old_connections()
+
+
+def schedule_derivatives(instance, field):
+    """Queue derivatives for ``instance.<field>`` if the image changed since they were built"""
+    source = getattr(instance, field).name or None
+    current = getattr(instance, derivatives_field(field)) or {}
+    if current.get('source') == source:
+        return
+    model, pk = type(instance), instance.pk
+    transaction.on_commit(lambda: get_executor().submit(_run, model, pk, field))
@@ -0,0 +1,170 @@
+"""
+Per-request SQL instrumentation.
+
+Every database connection gets an execute wrapper (installed on
+``connection_created``) that reports each statement to the collectors active in
+the current context. ``SQLInstrumentationMiddleware`` opens one per request and
+reports query count, SQL time and repeated query shapes in a log line on the
+``api.sql`` logger and, when ``SQL_TIMING_HEADERS`` is on, as ``Server-Timing``
+headers a browser's network panel shows. A statement shape issued
+``SQL_REPEAT_THRESHOLD`` times or more in one request is the usual N+1 signature
+and is logged as a warning.
+
+``assert_query_budget`` is the check for tests and audits: it fails when the
+queries a request issues grow with the number of rows behind it.
+"""
+import logging
+import re
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+
+logger = logging.getLogger('api.sql')
+
+# Collectors (QueryStats) the statements of the current context are reported to.
+# ContextVars follow sync_to_async, so queries run in a worker thread still count.
+_collectors = ContextVar('sql_collectors', default=())
+
+_IN_LIST = re.compile(r'\(\s*%s(?:\s*,\s*%s)*\s*\)')
+_LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_TABLE = re.compile(r'\b(?:FROM|INTO|UPDATE)\s+"?(\w+)"?', re.IGNORECASE)
+
+
+def query_shape(sql):
+    """``sql`` with literals and IN lists collapsed, so repeats of one query compare equal"""
+    return _LITERAL.sub('?', _IN_LIST.sub('(...)', sql))
+
+
+class QueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.shapes = Counter()
+
+    def record(self, sql, duration):
+        self.count += 1
+        self.duration += duration
+        self.shapes[query_shape(sql)] += 1
+
+    def repeated(self, threshold=None):
+        """[(shape, times)] for shapes issued at least ``threshold`` times, most frequent first"""
+        if threshold is None:
+            threshold = getattr(settings, 'SQL_REPEAT_THRESHOLD', 5)
+        return [(shape, times) for shape, times in self.shapes.most_common() if times >= threshold]
+
+
+def record_query(execute, sql, params, many, context):
+    """Execute wrapper timing a statement for the active collectors"""
+    collectors = _collectors.get()
+    if not collectors:
+        return execute(sql, params, many, context)
+    start = perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        duration = perf_counter() - start
+        for stats in collectors:
+            stats.record(sql, duration)
+
+
+def install_query_recorder(sender, connection, **kwargs):
+    """connection_created handler adding ``record_query`` to the connection"""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+@contextmanager
+def collect_queries():
+    """Collect the statements run inside the block into a QueryStats"""
+    stats = QueryStats()
+    token = _collectors.set(_collectors.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _collectors.reset(token)
+
+
+def _table(shape):
+    match = _TABLE.search(shape)
+    return match.group(1) if match else '?'
+
+
+def server_timing(stats, total):
+    metrics = [
+        f'sql;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"',
+        f'app;dur={total * 1000:.1f}',
+    ]
+    repeated = stats.repeated()
+    if repeated:
+        shape, times = repeated[0]
+        metrics.append(f'sql-repeat;desc="{times}x {_table(shape)}"')
+    return ', '.join(metrics)
+
+
+class SQLInstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        start = perf_counter()
+        with collect_queries() as stats:
+            response = self.get_response(request)
+        return self.report(request, response, stats, perf_counter() - start)
+
+    async def __acall__(self, request):
+        start = perf_counter()
+        with collect_queries() as stats:
+            response = await self.get_response(request)
+        return self.report(request, response, stats, perf_counter() - start)
+
+    def report(self, request, response, stats, total):
+        # A streaming body's own queries run after this, once the headers are sent
+        repeated = stats.repeated()
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'status': response.status_code,
+            'queries': stats.count,
+            'sql_ms': round(stats.duration * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'repeated': [{'table': _table(shape), 'times': times, 'sql': shape} for shape, times in repeated],
+        }
+        logger.log(
+            logging.WARNING if repeated else logging.INFO,
+            '%s %s %s queries=%d sql_ms=%.1f total_ms=%.1f repeated=%d',
+            request.method, request.path, response.status_code, stats.count,
+            record['sql_ms'], record['total_ms'], len(repeated),
+            extra={'sql': record},
+        )
+        if getattr(settings, 'SQL_TIMING_HEADERS', settings.DEBUG):
+            response['Server-Timing'] = server_timing(stats, total)
+        return response
+
+
+def assert_query_budget(request, grow, rounds=2):
+    """
+    Call ``request()``, then ``grow()`` and ``request()`` again ``rounds`` times,
+    and raise AssertionError if the query count went up. Returns the counts.
+    """
+    counts = []
+    for step in range(rounds + 1):
+        if step:
+            grow()
+        with collect_queries() as stats:
+            request()
+        counts.append(stats.count)
+    if max(counts) > counts[0]:
+        raise AssertionError(f'query count grows with result size: {" -> ".join(map(str, counts))}')
+    return counts
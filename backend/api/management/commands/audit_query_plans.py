@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.queryplans import audit
+from api.scenarios import SCENARIOS, uncovered_url_names
+
+
+class Command(BaseCommand):
+    help = 'EXPLAIN QUERY PLAN every query the API endpoints issue and flag full scans and temp B-tree sorts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Only audit these URL names')
+        parser.add_argument('--check', action='store_true', help='Exit with an error if anything is flagged (for CI)')
+        parser.add_argument('--plans', action='store_true', help='Print every statement with its plan')
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'No audit scenario for: {", ".join(sorted(unknown))}')
+        try:
+            results = audit(options['names'] or None)
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+
+        problems = 0
+        for result in results:
+            style = self.style.ERROR if result.findings else self.style.SUCCESS
+            self.stdout.write(style(
+                f'{result.method} {result.path} -> {result.status}, {result.queries} queries, '
+                f'{len(result.findings)} flagged'
+            ))
+            for finding in result.findings:
+                problems += 1
+                self.stdout.write(f'    {finding.detail}\n      {finding.sql[:300]}')
+            if options['plans']:
+                for sql, plan in result.plans:
+                    self.stdout.write(f'    {sql[:300]}')
+                    for detail in plan:
+                        self.stdout.write(f'      | {detail}')
+
+        uncovered = [] if options['names'] else uncovered_url_names()
+        for name in uncovered:
+            problems += 1
+            self.stdout.write(self.style.ERROR(f'No audit scenario for URL {name!r}'))
+
+        summary = f'{len(results)} requests audited, {problems} problems'
+        if problems and options['check']:
+            raise CommandError(summary)
+        self.stdout.write(summary)
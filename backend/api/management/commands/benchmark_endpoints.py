@@ -0,0 +1,36 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.benchmark import run_benchmark
+from api.scenarios import SCENARIOS
+
+
+class Command(BaseCommand):
+    help = 'Time every API endpoint through the test client and report latency percentiles as JSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', help='Only benchmark these URL names')
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true', help='Clear the cache before every request')
+        parser.add_argument('--output', help='Write the report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        unknown = set(options['names']) - set(SCENARIOS)
+        if unknown:
+            raise CommandError(f'No benchmark scenario for: {", ".join(sorted(unknown))}')
+        try:
+            report = run_benchmark(
+                options['names'] or None, iterations=options['iterations'],
+                warmup=options['warmup'], cold=options['cold'],
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        text = json.dumps(report, indent=2, sort_keys=True) + '\n'
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(text)
+            self.stderr.write(f'Wrote {len(report["results"])} results to {options["output"]}')
+        else:
+            self.stdout.write(text, ending='')
@@ -0,0 +1,46 @@
+import argparse
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.pollbench import run_pollers_benchmark, serve_wsgi
+
+
+class Command(BaseCommand):
+    help = 'Compare how many concurrent dashboard pollers the ASGI and WSGI servers sustain'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='+', choices=['asgi', 'wsgi'], default=['asgi', 'wsgi'])
+        parser.add_argument('--levels', nargs='+', type=int, default=[50, 100, 200, 400],
+                            help='Numbers of concurrent pollers to try')
+        parser.add_argument('--wait', type=float, default=5.0, help='Long-poll wait in seconds')
+        parser.add_argument('--duration', type=float, default=20.0, help='Seconds to run each level')
+        parser.add_argument('--threads', type=int, default=32, help='Worker threads of the WSGI server')
+        parser.add_argument('--slo-ms', type=float, default=500.0,
+                            help='p99 latency the short requests must stay within')
+        parser.add_argument('--output', help='Write the report to this file instead of stdout')
+        # Used by the benchmark itself to start the WSGI server in a subprocess
+        parser.add_argument('--serve', choices=['wsgi'], help=argparse.SUPPRESS)
+        parser.add_argument('--port', type=int, help=argparse.SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['serve']:
+            serve_wsgi(options['port'], options['threads'])
+            return
+        if min(options['levels']) < 1:
+            raise CommandError('--levels must be positive.')
+        try:
+            report = run_pollers_benchmark(
+                servers=options['servers'], levels=options['levels'], wait=options['wait'],
+                duration=options['duration'], threads=options['threads'], slo_ms=options['slo_ms'],
+                log=self.stderr.write,
+            )
+        except RuntimeError as exc:
+            raise CommandError(str(exc))
+        text = json.dumps(report, indent=2, sort_keys=True) + '\n'
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(text)
+            self.stderr.write(f'Wrote the report to {options["output"]}')
+        else:
+            self.stdout.write(text, ending='')
@@ -0,0 +1,26 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.serializerbench import golden_mismatches, run_serializer_benchmark
+
+
+class Command(BaseCommand):
+    help = 'Check that the fast serialization path matches the DRF serializers byte for byte, then time both'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1000, help='Rows of each model to serialize')
+        parser.add_argument('--rounds', type=int, default=5, help='Timed rounds; the fastest is reported')
+        parser.add_argument('--check', action='store_true', help='Only run the golden checks')
+
+    def handle(self, *args, **options):
+        mismatches = golden_mismatches(options['rows'])
+        for mismatch in mismatches:
+            self.stderr.write(mismatch)
+        if mismatches:
+            raise CommandError(f'{len(mismatches)} outputs differ from the DRF serializers.')
+        self.stderr.write('Output identical to the DRF serializers.')
+        if options['check']:
+            return
+        report = run_serializer_benchmark(rows=options['rows'], rounds=options['rounds'])
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
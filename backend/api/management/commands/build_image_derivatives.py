@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from api.images import build_derivatives
+from api.models import CompanyProfile, User
+
+
+class Command(BaseCommand):
+    help = 'Render missing or outdated logo and profile picture derivatives'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Re-render derivatives that are up to date')
+
+    def handle(self, *args, **options):
+        for model, field in ((CompanyProfile, 'logo'), (User, 'profile_picture')):
+            pks = model.objects.exclude(**{field: ''}).exclude(**{f'{field}__isnull': True}).values_list('pk', flat=True)
+            count = failed = 0
+            for pk in pks.iterator():
+                try:
+                    build_derivatives(model, pk, field, force=options['force'])
+                    count += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f'{model.__name__} {pk}: {exc}')
+            self.stdout.write(self.style.SUCCESS(f'Checked {count} {field} images ({failed} failed)'))
@@ -0,0 +1,14 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = 'Print a signed X-Profile header value that makes a request be profiled'
+
+    def handle(self, *args, **options):
+        if not settings.PROFILING_DIR:
+            self.stderr.write(self.style.WARNING('PROFILING_DIR is not set, so no request will be profiled.'))
+        self.stdout.write(make_token())
+        self.stderr.write(f'Valid for {settings.PROFILING_TOKEN_MAX_AGE} seconds.')
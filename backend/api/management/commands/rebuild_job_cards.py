@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from api.cards import refresh_company_cards
+from api.models import CompanyProfile
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the precomputed job cards of every job (or of the given companies)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('company_ids', nargs='*', type=int)
+
+    def handle(self, *args, **options):
+        companies = CompanyProfile.objects.all()
+        if options['company_ids']:
+            companies = companies.filter(id__in=options['company_ids'])
+        count = 0
+        for company in companies.iterator():
+            refresh_company_cards(company)
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt job cards for {count} companies'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Job, User
+from api.skills import rebuild_skill_links
+
+
+class Command(BaseCommand):
+    help = 'Relink every user and job to the skills in their skills/requirements lists (run after editing aliases)'
+
+    def handle(self, *args, **options):
+        users = rebuild_skill_links(User)
+        jobs = rebuild_skill_links(Job)
+        self.stdout.write(self.style.SUCCESS(f'Relinked skills of {users} users and {jobs} jobs'))
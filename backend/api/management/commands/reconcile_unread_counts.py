@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Q
+
+from api.models import MessageThread, UnreadCounter, User
+from api.threads import actual_unread_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount unread messages and repair drifted per-user counters and thread summaries'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        dry_run = options['dry_run']
+        with transaction.atomic():
+            actual = actual_unread_counts()
+            stored = dict(UnreadCounter.objects.values_list('user_id', 'count'))
+            drifted = {
+                user_id: actual.get(user_id, 0)
+                for user_id in set(actual) | set(stored)
+                if actual.get(user_id, 0) != stored.get(user_id, 0)
+            }
+            for user_id, count in drifted.items():
+                self.stdout.write(f'user {user_id}: stored {stored.get(user_id, 0)}, actual {count}')
+            if drifted and not dry_run:
+                existing = set(User.objects.filter(id__in=drifted).values_list('id', flat=True))
+                UnreadCounter.objects.bulk_create(
+                    [UnreadCounter(user_id=user_id, count=count) for user_id, count in drifted.items() if user_id in existing],
+                    update_conflicts=True, unique_fields=['user'], update_fields=['count'],
+                )
+
+            threads = MessageThread.objects.annotate(
+                actual=Count(
+                    'application__messages',
+                    filter=Q(application__messages__is_read=False) & ~Q(application__messages__sender=F('participant')),
+                ),
+            ).exclude(unread_count=F('actual'))
+            stale_threads = list(threads)
+            for thread in stale_threads:
+                thread.unread_count = thread.actual
+            if stale_threads and not dry_run:
+                MessageThread.objects.bulk_update(stale_threads, ['unread_count'], batch_size=500)
+
+        verb = 'Found' if dry_run else 'Repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'{verb} {len(drifted)} drifted counters and {len(stale_threads)} drifted thread summaries'
+        ))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.seed import DEFAULT_SIZES, Seeder, already_seeded, scaled
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with synthetic seekers, companies, jobs, applications and messages'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (default 42)')
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every default size, e.g. 0.01 for a quick run')
+        for name, count in DEFAULT_SIZES.items():
+            parser.add_argument(f'--{name}', type=int, help=f'Number of {name} (default {count:,} times --scale)')
+
+    def handle(self, *args, **options):
+        if already_seeded():
+            raise CommandError('The database already holds seeded rows; seed a fresh copy instead.')
+        sizes = scaled(DEFAULT_SIZES, options['scale'])
+        sizes.update({name: options[name] for name in DEFAULT_SIZES if options[name] is not None})
+        Seeder(sizes, seed=options['seed'], log=self.stdout.write).run()
+        self.stdout.write(self.style.SUCCESS('Seeded ' + ', '.join(f'{count:,} {name}' for name, count in sizes.items())))
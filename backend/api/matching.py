@@ -0,0 +1,440 @@
+"""
+Skill-match scoring engine.
+
+Job requirements are encoded once into a sparse binary matrix (CSR layout held in
+plain NumPy arrays) over a shared skill vocabulary. Scoring a seeker against every
+open job is then a handful of vectorised array operations instead of a Python loop
+over the job table.
+
+The reverse direction (ranking seekers for a job) uses the same encoding of seeker
+skills plus an inverted index from skill to seekers, so a request only touches the
+seekers sharing at least one skill with the job. Both directions compare skills by
+``canonical_skill``, so an alias ("js") matches its skill ("javascript"). Jobs and
+seekers that change after the build are patched into a small overlay that is scored
+directly, so a save does not throw the whole matrix away; it is rebuilt once
+MAX_CHANGED_ROWS rows have been patched.
+
+The matrices are process-local. Each follows the version stamps (api/versions.py)
+of the rows it was built from: ``jobs`` or ``candidates``, and ``skills`` for the
+aliases. After a change commits, the writing process advances the stamp and patches
+its own copy; every other process sees a stamp it was not built under and rebuilds.
+"""
+import json
+import threading
+import time
+
+import numpy as np
+from django.utils import timezone
+
+from .models import Job, SkillAlias, User
+from .versions import advance, get_versions
+
+
+METRICS = ('cosine', 'jaccard')
+
+# Sentinel deadline for jobs without an application deadline (never expire)
+_NO_DEADLINE = np.iinfo(np.int32).max
+
+# Rows patched into a SkillMatrix or CandidateMatrix before it is rebuilt from scratch
+MAX_CHANGED_ROWS = 1000
+
+
+def normalize_skill(value):
+    """Canonical form of a skill/requirement token: case-folded, single-spaced"""
+    return ' '.join(str(value).split()).casefold()
+
+
+def canonical_skill(value):
+    """Canonical name of a skill in any spelling: normalized, with aliases (SkillAlias) resolved"""
+    term = normalize_skill(value)
+    return skill_aliases.get().get(term, term)
+
+
+def _load_aliases():
+    return {
+        normalize_skill(alias): normalize_skill(skill)
+        for alias, skill in SkillAlias.objects.values_list('name', 'skill__name').iterator()
+    }
+
+
+def parse_skills(value):
+    """Flatten a skills/requirements blob into a list of raw strings.
+
+    Handles the shapes found in the wild: a proper list, a JSON-encoded string,
+    and a list holding a single JSON-encoded list (multipart uploads).
+    """
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [value]
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], str) \
+            and value[0].lstrip().startswith('['):
+        try:
+            value = json.loads(value[0])
+        except ValueError:
+            pass
+    if not isinstance(value, list):
+        return []
+    flat = []
+    for item in value:
+        if isinstance(item, list):
+            flat.extend(str(i) for i in item)
+        elif item is not None:
+            flat.append(str(item))
+    return flat
+
+
+def _similarity(overlap, sizes, query_size, metric):
+    """Cosine or Jaccard similarity of binary vectors from overlap counts and sizes"""
+    if metric == 'cosine':
+        denom = np.sqrt(sizes * query_size)
+    else:
+        denom = sizes + query_size - overlap
+    return np.divide(overlap, denom, out=np.zeros(len(overlap), dtype=np.float64), where=denom > 0)
+
+
+def _best(scores, tiebreak, k):
+    """Positions of the ``k`` best scores, best first, ties by ascending ``tiebreak``"""
+    candidates = np.arange(len(scores))
+    if k < candidates.size:
+        # argpartition picks arbitrarily among scores tied with the k-th; keep all of them
+        threshold = scores[np.argpartition(-scores, k - 1)[k - 1]]
+        candidates = np.flatnonzero(scores >= threshold)
+    return candidates[np.lexsort((tiebreak[candidates], -scores[candidates]))][:k]
+
+
+def skill_terms(value):
+    """Unique canonical terms of a skills/requirements blob"""
+    terms = []
+    seen = set()
+    for raw in parse_skills(value):
+        term = canonical_skill(raw)
+        if term and term not in seen:
+            seen.add(term)
+            terms.append(term)
+    return terms
+
+
+class SkillMatrix:
+    """Job x skill incidence matrix in CSR form.
+
+    The arrays are built once. ``update`` records a job's new requirements and
+    deadline in an overlay that replaces its row in ``top_k``.
+    """
+
+    def __init__(self, rows):
+        vocabulary = {}
+        job_ids = []
+        deadlines = []
+        indptr = [0]
+        indices = []
+        for job_id, requirements, deadline in rows:
+            for term in skill_terms(requirements):
+                indices.append(vocabulary.setdefault(term, len(vocabulary)))
+            indptr.append(len(indices))
+            job_ids.append(job_id)
+            deadlines.append(deadline.toordinal() if deadline else _NO_DEADLINE)
+
+        self.vocabulary = vocabulary
+        self.job_ids = np.asarray(job_ids, dtype=np.int64)
+        self.deadlines = np.asarray(deadlines, dtype=np.int32)
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        # Row number of every stored entry, so overlaps reduce with one bincount
+        self.rows = np.repeat(np.arange(len(job_ids), dtype=np.int32), np.diff(self.indptr))
+        self.row_norms = np.diff(self.indptr).astype(np.float64)
+        self._lock = threading.Lock()
+        # ({job_id: (frozenset of terms, deadline ordinal), no terms if deleted}, those ids sorted),
+        # replaced whole on update so readers need no lock
+        self._changed = ({}, np.zeros(0, dtype=np.int64))
+
+    @classmethod
+    def from_db(cls):
+        rows = Job.objects.values_list('id', 'requirements', 'application_deadline').iterator(chunk_size=5000)
+        return cls(rows)
+
+    def __len__(self):
+        return len(self.job_ids)
+
+    @property
+    def changed(self):
+        """Number of jobs patched in by ``update``"""
+        return len(self._changed[0])
+
+    def update(self, job_id, requirements, deadline):
+        """Replace the row of job ``job_id``; None requirements drop it (a deleted job)"""
+        row = frozenset(skill_terms(requirements or [])), deadline.toordinal() if deadline else _NO_DEADLINE
+        with self._lock:
+            changed = {**self._changed[0], job_id: row}
+            self._changed = changed, np.sort(np.fromiter(changed, dtype=np.int64, count=len(changed)))
+
+    def encode(self, skills):
+        """Vocabulary columns of a seeker's skills; unknown skills are dropped"""
+        columns = {self.vocabulary[t] for t in skill_terms(skills) if t in self.vocabulary}
+        return np.fromiter(columns, dtype=np.int32, count=len(columns))
+
+    def score(self, skills, metric='cosine', today=None):
+        """Similarity of ``skills`` against every built job row, 0 for closed jobs"""
+        if metric not in METRICS:
+            raise ValueError(f'Unknown metric {metric!r}')
+        n_jobs = len(self)
+        user_size = len(skill_terms(skills))
+        columns = self.encode(skills)
+        if not n_jobs or not columns.size:
+            return np.zeros(n_jobs, dtype=np.float64)
+
+        mask = np.zeros(len(self.vocabulary), dtype=bool)
+        mask[columns] = True
+        overlap = np.bincount(self.rows[mask[self.indices]], minlength=n_jobs).astype(np.float64)
+        scores = _similarity(overlap, self.row_norms, user_size, metric)
+
+        today = (today or timezone.localdate()).toordinal()
+        scores[self.deadlines < today] = 0.0
+        return scores
+
+    def top_k(self, skills, k, metric='cosine', today=None):
+        """Best ``k`` job ids and scores (best first) plus the number of matching jobs"""
+        today = today or timezone.localdate()
+        scores = self.score(skills, metric=metric, today=today)
+        changed, changed_ids = self._changed
+        if changed:
+            # Patched jobs are scored from the overlay instead of their built row
+            scores[np.isin(self.job_ids, changed_ids)] = 0.0
+        candidates = np.flatnonzero(scores > 0)
+        ids, scores = self.job_ids[candidates], scores[candidates]
+        if changed:
+            wanted = set(skill_terms(skills))
+            patched = [
+                (job_id, len(wanted & terms), len(terms))
+                for job_id, (terms, deadline) in changed.items()
+                if deadline >= today.toordinal() and not wanted.isdisjoint(terms)
+            ]
+            if patched:
+                patched_ids, overlap, sizes = (np.asarray(column) for column in zip(*patched))
+                ids = np.concatenate((ids, patched_ids.astype(np.int64)))
+                scores = np.concatenate((scores, _similarity(
+                    overlap.astype(np.float64), sizes.astype(np.float64), len(wanted), metric,
+                )))
+        # Ties go to the newest job
+        best = _best(scores, -ids, k)
+        return ids[best].tolist(), scores[best].tolist(), int(ids.size)
+
+
+class CandidateMatrix:
+    """Seeker x skill matrix with an inverted (skill -> seekers) index.
+
+    The arrays are built once. ``update`` records a seeker's new skills in an
+    overlay that replaces their row when scoring.
+    """
+
+    def __init__(self, rows):
+        vocabulary = {}
+        user_ids = []
+        sizes = []
+        indices = []
+        for user_id, skills in rows:
+            terms = skill_terms(skills)
+            if not terms:
+                continue
+            indices.extend(vocabulary.setdefault(term, len(vocabulary)) for term in terms)
+            user_ids.append(user_id)
+            sizes.append(len(terms))
+
+        self.vocabulary = vocabulary
+        self.user_ids = np.asarray(user_ids, dtype=np.int64)  # ascending
+        self.sizes = np.asarray(sizes, dtype=np.float64)
+        indices = np.asarray(indices, dtype=np.int32)
+        rows = np.repeat(np.arange(len(user_ids), dtype=np.int32), self.sizes.astype(np.int64))
+        # Posting lists: seeker rows of skill c are postings[posting_ptr[c]:posting_ptr[c + 1]]
+        order = np.argsort(indices, kind='stable')
+        self.postings = rows[order]
+        self.posting_ptr = np.concatenate(([0], np.cumsum(np.bincount(indices, minlength=len(vocabulary)))))
+        self._lock = threading.Lock()
+        # ({user_id: frozenset of terms, empty if no longer a candidate}, those ids sorted), replaced
+        # whole on update so readers need no lock
+        self._changed = ({}, np.zeros(0, dtype=np.int64))
+        self._length = len(user_ids)
+
+    @classmethod
+    def from_db(cls):
+        rows = (
+            User.objects.filter(company_profile__isnull=True)
+            .order_by('id').values_list('id', 'skills').iterator(chunk_size=5000)
+        )
+        return cls(rows)
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def changed(self):
+        """Number of seekers patched in by ``update``"""
+        return len(self._changed[0])
+
+    def update(self, user_id, skills):
+        """Replace the row of seeker ``user_id``; no skills (or None) drops them"""
+        terms = frozenset(skill_terms(skills or []))
+        with self._lock:
+            changed, _ = self._changed
+            was_candidate = bool(changed[user_id]) if user_id in changed else self._built(user_id)
+            changed = {**changed, user_id: terms}
+            self._changed = changed, np.sort(np.fromiter(changed, dtype=np.int64, count=len(changed)))
+            self._length += bool(terms) - was_candidate
+
+    def _built(self, user_id):
+        position = np.searchsorted(self.user_ids, user_id)
+        return bool(position < len(self.user_ids) and self.user_ids[position] == user_id)
+
+    def scores(self, requirements, metric='cosine'):
+        """``(user_ids, scores)`` of every seeker sharing a skill with ``requirements``, ids ascending"""
+        if metric not in METRICS:
+            raise ValueError(f'Unknown metric {metric!r}')
+        terms = skill_terms(requirements)
+        changed, changed_ids = self._changed
+        columns = [self.vocabulary[t] for t in terms if t in self.vocabulary]
+        if columns:
+            hits = np.concatenate([self.postings[self.posting_ptr[c]:self.posting_ptr[c + 1]] for c in columns])
+            rows, overlap = np.unique(hits, return_counts=True)
+            ids = self.user_ids[rows]
+            scores = _similarity(overlap.astype(np.float64), self.sizes[rows], len(terms), metric)
+        else:
+            ids, scores = np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float64)
+        if not changed:
+            return ids, scores
+
+        # Patched seekers are scored from the overlay instead of their built row
+        kept = ~np.isin(ids, changed_ids)
+        wanted = set(terms)
+        patched = sorted(
+            (user_id, len(wanted & user_terms), len(user_terms))
+            for user_id, user_terms in changed.items() if not wanted.isdisjoint(user_terms)
+        )
+        if not patched:
+            return ids[kept], scores[kept]
+        patched_ids, overlap, sizes = (np.asarray(column) for column in zip(*patched))
+        patched_scores = _similarity(overlap.astype(np.float64), sizes.astype(np.float64), len(terms), metric)
+        ids = np.concatenate((ids[kept], patched_ids.astype(np.int64)))
+        scores = np.concatenate((scores[kept], patched_scores))
+        order = np.argsort(ids, kind='stable')
+        return ids[order], scores[order]
+
+    def top_k(self, requirements, k, metric='cosine', user_ids=None):
+        """Best ``k`` seeker ids and scores (best first) plus the number ranked.
+
+        With ``user_ids`` only those users are ranked, including ones with no
+        matching skill (score 0); otherwise every seeker with a non-zero score.
+        """
+        matched_ids, scores = self.scores(requirements, metric=metric)
+        if user_ids is None:
+            ids = matched_ids
+        else:
+            ids = np.unique(np.asarray(user_ids, dtype=np.int64))
+            matched = np.zeros(len(ids), dtype=np.float64)
+            position = np.searchsorted(ids, matched_ids)
+            inside = position < len(ids)
+            inside[inside] = ids[position[inside]] == matched_ids[inside]
+            matched[position[inside]] = scores[inside]
+            scores = matched
+        best = _best(scores, ids, k)
+        return ids[best].tolist(), scores[best].tolist(), len(ids)
+
+
+class _MatrixCache:
+    """Process-local matrix, rebuilt lazily by ``build`` after its source rows change.
+
+    ``follows`` names the version stamps of those rows; a matrix built under other
+    stamps than the current ones is rebuilt. They are read at most once every
+    ``recheck`` seconds.
+    """
+
+    def __init__(self, build, follows=(), recheck=0.0):
+        self._build = build
+        self._follows = follows
+        self._recheck = recheck
+        self._lock = threading.Lock()
+        self._matrix = None
+        self._versions = None
+        self._read = (float('-inf'), None)
+        self._generation = 0
+
+    def _current_versions(self):
+        read_at, versions = self._read
+        now = time.monotonic()
+        if now - read_at >= self._recheck:
+            versions = get_versions(self._follows)
+            self._read = now, versions
+        return versions
+
+    def get(self):
+        # Read before building, so a change committed during the build is seen next time
+        versions = self._current_versions()
+        matrix = self._matrix
+        if matrix is None or versions != self._versions:
+            with self._lock:
+                generation = self._generation
+                if self._matrix is not None and versions == self._versions:
+                    return self._matrix
+                matrix = self._build()
+                # Only publish if nothing changed while we were building
+                if generation == self._generation:
+                    self._matrix, self._versions = matrix, versions
+        return matrix
+
+    def update(self, name, version, *args):
+        """Patch the built matrix (see its ``update``) for the change that advanced stamp ``name`` to ``version``.
+
+        The matrix is dropped instead if any other change came in between, or once
+        too many rows are patched.
+        """
+        self._generation += 1
+        matrix, versions = self._matrix, self._versions
+        if matrix is None:
+            return
+        position = self._follows.index(name)
+        if version is None or version != versions[position] + 1 or matrix.changed >= MAX_CHANGED_ROWS:
+            self._matrix = None
+        else:
+            matrix.update(*args)
+            self._versions = [*versions[:position], version, *versions[position + 1:]]
+
+    def invalidate(self):
+        self._generation += 1
+        self._matrix = None
+        # The rebuild reads the stamps afresh
+        self._read = (float('-inf'), None)
+
+
+# {normalized alias: canonical skill name}; shares the lazy cache, though it is no matrix.
+# Looked up once per skill term, so its stamp is read at most once a second.
+skill_aliases = _MatrixCache(_load_aliases, follows=('skills',), recheck=1.0)
+skill_matrix = _MatrixCache(SkillMatrix.from_db, follows=('jobs', 'skills'))
+candidate_matrix = _MatrixCache(CandidateMatrix.from_db, follows=('candidates', 'skills'))
+
+
+def refresh_job(job_id, version):
+    """Patch ``job_id``'s row of the job matrix from the database for the change that advanced ``jobs`` to ``version``"""
+    row = Job.objects.filter(pk=job_id).values_list('requirements', 'application_deadline').first()
+    requirements, deadline = row or (None, None)
+    skill_matrix.update('jobs', version, job_id, requirements, deadline)
+
+
+def refresh_candidate(user_id):
+    """Patch ``user_id``'s row of the candidate matrix from the database; dropped unless a seeker"""
+    skills = (
+        User.objects.filter(pk=user_id, company_profile__isnull=True)
+        .values_list('skills', flat=True).first()
+    )
+    candidate_matrix.update('candidates', advance('candidates'), user_id, skills)
+
+
+def recommend_jobs(skills, limit, offset=0, metric='cosine'):
+    """Return ``(page, total)`` where page is a list of (job_id, score) pairs"""
+    job_ids, scores, total = skill_matrix.get().top_k(skills, offset + limit, metric=metric)
+    return list(zip(job_ids, scores))[offset:offset + limit], total
+
+
+def rank_candidates(requirements, limit, offset=0, metric='cosine', user_ids=None):
+    """Return ``(page, total)`` where page is a list of (user_id, score) pairs"""
+    ids, scores, total = candidate_matrix.get().top_k(requirements, offset + limit, metric=metric, user_ids=user_ids)
+    return list(zip(ids, scores))[offset:offset + limit], total
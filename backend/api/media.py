@@ -0,0 +1,230 @@
+"""
+Uploaded file downloads.
+
+MEDIA_URL points at ``api/media/``, so every upload URL the API hands out (logos,
+profile pictures, their derivatives and resumes) is served by ``serve_media``.
+Images are public. Files under ``resumes/`` can be read only by their owner, by
+companies the owner has applied to, and by staff. Anyone else gets a 404, so the
+endpoint does not reveal which resumes exist. Links opened in a new tab cannot send
+an Authorization header, so the access token may also be passed as ``?token=``.
+
+Responses carry a strong ETag and a Last-Modified date taken from the file's size
+and mtime. Conditional requests are answered with 304. A single byte range
+(``Range``, checked against ``If-Range``) is answered with 206. Whole files are
+handed to FileResponse open, so WSGI servers with a ``wsgi.file_wrapper`` (gunicorn,
+uWSGI) send them with sendfile(2). ASGI has no sendfile, and Django reads a synchronous
+FileResponse whole into memory before sending it, so under ASGI the file is streamed by
+an async iterator in CHUNK_SIZE reads instead. Storage never overwrites an uploaded name; it
+appends a suffix instead. So images are cached for a year as immutable. Resumes are
+cached only privately and briefly, because access to them can be withdrawn.
+
+With ``MEDIA_ACCEL`` set, Django only authorizes the request and returns headers.
+The front proxy sends the bytes, ranges included: ``x-accel-redirect`` for nginx (an
+``internal`` location at ``MEDIA_ACCEL_PREFIX`` aliased to MEDIA_ROOT) or
+``x-sendfile`` for Apache and lighttpd.
+"""
+import mimetypes
+import os
+import posixpath
+import re
+import stat
+from urllib.parse import quote
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework.authentication import SessionAuthentication
+from rest_framework.decorators import api_view, authentication_classes, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .authentication import QueryTokenJWTAuthentication, user_company_id
+from .models import JobApplication, User
+
+
+PROTECTED_PREFIXES = ('resumes/',)
+PUBLIC_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+PRIVATE_CACHE_CONTROL = 'private, max-age=3600'
+# Shown in the browser; anything else (HTML, SVG, text, ...) is sent as an attachment
+INLINE_TYPES = {'application/pdf', 'image/gif', 'image/jpeg', 'image/png', 'image/webp'}
+CHUNK_SIZE = 64 * 1024
+
+ACCEL_HEADERS = {'x-accel-redirect': 'X-Accel-Redirect', 'x-sendfile': 'X-Sendfile'}
+
+_RANGE = re.compile(r'bytes=(\d*)-(\d*)')
+
+
+class UnsatisfiableRange(Exception):
+    pass
+
+
+def clean_name(name):
+    """``name`` normalized, or None if it is absolute or has empty, ``.`` or ``..`` segments"""
+    # Authorization is decided on the name, so it must be the name of the file that is served:
+    # 'company_logos/../resumes/x.pdf' would otherwise pass as a public image.
+    if name.startswith('/') or '\\' in name or '\0' in name:
+        return None
+    if any(segment in ('', '.', '..') for segment in name.split('/')):
+        return None
+    return posixpath.normpath(name)
+
+
+def can_read(user, name):
+    """Whether ``user`` may download the upload stored as ``name``"""
+    if not name.startswith(PROTECTED_PREFIXES):
+        return True
+    if not user.is_authenticated:
+        return False
+    if user.is_staff:
+        return True
+    owner_id = User.objects.filter(resume=name).values_list('id', flat=True).first()
+    if owner_id is None:
+        return False
+    if owner_id == user.id:
+        return True
+    company_id = user_company_id(user)
+    return company_id is not None and JobApplication.objects.filter(
+        applicant_id=owner_id, job__company_id=company_id,
+    ).exists()
+
+
+def parse_range(header, size):
+    """Inclusive ``(start, end)`` of a single-range header, or None to send the whole file"""
+    match = _RANGE.fullmatch(header.strip())
+    # Multiple ranges and malformed headers may be ignored (RFC 9110, 14.2)
+    if not match or match.group(1) == match.group(2) == '':
+        return None
+    first, last = match.groups()
+    if first == '':
+        suffix = int(last)
+        if suffix == 0 or size == 0:
+            raise UnsatisfiableRange()
+        return max(size - suffix, 0), size - 1
+    start = int(first)
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise UnsatisfiableRange()
+    return start, min(int(last), size - 1) if last else size - 1
+
+
+class _Slice:
+    """The next ``length`` bytes of an open file; no fileno, so sendfile wrappers read() it rather than send it all"""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+async def _async_read(file):
+    """Async iterator over ``file`` in CHUNK_SIZE reads, each in a worker thread"""
+    # Not thread-sensitive: concurrent downloads should not queue on one thread
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(CHUNK_SIZE):
+        yield chunk
+
+
+def _content_type(name):
+    content_type, encoding = mimetypes.guess_type(name)
+    # A .gz upload is served as the compressed bytes it is
+    if content_type is None or encoding is not None:
+        return 'application/octet-stream'
+    return content_type
+
+
+def _accel_response(mode, name, path):
+    if mode not in ACCEL_HEADERS:
+        raise ImproperlyConfigured(f'MEDIA_ACCEL must be one of {sorted(ACCEL_HEADERS)} or empty, not {mode!r}')
+    response = HttpResponse()
+    response[ACCEL_HEADERS[mode]] = settings.MEDIA_ACCEL_PREFIX + quote(name) if mode == 'x-accel-redirect' else path
+    return response
+
+
+def _file_response(request, path, size, etag, mtime):
+    header = request.headers.get('Range')
+    if_range = request.headers.get('If-Range')
+    byte_range = None
+    if header and (if_range is None or if_range in (etag, http_date(mtime))):
+        try:
+            byte_range = parse_range(header, size)
+        except UnsatisfiableRange:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    if request.method == 'HEAD':
+        response = HttpResponse()
+        response['Content-Length'] = size
+        return response
+    file = open(path, 'rb')
+    if byte_range is None:
+        response = FileResponse(file)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        # Open ranges keep the file itself: FileResponse sizes it from the position
+        response = FileResponse(file if end == size - 1 else _Slice(file, end - start + 1), status=206)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.block_size = CHUNK_SIZE
+    if isinstance(request._request, ASGIRequest):
+        # Keeps the headers FileResponse set and the file among the closers
+        response.streaming_content = _async_read(response.file_to_stream)
+    return response
+
+
+@api_view(['GET', 'HEAD'])
+@authentication_classes([QueryTokenJWTAuthentication, SessionAuthentication])
+@permission_classes([AllowAny])
+def serve_media(request, name):
+    """Download an uploaded file; resumes only for their owner and companies they applied to"""
+    not_found = Response({'detail': 'Not found.'}, status=404)
+    name = clean_name(name)
+    if name is None or not can_read(request.user, name):
+        return not_found
+    try:
+        path = default_storage.path(name)
+        info = os.stat(path)
+    except (SuspiciousFileOperation, OSError):
+        return not_found
+    if not stat.S_ISREG(info.st_mode):
+        return not_found
+
+    etag = f'"{info.st_mtime_ns:x}-{info.st_size:x}"'
+    mtime = int(info.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=mtime)
+    if response is None:
+        if settings.MEDIA_ACCEL:
+            response = _accel_response(settings.MEDIA_ACCEL, name, path)
+        else:
+            response = _file_response(request, path, info.st_size, etag, mtime)
+
+    content_type = _content_type(name)
+    if response.status_code in (200, 206):
+        response['Content-Type'] = content_type
+        disposition = 'inline' if content_type in INLINE_TYPES else 'attachment'
+        response['Content-Disposition'] = f"{disposition}; filename*=UTF-8''{quote(os.path.basename(name))}"
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(mtime)
+    if name.startswith(PROTECTED_PREFIXES):
+        response['Cache-Control'] = PRIVATE_CACHE_CONTROL
+        # Keep ?token= out of the Referer of anything the file links to
+        response['Referrer-Policy'] = 'no-referrer'
+    else:
+        response['Cache-Control'] = PUBLIC_CACHE_CONTROL
+    return response
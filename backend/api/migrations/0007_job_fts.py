@@ -0,0 +1,73 @@
+from django.db import migrations
+
+
+# Full-text index over jobs, kept in sync by triggers so bulk writes are covered too.
+# rowid is the job id; list fields are flattened to space-separated text.
+JOB_FTS_COLUMNS = """
+    NEW.title,
+    NEW.description,
+    COALESCE((SELECT group_concat(value, ' ') FROM json_each(NEW.requirements)), ''),
+    COALESCE((SELECT group_concat(value, ' ') FROM json_each(NEW.benefits)), ''),
+    NEW.location,
+    COALESCE(json_extract(NEW.company_snapshot, '$.company_name'), '')
+"""
+
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE api_job_fts USING fts5(
+        title, description, requirements, benefits, location, company_name,
+        tokenize = 'unicode61 remove_diacritics 2',
+        prefix = '2 3'
+    )
+    """,
+    f"""
+    CREATE TRIGGER api_job_fts_insert AFTER INSERT ON api_job BEGIN
+        INSERT INTO api_job_fts(rowid, title, description, requirements, benefits, location, company_name)
+        VALUES (NEW.id, {JOB_FTS_COLUMNS});
+    END
+    """,
+    f"""
+    CREATE TRIGGER api_job_fts_update AFTER UPDATE ON api_job BEGIN
+        DELETE FROM api_job_fts WHERE rowid = OLD.id;
+        INSERT INTO api_job_fts(rowid, title, description, requirements, benefits, location, company_name)
+        VALUES (NEW.id, {JOB_FTS_COLUMNS});
+    END
+    """,
+    """
+    CREATE TRIGGER api_job_fts_delete AFTER DELETE ON api_job BEGIN
+        DELETE FROM api_job_fts WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    INSERT INTO api_job_fts(rowid, title, description, requirements, benefits, location, company_name)
+    SELECT NEW.id, {JOB_FTS_COLUMNS} FROM api_job AS NEW
+    """,
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS api_job_fts_delete",
+    "DROP TRIGGER IF EXISTS api_job_fts_update",
+    "DROP TRIGGER IF EXISTS api_job_fts_insert",
+    "DROP TABLE IF EXISTS api_job_fts",
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        # FTS5 is SQLite-only; other backends fall back to LIKE search
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_message'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
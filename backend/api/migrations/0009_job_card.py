@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:02
+
+from django.db import migrations, models
+from rest_framework import serializers
+
+
+# The card and company info below are copies of api.cards as of this migration, which
+# must not change with it.
+CARD_BATCH_SIZE = 500
+
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+
+def company_info(company):
+    return {
+        'company_name': company.company_name,
+        'industry': company.industry,
+        'description': company.description,
+        'logo': company.logo.url if company.logo else None,
+        'linkedin': company.linkedin,
+        'portfolio': company.portfolio,
+    }
+
+
+def build_card(job, info):
+    return {
+        'id': job.id,
+        'company': job.company_id,
+        'company_info': info,
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'location': job.location,
+        'posted_at': _datetime_field.to_representation(job.posted_at),
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max,
+        'salary_type': job.salary_type,
+        'employment_type': job.employment_type,
+        'experience_level': job.experience_level,
+        'application_deadline': _date_field.to_representation(job.application_deadline),
+        'benefits': job.benefits,
+        'is_remote': job.is_remote,
+        'company_snapshot': job.company_snapshot,
+        'other_details': job.other_details,
+    }
+
+
+def build_cards(apps, schema_editor):
+    CompanyProfile = apps.get_model('api', 'CompanyProfile')
+    Job = apps.get_model('api', 'Job')
+    for company in CompanyProfile.objects.all().iterator():
+        info = company_info(company)
+        batch = []
+        for job in Job.objects.filter(company=company).iterator(chunk_size=CARD_BATCH_SIZE):
+            job.card = build_card(job, info)
+            batch.append(job)
+            if len(batch) >= CARD_BATCH_SIZE:
+                Job.objects.bulk_update(batch, ['card'])
+                batch = []
+        Job.objects.bulk_update(batch, ['card'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_job_posted_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='card',
+            field=models.JSONField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(build_cards, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:03
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def build_threads(apps, schema_editor):
+    JobApplication = apps.get_model('api', 'JobApplication')
+    Message = apps.get_model('api', 'Message')
+    MessageThread = apps.get_model('api', 'MessageThread')
+    threads = []
+    for application in JobApplication.objects.select_related('job__company').iterator():
+        applicant_id = application.applicant_id
+        company_user_id = application.job.company.user_id
+        last = Message.objects.filter(application=application).order_by('-timestamp', '-id').first()
+        pairs = {(applicant_id, company_user_id), (company_user_id, applicant_id)}
+        for participant_id, other_id in pairs:
+            threads.append(MessageThread(
+                application=application,
+                participant_id=participant_id,
+                other_user_id=other_id,
+                last_message=last.text if last else None,
+                last_message_time=last.timestamp if last else None,
+                unread_count=Message.objects.filter(application=application, is_read=False)
+                .exclude(sender_id=participant_id).count(),
+                activity_at=last.timestamp if last else application.applied_at,
+            ))
+    MessageThread.objects.bulk_create(threads, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_job_card'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MessageThread',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_message', models.TextField(blank=True, null=True)),
+                ('last_message_time', models.DateTimeField(blank=True, null=True)),
+                ('unread_count', models.PositiveIntegerField(default=0)),
+                ('activity_at', models.DateTimeField()),
+                ('application', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='threads', to='api.jobapplication')),
+                ('other_user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('participant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='message_threads', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['participant', '-activity_at', '-id'], name='thread_activity_idx')],
+                'constraints': [models.UniqueConstraint(fields=('application', 'participant'), name='unique_thread_participant')],
+            },
+        ),
+        migrations.RunPython(build_threads, migrations.RunPython.noop),
+    ]
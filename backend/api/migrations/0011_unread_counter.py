@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:04
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def count_unread(apps, schema_editor):
+    Message = apps.get_model('api', 'Message')
+    UnreadCounter = apps.get_model('api', 'UnreadCounter')
+    counts = {}
+    unread = Message.objects.filter(is_read=False)
+    for recipient in ('application__applicant', 'application__job__company__user'):
+        rows = unread.exclude(sender=F(recipient)).values_list(recipient).annotate(n=Count('id')).order_by()
+        for user_id, n in rows:
+            counts[user_id] = counts.get(user_id, 0) + n
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, count=n) for user_id, n in counts.items()], batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_message_thread'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(count_unread, migrations.RunPython.noop),
+    ]
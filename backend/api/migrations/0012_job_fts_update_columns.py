@@ -0,0 +1,54 @@
+from django.db import migrations
+
+
+# Re-index a job only when an indexed column changes, so card and other bookkeeping
+# writes (e.g. refreshing every card of a company, bulk imports) skip the FTS table.
+JOB_FTS_COLUMNS = """
+    NEW.title,
+    NEW.description,
+    COALESCE((SELECT group_concat(value, ' ') FROM json_each(NEW.requirements)), ''),
+    COALESCE((SELECT group_concat(value, ' ') FROM json_each(NEW.benefits)), ''),
+    NEW.location,
+    COALESCE(json_extract(NEW.company_snapshot, '$.company_name'), '')
+"""
+
+UPDATE_TRIGGER = """
+    CREATE TRIGGER api_job_fts_update AFTER UPDATE {columns}ON api_job BEGIN
+        DELETE FROM api_job_fts WHERE rowid = OLD.id;
+        INSERT INTO api_job_fts(rowid, title, description, requirements, benefits, location, company_name)
+        VALUES (NEW.id, {values});
+    END
+"""
+
+FORWARD_SQL = [
+    "DROP TRIGGER IF EXISTS api_job_fts_update",
+    UPDATE_TRIGGER.format(
+        columns='OF title, description, requirements, benefits, location, company_snapshot ',
+        values=JOB_FTS_COLUMNS,
+    ),
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS api_job_fts_update",
+    UPDATE_TRIGGER.format(columns='', values=JOB_FTS_COLUMNS),
+]
+
+
+def _run(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_unread_counter'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,198 @@
+# Generated by Django 5.2.18 on 2026-10-18 19:57
+
+import json
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# The aliases seeded below; edit them in the admin afterwards. This and the helpers are
+# copies of api.skills and api.matching as of this migration, which must not change
+# with them.
+SYNONYMS = {
+    'js': 'javascript',
+    'ecmascript': 'javascript',
+    'ts': 'typescript',
+    'reactjs': 'react',
+    'react.js': 'react',
+    'vuejs': 'vue',
+    'vue.js': 'vue',
+    'angularjs': 'angular',
+    'node': 'node.js',
+    'nodejs': 'node.js',
+    'golang': 'go',
+    'python3': 'python',
+    'postgres': 'postgresql',
+    'mongo': 'mongodb',
+    'k8s': 'kubernetes',
+    'amazon web services': 'aws',
+    'google cloud': 'gcp',
+    'google cloud platform': 'gcp',
+    'microsoft azure': 'azure',
+    'ruby on rails': 'rails',
+    'ror': 'rails',
+    'csharp': 'c#',
+    'cpp': 'c++',
+    'dotnet': '.net',
+    'ml': 'machine learning',
+    'html5': 'html',
+    'css3': 'css',
+    'tailwindcss': 'tailwind',
+    'cicd': 'ci/cd',
+    'restful': 'rest',
+    'rest api': 'rest',
+    'powerbi': 'power bi',
+}
+
+MAX_NAME_LENGTH = 100
+MAX_ENCODING_DEPTH = 5
+LINK_BATCH_SIZE = 1000
+
+
+def normalize(value):
+    return ' '.join(str(value).split()).casefold()
+
+
+def parse_skills(value):
+    if isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            value = [value]
+    if isinstance(value, list) and len(value) == 1 and isinstance(value[0], str) \
+            and value[0].lstrip().startswith('['):
+        try:
+            value = json.loads(value[0])
+        except ValueError:
+            pass
+    if not isinstance(value, list):
+        return []
+    flat = []
+    for item in value:
+        if isinstance(item, list):
+            flat.extend(str(i) for i in item)
+        elif item is not None:
+            flat.append(str(item))
+    return flat
+
+
+def unwrap(items):
+    for _ in range(MAX_ENCODING_DEPTH):
+        text = ','.join(items)
+        if not text.lstrip().startswith(('[', '"')):
+            break
+        try:
+            value = json.loads(text)
+        except ValueError:
+            break
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            break
+        items = [str(item) for item in value if item is not None]
+    return items
+
+
+def canonical(text):
+    term = normalize(text)
+    return SYNONYMS.get(term, term)
+
+
+def clean_skills(value):
+    cleaned = []
+    seen = set()
+    for raw in unwrap(parse_skills(value)):
+        text = ' '.join(raw.split())
+        term = canonical(text)
+        if term and term not in seen:
+            seen.add(term)
+            cleaned.append(text)
+    return cleaned
+
+
+def link_skills(model, field, Skill, SkillAlias):
+    skill_set = model._meta.get_field('skill_set')
+    through, source = skill_set.remote_field.through, skill_set.m2m_field_name()
+    ids = dict(SkillAlias.objects.values_list('name', 'skill_id'))
+    ids.update(Skill.objects.values_list('name', 'id'))
+    links = []
+    for pk, blob in model.objects.order_by('pk').values_list('pk', field).iterator():
+        for term in {canonical(skill) for skill in clean_skills(blob)}:
+            if len(term) > MAX_NAME_LENGTH:
+                continue
+            if term not in ids:
+                ids[term] = Skill.objects.create(name=term).id
+            links.append(through(**{f'{source}_id': pk, 'skill_id': ids[term]}))
+        if len(links) >= LINK_BATCH_SIZE:
+            through.objects.bulk_create(links, ignore_conflicts=True)
+            links = []
+    through.objects.bulk_create(links, ignore_conflicts=True)
+
+
+def build_taxonomy(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    Job = apps.get_model('api', 'Job')
+    Skill = apps.get_model('api', 'Skill')
+    SkillAlias = apps.get_model('api', 'SkillAlias')
+
+    canonical_skills = {name: Skill.objects.create(name=name) for name in sorted(set(SYNONYMS.values()))}
+    SkillAlias.objects.bulk_create(
+        [SkillAlias(name=alias, skill=canonical_skills[name]) for alias, name in SYNONYMS.items()]
+    )
+
+    # Flatten double-encoded blobs and drop blank and repeated entries
+    for user_id, skills in User.objects.exclude(skills=None).values_list('id', 'skills').iterator():
+        cleaned = clean_skills(skills)
+        if cleaned != skills:
+            User.objects.filter(pk=user_id).update(skills=cleaned)
+    for job_id, requirements, card in (
+        Job.objects.exclude(requirements=None).values_list('id', 'requirements', 'card').iterator()
+    ):
+        cleaned = clean_skills(requirements)
+        if cleaned != requirements:
+            # Cards embed the requirements
+            if card is not None:
+                card['requirements'] = cleaned
+            Job.objects.filter(pk=job_id).update(requirements=cleaned, card=card)
+
+    link_skills(User, 'skills', Skill, SkillAlias)
+    link_skills(Job, 'requirements', Skill, SkillAlias)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_query_plan_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Skill',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='job',
+            name='skill_set',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='jobs', to='api.skill'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='skill_set',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='users', to='api.skill'),
+        ),
+        migrations.CreateModel(
+            name='SkillAlias',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('skill', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='aliases', to='api.skill')),
+            ],
+            options={
+                'verbose_name_plural': 'skill aliases',
+            },
+        ),
+        migrations.RunPython(build_taxonomy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,108 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:03
+
+from django.core.files.storage import default_storage
+from django.db import migrations, models
+from rest_framework import serializers
+
+
+# Uploads moved from /media/ to MEDIA_URL /api/media/. The card and company info below
+# are copies of api.cards and api.images as of this migration, which must not change
+# with them.
+OLD_MEDIA_URL = '/media/'
+NEW_MEDIA_URL = '/api/media/'
+CARD_BATCH_SIZE = 500
+DERIVATIVE_SIZES = ('small', 'medium', 'large')
+
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+
+def derivative_urls(derivatives):
+    if not derivatives:
+        return None
+    return {
+        size: {fmt: default_storage.url(name) for fmt, name in files.items()}
+        for size, files in derivatives.items()
+        if size in DERIVATIVE_SIZES
+    }
+
+
+def company_info(company):
+    return {
+        'company_name': company.company_name,
+        'industry': company.industry,
+        'description': company.description,
+        'logo': company.logo.url if company.logo else None,
+        'logo_derivatives': derivative_urls(company.logo_derivatives),
+        'linkedin': company.linkedin,
+        'portfolio': company.portfolio,
+    }
+
+
+def build_card(job, info):
+    return {
+        'id': job.id,
+        'company': job.company_id,
+        'company_info': info,
+        'title': job.title,
+        'description': job.description,
+        'requirements': job.requirements,
+        'location': job.location,
+        'posted_at': _datetime_field.to_representation(job.posted_at),
+        'salary_min': job.salary_min,
+        'salary_max': job.salary_max,
+        'salary_type': job.salary_type,
+        'employment_type': job.employment_type,
+        'experience_level': job.experience_level,
+        'application_deadline': _date_field.to_representation(job.application_deadline),
+        'benefits': job.benefits,
+        'is_remote': job.is_remote,
+        'company_snapshot': job.company_snapshot,
+        'other_details': job.other_details,
+    }
+
+
+def moved_snapshot(snapshot):
+    """``snapshot`` with its logo under the new MEDIA_URL, or None if it has none to move"""
+    logo = (snapshot or {}).get('logo')
+    if not isinstance(logo, str) or not logo.startswith(OLD_MEDIA_URL):
+        return None
+    return {**snapshot, 'logo': NEW_MEDIA_URL + logo[len(OLD_MEDIA_URL):]}
+
+
+def rebuild_cards(apps, schema_editor):
+    # Stored cards embed logo URLs: the company's own and the one in each job's
+    # company_snapshot, taken when the job was posted
+    CompanyProfile = apps.get_model('api', 'CompanyProfile')
+    Job = apps.get_model('api', 'Job')
+    for company in CompanyProfile.objects.all().iterator():
+        info = company_info(company)
+        batch = []
+        for job in Job.objects.filter(company=company).iterator(chunk_size=CARD_BATCH_SIZE):
+            snapshot = moved_snapshot(job.company_snapshot)
+            if snapshot is None and not company.logo:
+                continue
+            if snapshot is not None:
+                job.company_snapshot = snapshot
+            job.card = build_card(job, info)
+            batch.append(job)
+            if len(batch) >= CARD_BATCH_SIZE:
+                Job.objects.bulk_update(batch, ['company_snapshot', 'card'])
+                batch = []
+        Job.objects.bulk_update(batch, ['company_snapshot', 'card'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_skill_taxonomy'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='resume',
+            field=models.FileField(blank=True, db_index=True, null=True, upload_to='resumes/'),
+        ),
+        migrations.RunPython(rebuild_cards, migrations.RunPython.noop),
+    ]
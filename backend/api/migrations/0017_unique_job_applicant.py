@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:13
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def merge_duplicate_applications(apps, schema_editor):
+    # Keep each seeker's first application to a job and move the messages of later
+    # duplicates onto it, then resummarize the kept application's threads. Unread
+    # totals per user are unchanged: the messages keep their sender and recipient.
+    JobApplication = apps.get_model('api', 'JobApplication')
+    Message = apps.get_model('api', 'Message')
+    MessageThread = apps.get_model('api', 'MessageThread')
+
+    groups = (
+        JobApplication.objects.values('job_id', 'applicant_id')
+        .annotate(rows=Count('id'), keep=Min('id'))
+        .filter(rows__gt=1)
+    )
+    for group in groups:
+        duplicates = list(
+            JobApplication.objects.filter(job_id=group['job_id'], applicant_id=group['applicant_id'])
+            .exclude(id=group['keep']).values_list('id', flat=True)
+        )
+        Message.objects.filter(application_id__in=duplicates).update(application_id=group['keep'])
+        JobApplication.objects.filter(id__in=duplicates).delete()
+
+        messages = Message.objects.filter(application_id=group['keep'])
+        last = messages.order_by('-timestamp', '-id').first()
+        for thread in MessageThread.objects.filter(application_id=group['keep']):
+            thread.unread_count = messages.filter(is_read=False).exclude(sender_id=thread.participant_id).count()
+            if last is not None:
+                thread.last_message = last.text
+                thread.last_message_time = last.timestamp
+                thread.activity_at = max(thread.activity_at, last.timestamp)
+            thread.save(update_fields=['unread_count', 'last_message', 'last_message_time', 'activity_at'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_media_access'),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicate_applications, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='jobapplication',
+            constraint=models.UniqueConstraint(fields=('job', 'applicant'), name='unique_job_applicant'),
+        ),
+    ]
@@ -3,6 +3,26 @@ from django.contrib.auth.models import AbstractUser
 import json
 
 
+class Skill(models.Model):
+    """A skill under its canonical name (matching.normalize_skill), maintained by api.skills"""
+    name = models.CharField(max_length=100, unique=True)
+
+    def __str__(self):
+        return self.name
+
+
+class SkillAlias(models.Model):
+    """Another normalized spelling of a skill, e.g. 'js' for 'javascript'"""
+    name = models.CharField(max_length=100, unique=True)
+    skill = models.ForeignKey(Skill, on_delete=models.CASCADE, related_name='aliases')
+
+    class Meta:
+        verbose_name_plural = 'skill aliases'
+
+    def __str__(self):
+        return f'{self.name} -> {self.skill.name}'
+
+
 class User(AbstractUser):
     """Custom User model for job seekers"""
     name = models.CharField(max_length=255, blank=True, null=True)
@@ -14,7 +34,12 @@ class User(AbstractUser):
     phone = models.CharField(max_length=255, blank=True, null=True)
     linkedin = models.CharField(max_length=255, blank=True, null=True)
     portfolio = models.CharField(max_length=255, blank=True, null=True)
-    resume = models.FileField(upload_to='resumes/', blank=True, null=True)
+    # Indexed: resume downloads look up the owner by file name (api/media.py)
+    resume = models.FileField(upload_to='resumes/', blank=True, null=True, db_index=True)
+    # Resized copies of profile_picture, maintained by api.images
+    profile_picture_derivatives = models.JSONField(blank=True, null=True, editable=False)
+    # Canonical skills of ``skills``, maintained by api.skills
+    skill_set = models.ManyToManyField(Skill, related_name='users', blank=True, editable=False)
 
     # Override email field to make it unique
     email = models.EmailField(unique=True)
@@ -37,9 +62,20 @@ class CompanyProfile(models.Model):
     description = models.TextField(blank=True, null=True)
     job_listings = models.JSONField(default=list, blank=True, null=True)
     logo = models.ImageField(upload_to='company_logos/', blank=True, null=True)
+    # Resized copies of logo, maintained by api.images
+    logo_derivatives = models.JSONField(blank=True, null=True, editable=False)
     linkedin = models.CharField(max_length=255, blank=True, null=True)
     portfolio = models.CharField(max_length=255, blank=True, null=True)
 
+    def snapshot(self):
+        """Company info stored on each job at the time it is posted"""
+        return {
+            "company_name": self.company_name,
+            "industry": self.industry,
+            "description": self.description,
+            "logo": self.logo.url if self.logo else None,
+        }
+
     def __str__(self):
         return self.company_name 
 
@@ -83,16 +119,22 @@ class Job(models.Model):
     is_remote = models.BooleanField(default=False)
     company_snapshot = models.JSONField(blank=True, null=True)
     other_details = models.TextField(blank=True, null=True)
+    # Precomputed API representation, maintained by api.cards
+    card = models.JSONField(blank=True, null=True, editable=False)
+    # Canonical skills of ``requirements``, maintained by api.skills
+    skill_set = models.ManyToManyField(Skill, related_name='jobs', blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Keyset pagination of browse_jobs: ORDER BY posted_at DESC, id DESC
+            models.Index(fields=['-posted_at', '-id'], name='job_posted_idx'),
+            models.Index(fields=['company', '-posted_at', '-id'], name='job_company_posted_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         # Store a snapshot of company info at time of posting
         if not self.company_snapshot:
-            self.company_snapshot = {
-                "company_name": self.company.company_name,
-                "industry": self.company.industry,
-                "description": self.company.description,
-                "logo": self.company.logo.url if self.company.logo else None,
-            }
+            self.company_snapshot = self.company.snapshot()
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -112,6 +154,18 @@ class JobApplication(models.Model):
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="Pending")
     applied_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        constraints = [
+            # One application per seeker and job; also serves apply_to_job's duplicate check
+            models.UniqueConstraint(fields=['job', 'applicant'], name='unique_job_applicant'),
+        ]
+        indexes = [
+            # my_applications: WHERE applicant_id = ? ORDER BY applied_at DESC
+            models.Index(fields=['applicant', '-applied_at'], name='application_applicant_idx'),
+            # Per-job applicant lists and exports
+            models.Index(fields=['job', '-applied_at'], name='application_job_idx'),
+        ]
+
     def __str__(self):
         return f"{self.applicant.email} applied to {self.job.title}" 
 
@@ -125,6 +179,41 @@ class Message(models.Model):
 
     class Meta:
         ordering = ['timestamp']
+        indexes = [
+            # A conversation in display order
+            models.Index(fields=['application', 'timestamp'], name='message_application_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.sender.email}: {self.text[:30]}..."
+
+class MessageThread(models.Model):
+    """Per-participant summary of an application's conversation, maintained by api.threads"""
+    application = models.ForeignKey(JobApplication, on_delete=models.CASCADE, related_name='threads')
+    participant = models.ForeignKey(User, on_delete=models.CASCADE, related_name='message_threads')
+    other_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    last_message = models.TextField(blank=True, null=True)
+    last_message_time = models.DateTimeField(blank=True, null=True)
+    unread_count = models.PositiveIntegerField(default=0)
+    # Sort key: last message time, or when the application was made if there are no messages
+    activity_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['application', 'participant'], name='unique_thread_participant'),
+        ]
+        indexes = [
+            models.Index(fields=['participant', '-activity_at', '-id'], name='thread_activity_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.participant.email} on application {self.application_id}"
+
+
+class UnreadCounter(models.Model):
+    """Number of unread messages addressed to a user, maintained by api.threads"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter')
+    count = models.PositiveIntegerField(default=0)
 
     def __str__(self):
-        return f"{self.sender.email}: {self.text[:30]}..." 
\ No newline at end of file
+        return f"{self.user_id}: {self.count}"
@@ -0,0 +1,86 @@
+"""
+Keyset (cursor) pagination.
+
+A cursor is the sort key of the last row of the previous page, base64-encoded so
+clients treat it as opaque. The next page is ``WHERE key < cursor ORDER BY key DESC
+LIMIT n``, which walks an index and costs the same on page 1 and page 10,000; rows
+inserted meanwhile sort before the cursor and never shift later pages.
+"""
+import base64
+import json
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, pk):
+    raw = json.dumps([timestamp.isoformat(), pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        timestamp, pk = json.loads(raw)
+        timestamp = parse_datetime(timestamp)
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor.')
+    if timestamp is None or not isinstance(pk, int):
+        raise InvalidCursor('Invalid cursor.')
+    return timestamp, pk
+
+
+def get_page_size(params, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    try:
+        return min(max(int(params.get('page_size', default)), 1), maximum)
+    except ValueError:
+        raise InvalidCursor('page_size must be an integer.')
+
+
+def _keyset_query(queryset, params, field, default_page_size):
+    page_size = get_page_size(params, default=default_page_size)
+    cursor = params.get('cursor')
+    if cursor:
+        timestamp, pk = decode_cursor(cursor)
+        # The redundant <= bound gives SQLite an index range to seek into
+        queryset = queryset.filter(**{f'{field}__lte': timestamp}).filter(
+            Q(**{f'{field}__lt': timestamp}) | Q(pk__lt=pk)
+        )
+    # Fetch one extra row to learn whether another page exists
+    return queryset.order_by(f'-{field}', '-pk')[:page_size + 1], page_size
+
+
+def _keyset_result(rows, page_size, field, model):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        if isinstance(last, dict):  # .values() querysets
+            next_cursor = encode_cursor(last[field], last[model._meta.pk.attname])
+        else:
+            next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
+
+
+def keyset_page(queryset, params, field, default_page_size=DEFAULT_PAGE_SIZE):
+    """Return ``(rows, next_cursor)`` for ``queryset`` ordered newest first on ``(field, pk)``.
+
+    ``queryset`` may be a ``.values()`` queryset as long as it includes ``field`` and the pk.
+    Reads ``cursor`` and ``page_size`` from ``params``; raises InvalidCursor on bad input.
+    """
+    page, page_size = _keyset_query(queryset, params, field, default_page_size)
+    return _keyset_result(list(page), page_size, field, queryset.model)
+
+
+async def akeyset_page(queryset, params, field, default_page_size=DEFAULT_PAGE_SIZE):
+    """keyset_page for async views"""
+    page, page_size = _keyset_query(queryset, params, field, default_page_size)
+    return _keyset_result([row async for row in page], page_size, field, queryset.model)
@@ -0,0 +1,236 @@
+"""
+Concurrent poller benchmark: how many open dashboards one server process sustains.
+
+Each simulated dashboard is a distinct seeded user that, in a loop, fetches its
+unread count and thread list and then long-polls one of its applications for new
+messages, which is what the frontend does while a conversation is open. The
+pollers share one asyncio loop and talk plain HTTP/1.1 over their own sockets, so
+the client is never the bottleneck.
+
+Two servers are started in turn against the same database:
+
+* ``asgi``: uvicorn serving jobmatching.asgi, where the polled endpoints are the
+  coroutines in api/async_views.py.
+* ``wsgi``: jobmatching.wsgi on a WSGI server with a fixed pool of ``threads``
+  worker threads, the way gthread workers run it. Each request, long polls
+  included, holds one of those threads until it returns.
+
+For every level of concurrency the report has p50/p95/p99 latency of the short
+requests (unread count and threads), how long long polls ran past their ``wait``,
+and the error count. The highest level whose short-request p99 is within the SLO
+without errors is reported as the server's sustained pollers.
+"""
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from wsgiref.simple_server import WSGIRequestHandler
+
+import numpy as np
+from django.conf import settings
+from django.core.servers.basehttp import WSGIServer
+from django.db.models import Max
+
+from .authentication import UserRefreshToken
+from .models import JobApplication
+from .seed import EMAIL_PREFIX
+
+
+HOST = '127.0.0.1'
+
+
+class PooledWSGIServer(WSGIServer):
+    """A WSGI server that handles requests on a fixed number of threads"""
+
+    request_queue_size = 1024
+
+    def __init__(self, *args, threads, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pool = ThreadPoolExecutor(threads, thread_name_prefix='wsgi')
+
+    def process_request(self, request, client_address):
+        self.pool.submit(self._process, request, client_address)
+
+    def _process(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+def serve_wsgi(port, threads):
+    from django.core.servers.basehttp import get_internal_wsgi_application
+
+    server = PooledWSGIServer((HOST, port), QuietRequestHandler, threads=threads)
+    server.set_app(get_internal_wsgi_application())
+    server.serve_forever()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind((HOST, 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(name, port, threads):
+    if name == 'asgi':
+        command = [
+            sys.executable, '-m', 'uvicorn', 'jobmatching.asgi:application',
+            '--host', HOST, '--port', str(port), '--log-level', 'warning', '--no-access-log',
+        ]
+    else:
+        command = [
+            sys.executable, 'manage.py', 'benchmark_pollers',
+            '--serve', 'wsgi', '--port', str(port), '--threads', str(threads),
+        ]
+    process = subprocess.Popen(command, cwd=settings.BASE_DIR, env=os.environ.copy())
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f'The {name} server exited with status {process.returncode}.')
+        try:
+            socket.create_connection((HOST, port), timeout=1).close()
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.kill()
+    raise RuntimeError(f'The {name} server did not start listening on port {port}.')
+
+
+def pick_pollers(count):
+    """(token, application id, latest message id) for ``count`` distinct seeded applicants"""
+    latest = (
+        JobApplication.objects.filter(applicant__email__startswith=EMAIL_PREFIX, messages__isnull=False)
+        .values('applicant_id')
+        .annotate(application_id=Max('id'))
+        .order_by('applicant_id')
+        .values_list('application_id', flat=True)[:count]
+    )
+    applications = (
+        JobApplication.objects.filter(id__in=list(latest))
+        .select_related('applicant__company_profile')
+        .annotate(last_message_id=Max('messages__id'))
+    )
+    pollers = [
+        (str(UserRefreshToken.for_user(application.applicant).access_token), application.id, application.last_message_id)
+        for application in applications
+    ]
+    if len(pollers) < count:
+        raise RuntimeError(
+            f'Only {len(pollers)} seeded applicants have messages; {count} pollers need more. Run seed_data.'
+        )
+    return pollers
+
+
+async def _get(port, path, token, timeout):
+    """Send one GET on a fresh connection; returns the status code"""
+    async def exchange():
+        reader, writer = await asyncio.open_connection(HOST, port)
+        try:
+            writer.write(
+                f'GET {path} HTTP/1.1\r\nHost: {HOST}\r\nAuthorization: Bearer {token}\r\n'
+                f'Connection: close\r\n\r\n'.encode()
+            )
+            status_line = await reader.readline()
+            await reader.read()
+            return int(status_line.split()[1])
+        finally:
+            writer.close()
+    return await asyncio.wait_for(exchange(), timeout)
+
+
+async def _poll(port, poller, wait, deadline, results):
+    token, application_id, last_id = poller
+    long_poll = f'/api/applications/{application_id}/messages/?after_id={last_id}&wait={wait:g}'
+    timeout = wait + 30
+    while time.monotonic() < deadline:
+        for path, kind in (
+            ('/api/messages/unread-count/', 'short'),
+            ('/api/messages/threads/', 'short'),
+            (long_poll, 'long'),
+        ):
+            start = time.perf_counter()
+            try:
+                status = await _get(port, path, token, timeout)
+            except (OSError, asyncio.TimeoutError, ValueError, IndexError):
+                status = None
+            elapsed = time.perf_counter() - start
+            if status != 200:
+                results['errors'] += 1
+            elif kind == 'short':
+                results['short'].append(elapsed)
+            else:
+                results['overrun'].append(max(elapsed - wait, 0))
+
+
+def _percentiles(samples, prefix=''):
+    if not samples:
+        return {f'{prefix}p50_ms': None, f'{prefix}p95_ms': None, f'{prefix}p99_ms': None}
+    p50, p95, p99 = np.percentile(np.array(samples) * 1000, [50, 95, 99])
+    return {
+        f'{prefix}p50_ms': round(float(p50), 2),
+        f'{prefix}p95_ms': round(float(p95), 2),
+        f'{prefix}p99_ms': round(float(p99), 2),
+    }
+
+
+async def run_level(port, pollers, wait, duration):
+    results = {'short': [], 'overrun': [], 'errors': 0}
+    deadline = time.monotonic() + duration
+    # Stagger the start over one poll interval, as dashboards opened at different times would be
+    async def staggered(index, poller):
+        await asyncio.sleep(wait * index / len(pollers))
+        await _poll(port, poller, wait, deadline, results)
+    await asyncio.gather(*(staggered(index, poller) for index, poller in enumerate(pollers)))
+    return {
+        'requests': len(results['short']) + len(results['overrun']),
+        'errors': results['errors'],
+        **_percentiles(results['short']),
+        **_percentiles(results['overrun'], prefix='long_poll_overrun_'),
+    }
+
+
+def run_pollers_benchmark(servers=('asgi', 'wsgi'), levels=(50, 100, 200, 400), wait=5.0,
+                          duration=20.0, threads=32, slo_ms=500.0, log=None):
+    pollers = pick_pollers(max(levels))
+    report = {
+        'environment': {
+            'python': sys.version.split()[0],
+            'wait_s': wait,
+            'duration_s': duration,
+            'wsgi_threads': threads,
+            'slo_p99_ms': slo_ms,
+        },
+        'results': {},
+    }
+    for name in servers:
+        port = _free_port()
+        process = _start_server(name, port, threads)
+        try:
+            levels_report = {}
+            sustained = 0
+            for level in sorted(levels):
+                if log:
+                    log(f'{name}: {level} pollers for {duration:g}s')
+                result = asyncio.run(run_level(port, pollers[:level], wait, duration))
+                levels_report[str(level)] = result
+                if result['errors'] == 0 and result['p99_ms'] is not None and result['p99_ms'] <= slo_ms:
+                    sustained = level
+        finally:
+            process.terminate()
+            try:
+                process.wait(10)
+            except subprocess.TimeoutExpired:
+                process.kill()
+        report['results'][name] = {'levels': levels_report, 'sustained_pollers': sustained}
+    return report
@@ -0,0 +1,268 @@
+"""
+On-demand request profiling.
+
+``ProfilingMiddleware`` is only installed when ``PROFILING_DIR`` is set; otherwise
+Django drops it at startup and it costs nothing. When installed it profiles a
+request in one of two ways:
+
+* A request carrying a valid signed ``X-Profile`` header (see the
+  ``profiling_token`` command) runs under cProfile, and the stats are written as a
+  ``.prof`` file that ``python -m pstats`` or snakeviz can read.
+* With ``PROFILING_SLOW_MS`` set, a background thread samples the stack of any
+  request that has been running longer than that, every
+  ``PROFILING_SAMPLE_INTERVAL_MS``. The samples are written in collapsed-stack
+  format (``frame;frame;frame count``) for flamegraph.pl or speedscope. Fast
+  requests are never sampled; tracking them is a dict insert and delete. Under
+  ASGI, a request's sync code (DRF views, ORM calls) runs on a worker thread of
+  its own, which is sampled like a WSGI thread. So is the request's asyncio task:
+  the chain of coroutines it is suspended in, for async views and awaits.
+
+Files are named after the time, method and path. The oldest are deleted once
+there are more than ``PROFILING_MAX_FILES`` or they take more than
+``PROFILING_MAX_BYTES``.
+"""
+import asyncio
+import cProfile
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import MiddlewareNotUsed
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_HEADER = 'HTTP_X_PROFILE'
+TOKEN_SALT = 'api.profiling'
+TOKEN_VALUE = 'profile'
+
+
+def make_token():
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(TOKEN_VALUE)
+
+
+def valid_token(token):
+    try:
+        value = signing.TimestampSigner(salt=TOKEN_SALT).unsign(
+            token, max_age=getattr(settings, 'PROFILING_TOKEN_MAX_AGE', 3600),
+        )
+    except signing.BadSignature:
+        return False
+    return value == TOKEN_VALUE
+
+
+def _frame_name(frame):
+    return f"{frame.f_globals.get('__name__', '?')}.{frame.f_code.co_qualname}"
+
+
+def collapse_stack(frame):
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def collapse_task(task):
+    """The coroutines ``task`` is suspended in, outermost first"""
+    names = []
+    awaitable = task.get_coro()
+    while awaitable is not None:
+        frame = getattr(awaitable, 'cr_frame', None) or getattr(awaitable, 'ag_frame', None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, 'cr_await', None) or getattr(awaitable, 'ag_await', None)
+    return ';'.join(names)
+
+
+def _idle(frame):
+    # A thread pool worker waiting for its next call
+    return frame.f_code.co_name == '_worker' and frame.f_globals.get('__name__') == 'concurrent.futures.thread'
+
+
+class SlowRequestSampler:
+    """Samples the stacks of requests that have been running for too long"""
+
+    def __init__(self, threshold, interval):
+        self.threshold = threshold
+        self.interval = interval
+        self._active = {}  # key -> [started, Counter of collapsed stacks, thread id, task]
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self, key, thread_id=None, task=None):
+        """Track a request by ``key``, sampling the thread ``thread_id`` and/or the asyncio ``task``"""
+        state = [time.monotonic(), Counter(), thread_id, task]
+        with self._lock:
+            self._active[key] = state
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='slow-request-sampler', daemon=True)
+                self._thread.start()
+        return state
+
+    def stop(self, key):
+        with self._lock:
+            return self._active.pop(key, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            now = time.monotonic()
+            # Under the lock so a request that stops meanwhile gets a settled Counter
+            with self._lock:
+                slow = [state for state in self._active.values() if now - state[0] >= self.threshold]
+                if not slow:
+                    continue
+                frames = sys._current_frames()
+                for _, samples, thread_id, task in slow:
+                    frame = frames.get(thread_id)
+                    if frame is not None and not _idle(frame):
+                        samples[collapse_stack(frame)] += 1
+                    if task is not None:
+                        # Read from another thread, like the frames: a sample, not a snapshot
+                        stack = collapse_task(task)
+                        if stack:
+                            samples[stack] += 1
+                del frames
+
+
+class ProfileStore:
+    def __init__(self, directory, max_files, max_bytes):
+        self.directory = directory
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, request, elapsed, extension):
+        slug = re.sub(r'[^A-Za-z0-9]+', '_', request.path).strip('_') or 'root'
+        now = time.time()
+        stamp = time.strftime('%Y%m%dT%H%M%S', time.localtime(now)) + f'.{int(now * 1000) % 1000:03d}'
+        return os.path.join(
+            self.directory,
+            f'{stamp}-{os.getpid()}-{threading.get_ident()}-{request.method}-{slug[:80]}-{elapsed * 1000:.0f}ms.{extension}',
+        )
+
+    def prune(self):
+        with self._lock:
+            entries = []
+            for entry in os.scandir(self.directory):
+                if entry.is_file() and entry.name.endswith(('.prof', '.collapsed')):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+            entries.sort(reverse=True)
+            kept = total = 0
+            for _, size, path in entries:
+                if kept < self.max_files and total + size <= self.max_bytes:
+                    kept += 1
+                    total += size
+                    continue
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+class ProfilingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        directory = getattr(settings, 'PROFILING_DIR', None)
+        if not directory:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+        self.store = ProfileStore(
+            directory,
+            getattr(settings, 'PROFILING_MAX_FILES', 100),
+            getattr(settings, 'PROFILING_MAX_BYTES', 100 * 1024 * 1024),
+        )
+        slow_ms = getattr(settings, 'PROFILING_SLOW_MS', 0)
+        self.sampler = SlowRequestSampler(
+            slow_ms / 1000, getattr(settings, 'PROFILING_SAMPLE_INTERVAL_MS', 5) / 1000,
+        ) if slow_ms else None
+
+    def _requested(self, request):
+        token = request.META.get(PROFILE_HEADER)
+        return bool(token) and valid_token(token)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if self._requested(request):
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            response = profiler.runcall(self.get_response, request)
+            return self._write_stats(request, response, profiler, time.perf_counter() - start)
+        if self.sampler is None:
+            return self.get_response(request)
+        thread_id = threading.get_ident()
+        start = time.perf_counter()
+        self.sampler.start(thread_id, thread_id=thread_id)
+        try:
+            response = self.get_response(request)
+        finally:
+            state = self.sampler.stop(thread_id)
+        if state and state[1]:
+            self._write_samples(request, state[1], time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if self._requested(request):
+            # Async requests share the event loop's thread, so the profile includes
+            # whatever else the loop ran meanwhile
+            profiler = cProfile.Profile()
+            start = time.perf_counter()
+            profiler.enable()
+            try:
+                response = await self.get_response(request)
+            finally:
+                profiler.disable()
+            return self._write_stats(request, response, profiler, time.perf_counter() - start)
+        if self.sampler is None:
+            return await self.get_response(request)
+        # Thread-sensitive sync_to_async calls of one request share a thread: the view's
+        task = asyncio.current_task()
+        thread_id = await sync_to_async(threading.get_ident)()
+        start = time.perf_counter()
+        self.sampler.start(task, thread_id=thread_id, task=task)
+        try:
+            response = await self.get_response(request)
+        finally:
+            state = self.sampler.stop(task)
+        if state and state[1]:
+            self._write_samples(request, state[1], time.perf_counter() - start)
+        return response
+
+    def _write_stats(self, request, response, profiler, elapsed):
+        path = self.store.path_for(request, elapsed, 'prof')
+        try:
+            profiler.dump_stats(path)
+            self.store.prune()
+        except OSError:
+            logger.exception('Writing profile %s failed', path)
+            return response
+        response['X-Profile-File'] = os.path.basename(path)
+        return response
+
+    def _write_samples(self, request, samples, elapsed):
+        path = self.store.path_for(request, elapsed, 'collapsed')
+        try:
+            with open(path, 'w') as output:
+                for stack, count in samples.most_common():
+                    output.write(f'{stack} {count}\n')
+            self.store.prune()
+        except OSError:
+            logger.exception('Writing profile %s failed', path)
+            return
+        logger.warning('%s %s took %.0fms; stack samples in %s', request.method, request.path, elapsed * 1000, path)
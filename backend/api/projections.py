@@ -0,0 +1,88 @@
+"""
+Serializer output built from ``values_list()`` rows.
+
+MessageSerializer and JobApplicationSerializer build each row through DRF's field
+machinery: model instances, a ``to_representation`` call per field, method fields
+and, for applications, a nested ApplicantInfoSerializer. The list endpoints read
+only the columns those serializers output, as flat tuples, and build the dicts
+directly. The output is exactly the serializers'; ``benchmark_serializers`` checks
+that against the real serializers. Jobs already have such a path: their stored
+cards (api/cards.py).
+"""
+from django.core.files.storage import default_storage
+from rest_framework import serializers
+
+from .images import derivative_urls
+from .serializers import decode_skills
+
+
+_to_datetime = serializers.DateTimeField().to_representation
+
+APPLICATION_COLUMNS = [
+    'id', 'job_id', 'job__title', 'job__company__company_name', 'cover_letter', 'status', 'applied_at',
+    'applicant_id', 'applicant__name', 'applicant__email', 'applicant__skills', 'applicant__experience',
+    'applicant__profile_picture', 'applicant__profile_picture_derivatives', 'applicant__education',
+    'applicant__location', 'applicant__phone', 'applicant__linkedin', 'applicant__portfolio', 'applicant__resume',
+]
+
+MESSAGE_COLUMNS = [
+    'id', 'application_id', 'sender_id', 'sender__name', 'sender__email', 'text', 'timestamp', 'is_read',
+]
+
+
+def _file_url(name):
+    # What FieldFile.url returns, without building the FieldFile
+    return default_storage.url(name) if name else None
+
+
+def application_record(row):
+    """JobApplicationSerializer output for a row of APPLICATION_COLUMNS"""
+    (id, job_id, job_title, company_name, cover_letter, status, applied_at, applicant_id, name, email,
+     skills, experience, profile_picture, profile_picture_derivatives, education, location, phone, linkedin,
+     portfolio, resume) = row
+    return {
+        'id': id,
+        'job': job_id,
+        'job_title': job_title,
+        'company_name': company_name,
+        'applicant': {
+            'id': applicant_id,
+            'name': name,
+            'email': email,
+            'skills': decode_skills(skills),
+            'experience': experience,
+            'profile_picture': _file_url(profile_picture),
+            'profile_picture_derivatives': derivative_urls(profile_picture_derivatives),
+            'education': education,
+            'location': location,
+            'phone': phone,
+            'linkedin': linkedin,
+            'portfolio': portfolio,
+            'resume': _file_url(resume),
+        },
+        'cover_letter': cover_letter,
+        'status': status,
+        'applied_at': _to_datetime(applied_at),
+    }
+
+
+def message_record(row):
+    """MessageSerializer output for a row of MESSAGE_COLUMNS"""
+    id, application_id, sender_id, name, email, text, timestamp, is_read = row
+    return {
+        'id': id,
+        'application': application_id,
+        'sender': sender_id,
+        'sender_info': {'id': sender_id, 'name': name, 'email': email},
+        'text': text,
+        'timestamp': _to_datetime(timestamp),
+        'is_read': is_read,
+    }
+
+
+def application_records(queryset):
+    return [application_record(row) for row in queryset.values_list(*APPLICATION_COLUMNS)]
+
+
+def message_records(queryset):
+    return [message_record(row) for row in queryset.values_list(*MESSAGE_COLUMNS)]
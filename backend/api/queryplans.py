@@ -0,0 +1,189 @@
+"""
+Query-plan audit of the API's request paths.
+
+Every endpoint in api/urls.py is exercised through the test client against a small
+set of throwaway fixtures, inside a transaction that is rolled back. Each SQL
+statement it issues is passed through SQLite's ``EXPLAIN QUERY PLAN``. Full table
+scans and temporary B-tree sorts are reported unless listed in ACCEPTED with a
+reason. GET scenarios are also repeated with more rows behind them
+(``assert_query_budget``), and a query count that grows is reported as an N+1.
+Used by the ``audit_query_plans`` management command.
+"""
+import itertools
+import re
+from dataclasses import dataclass, field
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from .facets import job_facets
+from .instrumentation import assert_query_budget
+from .matching import candidate_matrix, skill_aliases, skill_matrix
+from .models import CompanyProfile, Job, JobApplication, Message, User
+from .scenarios import SCENARIO_PASSWORD, SCENARIOS, client_for, fixture_ids, send, unexpected_status
+
+
+# (regex over the SQL, regex over the plan detail, reason) for findings that are fine
+ACCEPTED = [
+    (r'FROM "api_companyprofile"\s*(ORDER BY|$)', r'SCAN api_companyprofile',
+     'companies/profile/ lists every company by design'),
+    (r'GROUP BY', r'USE TEMP B-TREE FOR (GROUP BY|DISTINCT)',
+     'grouping a handful of rows that are already restricted by an index'),
+    (r'MATCH .* ORDER BY rank', r'USE TEMP B-TREE FOR ORDER BY',
+     'bm25 rank is computed per match, so FTS results are always sorted'),
+    (r'FROM "api_jobapplication" INNER JOIN "api_job" .*"api_job"\."company_id" = .* ORDER BY', r'USE TEMP B-TREE FOR ORDER BY',
+     "merging one company's applications across its jobs; each job's are found via the job index"),
+    (r'SELECT "api_user"\."id" AS "id", "api_user"\."skills" AS "skills" FROM "api_user"', r'SCAN api_user',
+     'candidate matrix rebuild after an invalidation reads every seeker by design'),
+    (r'FROM "api_job" INNER JOIN "api_job_skill_set" .* ORDER BY', r'USE TEMP B-TREE FOR ORDER BY',
+     "jobs with a skill are found via the skill's links and sorted into a top-N page"),
+]
+
+
+@dataclass
+class Finding:
+    scenario: str
+    sql: str
+    detail: str
+
+
+@dataclass
+class ScenarioResult:
+    name: str
+    method: str
+    path: str
+    status: int
+    queries: int
+    plans: list = field(default_factory=list)  # [(sql, [detail, ...])]
+    findings: list = field(default_factory=list)
+
+
+def create_fixtures():
+    """A seeker, a company with two jobs, an application and a message; users by role and scenario ids"""
+    seeker = User.objects.create_user(
+        username='audit-seeker@example.com', email='audit-seeker@example.com',
+        password=SCENARIO_PASSWORD, name='Audit Seeker', skills=['python', 'django'],
+        resume='resumes/audit-seeker.pdf',
+    )
+    company_user = User.objects.create_user(
+        username='audit-company@example.com', email='audit-company@example.com', password=SCENARIO_PASSWORD,
+    )
+    company = CompanyProfile.objects.create(
+        user=company_user, company_name='Audit Co', email='audit-company@example.com',
+        industry='IT', location='Remote',
+    )
+    job = Job.objects.create(
+        company=company, title='Audit python job', description='Python and Django',
+        location='Remote', requirements=['python', 'django'], employment_type='Full-time', is_remote=True,
+    )
+    Job.objects.create(company=company, title='Audit second job', description='SQL', location='Remote')
+    application = JobApplication.objects.create(job=job, applicant=seeker, cover_letter='hello')
+    message = Message.objects.create(application=application, sender=company_user, text='Welcome')
+    return {
+        'users': {None: None, 'seeker': seeker, 'company': company_user},
+        'ids': fixture_ids(application, message),
+    }
+
+
+_grow_ids = itertools.count(1)
+
+
+def grow_fixtures(fixtures, rows=3):
+    """Add rows behind every list the scenarios read: jobs, applicants, applications, messages"""
+    ids = fixtures['ids']
+    seeker, company_user = fixtures['users']['seeker'], fixtures['users']['company']
+    for _ in range(rows):
+        n = next(_grow_ids)
+        applicant = User.objects.create_user(
+            username=f'audit-grow-{n}@example.com', email=f'audit-grow-{n}@example.com',
+            name=f'Audit Applicant {n}', skills=['python'],
+        )
+        job = Job.objects.create(
+            company_id=ids['company_id'], title=f'Audit python job {n}', description='Python',
+            location='Remote', requirements=['python'], employment_type='Full-time', is_remote=True,
+        )
+        application = JobApplication.objects.create(job=job, applicant=seeker)
+        Message.objects.create(application=application, sender=company_user, text='Hi')
+        applied = JobApplication.objects.create(job_id=ids['job_id'], applicant=applicant)
+        Message.objects.create(application=applied, sender=applicant, text='Hello')
+        Message.objects.create(application_id=ids['application_id'], sender=company_user, text=f'Update {n}')
+    # As a request would find them after the writes committed
+    prime_indexes()
+
+
+def prime_indexes():
+    """Drop cached responses and rebuild the in-memory indexes, as requests find them after a commit"""
+    cache.clear()
+    for index in (skill_aliases, skill_matrix, candidate_matrix, job_facets):
+        index.invalidate()
+        index.get()
+
+
+def _issues(sql, plan):
+    found = []
+    for detail in plan:
+        full_scan = re.match(r'SCAN (\S+)$', detail) and 'CONSTANT ROW' not in detail
+        if not (full_scan or 'USE TEMP B-TREE' in detail):
+            continue
+        if any(re.search(sql_re, sql, re.S) and re.search(plan_re, detail) for sql_re, plan_re, _ in ACCEPTED):
+            continue
+        found.append(detail)
+    return found
+
+
+def explain(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def audit(names=None):
+    """Run the scenarios (all, or those for ``names``) and return their ScenarioResults"""
+    if connection.vendor != 'sqlite':
+        raise RuntimeError('The query-plan audit uses SQLite EXPLAIN QUERY PLAN.')
+    results = []
+    with transaction.atomic():
+        fixtures = create_fixtures()
+        # Request paths only: build the in-memory indexes and drop cached responses first
+        prime_indexes()
+        for name, scenarios in SCENARIOS.items():
+            if names and name not in names:
+                continue
+            for method, path, role, data in scenarios:
+                client = client_for(fixtures['users'][role])
+                with transaction.atomic():
+                    with CaptureQueriesContext(connection) as captured:
+                        response, _ = send(client, method, path, data, fixtures['ids'])
+                    result = ScenarioResult(
+                        name, method.upper(), path.format(**fixtures['ids']), response.status_code,
+                        len(captured.captured_queries),
+                    )
+                    if unexpected_status(path, response.status_code):
+                        # An error page has no plans worth auditing; it is a failure in itself
+                        result.findings.append(Finding(name, result.path, f'unexpected status {response.status_code}'))
+                    for query in captured.captured_queries:
+                        sql = query['sql']
+                        if not re.match(r'\s*(SELECT|UPDATE|DELETE|INSERT|WITH)\b', sql, re.IGNORECASE):
+                            continue
+                        plan = explain(sql)
+                        result.plans.append((sql, plan))
+                        result.findings.extend(Finding(name, sql, detail) for detail in _issues(sql, plan))
+                    if method == 'get':
+                        # Uncached, so the view's own queries are what is counted
+                        try:
+                            assert_query_budget(
+                                lambda: (prime_indexes(), send(client, method, path, data, fixtures['ids'])),
+                                lambda: grow_fixtures(fixtures),
+                            )
+                        except AssertionError as exc:
+                            result.findings.append(Finding(name, result.path, str(exc)))
+                    results.append(result)
+                    # Keep scenarios independent of each other's writes
+                    transaction.set_rollback(True)
+        transaction.set_rollback(True)
+    # Built from the rolled-back fixtures
+    for index in (skill_aliases, skill_matrix, candidate_matrix, job_facets):
+        index.invalidate()
+    cache.clear()
+    return results
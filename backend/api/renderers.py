@@ -0,0 +1,42 @@
+"""
+JSON rendering with orjson.
+
+``ORJSONRenderer`` writes the same bytes as DRF's JSONRenderer with this project's
+settings (compact, unescaped unicode, ``\\u2028``/``\\u2029`` escaped) in a fraction
+of the time. Values orjson has no native encoding for, or encodes differently
+(datetimes, lazy translations, Decimals), go through DRF's encoder. Anything orjson
+refuses, such as integers wider than 64 bits or dicts with non-string keys, and
+indented output for the browsable API are rendered by JSONRenderer itself.
+
+One difference remains: floats that Python writes in exponent form (below 1e-4 or
+from 1e16 up) come out as ``1e16`` rather than ``1e+16``. Both parse to the same
+number, and the API's floats are scores rounded to four places, never that small
+or large.
+
+Non-finite floats also differ: orjson writes NaN and the infinities as ``null``,
+where DRF's strict renderer (STRICT_JSON, the default) raises ValueError. Finding
+them would mean walking every response, and the API produces none: scores are
+divisions guarded against zero denominators, and salaries are integers.
+"""
+import orjson
+from rest_framework.renderers import JSONRenderer
+
+
+OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+
+
+class ORJSONRenderer(JSONRenderer):
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if (self.ensure_ascii or not self.compact
+                or self.get_indent(accepted_media_type, renderer_context or {}) is not None):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            rendered = orjson.dumps(data, default=self.encoder_class().default, option=OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'\xe2\x80\xa8' in rendered or b'\xe2\x80\xa9' in rendered:
+            rendered = rendered.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+        return rendered
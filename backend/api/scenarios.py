@@ -0,0 +1,136 @@
+"""
+Replayable requests for every API endpoint.
+
+SCENARIOS maps each URL name in api/urls.py to the requests that exercise it, as
+templates filled in with the ids of a seeker, a company and their job, application
+and message. The query-plan audit runs them against throwaway fixtures, the
+endpoint benchmark against seeded data.
+"""
+from django.conf import settings
+from rest_framework.test import APIClient
+
+from .authentication import UserRefreshToken
+
+
+SCENARIO_PASSWORD = 'audit-password'
+
+# (method, path, role, data) per URL name. Paths and string data are formatted with
+# the fixture ids; roles are None (anonymous), 'seeker' or 'company'.
+SCENARIOS = {
+    'signup': [('post', '/api/auth/signup/', None, {'name': 'Audit', 'email': 'audit-new@example.com', 'password': 'x' * 12})],
+    'login': [('post', '/api/auth/login/', None, {'email': '{seeker_email}', 'password': SCENARIO_PASSWORD})],
+    'profile': [('get', '/api/auth/profile/', 'seeker', None)],
+    'update_profile': [('put', '/api/auth/update/', 'seeker', {'name': 'Audit Seeker', 'skills': ['python', 'sql']})],
+    'company_profiles': [('get', '/api/companies/profile/', None, None)],
+    'my_company_profile': [('get', '/api/companies/my-profile/', 'company', None)],
+    'create_company_profile': [('post', '/api/companies/create/', 'seeker', {
+        'company_name': 'Audit Two', 'email': 'audit2@example.com', 'industry': 'IT', 'location': 'Remote'})],
+    'update_company_profile': [('put', '/api/companies/update/', 'company', {'description': 'Updated'})],
+    'browse_jobs': [
+        ('get', '/api/jobs/', None, None),
+        ('get', '/api/jobs/?employment_type=Full-time&is_remote=true&page_size=5', None, None),
+        ('get', '/api/jobs/?company={company_id}', None, None),
+        ('get', '/api/jobs/?skill=Python&skill=js', None, None),
+    ],
+    'job_search': [('get', '/api/jobs/search/?q=python', None, None)],
+    'job_facets': [('get', '/api/jobs/facets/?employment_type=Full-time', None, None)],
+    'recommended_jobs': [('get', '/api/jobs/recommended/', 'seeker', None)],
+    'post_job': [('post', '/api/jobs/post/', 'company', {
+        'title': 'Audit job 2', 'description': 'd', 'location': 'Remote', 'requirements': ['python']})],
+    'bulk_import_jobs': [('post', '/api/jobs/bulk/', 'company', {'csv': 'title,description,location\nA,b,Remote\n'})],
+    'apply_to_job': [('post', '/api/jobs/{other_job_id}/apply/', 'seeker', {'cover_letter': 'hi'})],
+    'job_candidates': [
+        ('get', '/api/jobs/{job_id}/candidates/', 'company', None),
+        ('get', '/api/jobs/{job_id}/candidates/?scope=all', 'company', None),
+        ('get', '/api/jobs/{job_id}/candidates/?scope=all&skill=python', 'company', None),
+    ],
+    'company_applicants': [('get', '/api/companies/applicants/', 'company', None)],
+    'export_company_applicants': [('get', '/api/companies/applicants/export/?output_format=ndjson', 'company', None)],
+    'update_application_status': [('patch', '/api/companies/applicants/{application_id}/', 'company', {'status': 'Reviewed'})],
+    'my_applications': [('get', '/api/jobs/my-applications/', 'seeker', None)],
+    'application_messages': [
+        ('get', '/api/applications/{application_id}/messages/', 'seeker', None),
+        ('get', '/api/applications/{application_id}/messages/?after_id={message_id}', 'seeker', None),
+        ('post', '/api/applications/{application_id}/messages/', 'seeker', {'text': 'hello'}),
+    ],
+    'message_threads': [('get', '/api/messages/threads/', 'seeker', None)],
+    'unread_message_count': [('get', '/api/messages/unread-count/', 'company', None)],
+    'mark_messages_read': [('post', '/api/applications/{application_id}/mark-read/', 'company', None)],
+    'serve_media': [
+        ('get', '/api/media/{resume}', 'company', None),
+        ('get', '/api/media/company_logos/audit-missing.png', None, None),
+    ],
+}
+
+# Status of scenarios that are not answered with a 2xx, by path template. The fixture
+# users have resume names but no files, so downloads are authorized and then 404.
+EXPECTED_STATUS = {
+    '/api/media/{resume}': 404,
+    '/api/media/company_logos/audit-missing.png': 404,
+}
+
+# URL names with no synchronous request to replay
+SKIPPED = {
+    'event_stream': 'ASGI-only stream; authentication is the only query',
+}
+
+
+
+def fixture_ids(application, message):
+    """Template values for the seeker and company of ``application``"""
+    job = application.job
+    seeker = application.applicant
+    other_job = job.company.jobs.exclude(applications__applicant=seeker).order_by('id').first()
+    return {
+        'seeker_email': seeker.email,
+        'company_id': job.company_id,
+        'job_id': job.id,
+        'other_job_id': other_job.id if other_job else job.id,
+        'application_id': application.id,
+        'message_id': message.id,
+        'resume': seeker.resume.name or 'resumes/audit-missing.pdf',
+    }
+
+
+def scenario_host():
+    """A Host header ALLOWED_HOSTS accepts; the test client's default 'testserver' is rejected"""
+    for host in settings.ALLOWED_HOSTS:
+        host = host.lstrip('.')
+        if host and host != '*':
+            return host
+    return 'localhost'
+
+
+def unexpected_status(path, status):
+    """Whether a scenario response for the ``path`` template has a status it should not"""
+    if path in EXPECTED_STATUS:
+        return status != EXPECTED_STATUS[path]
+    return not 200 <= status < 300
+
+
+def client_for(user):
+    """A client sending ``user``'s access token, as the frontend does (None: anonymous)"""
+    client = APIClient(HTTP_HOST=scenario_host())
+    if user is not None:
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {UserRefreshToken.for_user(user).access_token}')
+    return client
+
+
+def send(client, method, path, data, ids):
+    """Send one scenario request; returns the response and its body, streamed ones read to the end"""
+    path = path.format(**ids)
+    if data and 'csv' in data:
+        response = client.post(path, data=data['csv'], content_type='text/csv')
+    else:
+        if data:
+            data = {key: value.format(**ids) if isinstance(value, str) else value for key, value in data.items()}
+        response = getattr(client, method)(path, data, format='json' if method != 'get' else None)
+    if getattr(response, 'streaming', False):
+        return response, b''.join(response.streaming_content)
+    return response, response.content
+
+
+def uncovered_url_names():
+    """Names of api URL patterns that have neither a scenario nor a SKIPPED reason"""
+    from .urls import urlpatterns
+    return sorted({p.name for p in urlpatterns} - set(SCENARIOS) - set(SKIPPED))
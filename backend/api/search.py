@@ -0,0 +1,81 @@
+"""
+Ranked full-text job search over the ``api_job_fts`` FTS5 table (see migration 0007).
+
+Falls back to ``icontains`` filtering on databases without FTS5 so the endpoint
+keeps working outside SQLite, just without ranking or snippets.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Q
+
+from .models import Job
+
+
+# Column weights for bm25(), in table column order:
+# title, description, requirements, benefits, location, company_name
+BM25_WEIGHTS = (10.0, 1.0, 4.0, 1.0, 2.0, 5.0)
+
+SNIPPET_TOKENS = 16
+
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def fts_available():
+    return connection.vendor == 'sqlite'
+
+
+def build_match_query(text):
+    """Turn free user input into a safe FTS5 query: every word must match, last one as prefix"""
+    tokens = _TOKEN_RE.findall(text)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_jobs(text, limit, offset=0):
+    """Return ``(hits, total)``; hits are ``(job_id, score, snippet)`` with the best match first"""
+    match = build_match_query(text)
+    if match is None:
+        return [], 0
+    if not fts_available():
+        return _search_jobs_like(text, limit, offset)
+
+    weights = ', '.join(str(w) for w in BM25_WEIGHTS)
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT count(*) FROM api_job_fts WHERE api_job_fts MATCH %s', [match])
+        total = cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            SELECT rowid, bm25(api_job_fts, {weights}) AS rank,
+                   snippet(api_job_fts, -1, '<mark>', '</mark>', '…', {SNIPPET_TOKENS})
+            FROM api_job_fts
+            WHERE api_job_fts MATCH %s
+            ORDER BY rank
+            LIMIT %s OFFSET %s
+            """,
+            [match, limit, offset],
+        )
+        # bm25() is lower-is-better; expose a higher-is-better score
+        hits = [(job_id, -rank, snippet) for job_id, rank, snippet in cursor.fetchall()]
+    return hits, total
+
+
+def _search_jobs_like(text, limit, offset):
+    condition = Q()
+    for token in _TOKEN_RE.findall(text):
+        condition &= (
+            Q(title__icontains=token) | Q(description__icontains=token) |
+            Q(location__icontains=token) | Q(company__company_name__icontains=token)
+        )
+    jobs = Job.objects.filter(condition).order_by('-posted_at')
+    total = jobs.count()
+    return [(job_id, None, None) for job_id in jobs.values_list('id', flat=True)[offset:offset + limit]], total
+
+
+def search_job_ids(text, limit=1000):
+    """Ids of the best ``limit`` matches, for callers that only need membership (admin search)"""
+    hits, _ = search_jobs(text, limit)
+    return [job_id for job_id, _, _ in hits]
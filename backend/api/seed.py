@@ -0,0 +1,342 @@
+"""
+Synthetic data at realistic volumes, for benchmarks and query-plan work.
+
+Everything is generated from one ``random.Random(seed)``, so a given seed and set of
+sizes always produce the same rows. Rows are written with ``bulk_create``, which
+skips ``save()`` and signals, so the denormalized state those would maintain is
+written here too: company snapshots and job cards, skill links, message threads
+and unread counters. The full-text index is kept by its triggers. Seeded accounts are
+``seed-<n>@example.com`` with password ``SCENARIO_PASSWORD``.
+
+Timestamps are spread over the ``HISTORY_DAYS`` before the run, rather than all
+being the moment of the run, so ORDER BY and keyset plans see realistic data. Jobs
+are posted in id order, applications follow their job, and messages follow their
+application.
+"""
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from .cards import refresh_company_cards
+from .models import CompanyProfile, Job, JobApplication, Message, MessageThread, UnreadCounter, User
+from .scenarios import SCENARIO_PASSWORD
+from .skills import link_skills
+
+
+EMAIL_PREFIX = 'seed-'
+BATCH_SIZE = 5000
+HISTORY_DAYS = 365
+# Latest an application comes after its job is posted, and a message after its application
+APPLICATION_DELAY_DAYS = 30
+CONVERSATION_DAYS = 60
+
+DEFAULT_SIZES = {
+    'seekers': 50_000,
+    'companies': 2_000,
+    'jobs': 100_000,
+    'applications': 300_000,
+    'messages': 2_000_000,
+}
+
+SKILLS = [
+    'python', 'django', 'flask', 'fastapi', 'javascript', 'typescript', 'react', 'vue', 'angular',
+    'node.js', 'java', 'spring', 'kotlin', 'swift', 'go', 'rust', 'c++', 'c#', '.net', 'php',
+    'laravel', 'ruby', 'rails', 'sql', 'postgresql', 'mysql', 'sqlite', 'mongodb', 'redis',
+    'elasticsearch', 'docker', 'kubernetes', 'aws', 'azure', 'gcp', 'terraform', 'linux', 'git',
+    'ci/cd', 'graphql', 'rest', 'html', 'css', 'tailwind', 'figma', 'ui design', 'ux research',
+    'machine learning', 'pandas', 'numpy', 'pytorch', 'tensorflow', 'data analysis', 'excel',
+    'tableau', 'power bi', 'project management', 'agile', 'scrum', 'communication', 'sales',
+    'marketing', 'seo', 'copywriting', 'customer support', 'accounting', 'recruiting',
+]
+ROLES = [
+    'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Full Stack Developer',
+    'Data Analyst', 'Data Scientist', 'DevOps Engineer', 'Mobile Developer', 'QA Engineer',
+    'Product Manager', 'UI/UX Designer', 'Marketing Specialist', 'Sales Representative',
+    'Customer Support Agent', 'Accountant', 'Recruiter', 'Project Manager', 'Business Analyst',
+]
+LEVELS = ['Junior', '', '', 'Senior', 'Lead', 'Principal']
+LOCATIONS = [
+    'Addis Ababa', 'Nairobi', 'Lagos', 'Cairo', 'Kigali', 'Accra', 'Johannesburg', 'London',
+    'Berlin', 'Amsterdam', 'New York', 'San Francisco', 'Toronto', 'Dubai', 'Bangalore', 'Remote',
+]
+INDUSTRIES = [
+    'IT', 'Finance', 'Healthcare', 'Education', 'E-commerce', 'Logistics', 'Telecommunications',
+    'Manufacturing', 'Media', 'Consulting', 'Energy', 'Agriculture',
+]
+COMPANY_WORDS = [
+    'Blue', 'Nile', 'Summit', 'Bright', 'Atlas', 'Horizon', 'Vertex', 'Orbit', 'Cedar', 'Nova',
+    'Pioneer', 'Delta', 'Lumen', 'Harbor', 'Quantum', 'Zenith', 'Savanna', 'Acacia', 'Apex', 'Unity',
+]
+COMPANY_SUFFIXES = ['Labs', 'Systems', 'Technologies', 'Group', 'Solutions', 'Holdings', 'Digital', 'Partners']
+FIRST_NAMES = [
+    'Abebe', 'Almaz', 'Dawit', 'Hanna', 'Samuel', 'Mekdes', 'Yonas', 'Selam', 'Daniel', 'Ruth',
+    'Amina', 'Kwame', 'Chidi', 'Fatima', 'Omar', 'Grace', 'Peter', 'Sara', 'Liam', 'Mia',
+    'Noah', 'Emma', 'Lucas', 'Olivia', 'Ahmed', 'Zainab', 'Tariq', 'Leila', 'Ivan', 'Ana',
+]
+LAST_NAMES = [
+    'Tesfaye', 'Bekele', 'Alemu', 'Girma', 'Haile', 'Kebede', 'Mengistu', 'Okafor', 'Mensah',
+    'Mwangi', 'Otieno', 'Hassan', 'Ali', 'Smith', 'Johnson', 'Garcia', 'Müller', 'Rossi', 'Silva', 'Chen',
+]
+SENTENCES = [
+    'We are looking for someone who enjoys solving hard problems.',
+    'You will work closely with product, design and engineering.',
+    'Our team ships small changes often and cares about quality.',
+    'Experience with distributed teams is a plus.',
+    'You will own features from idea to production.',
+    'We offer mentoring and a yearly learning budget.',
+    'The role includes on-call duty one week per quarter.',
+    'You will help shape our hiring and engineering practices.',
+    'Strong written communication is essential for this role.',
+    'We value curiosity, kindness and clear thinking.',
+]
+MESSAGES = [
+    'Thanks for applying! Are you available for a call this week?',
+    'Yes, Tuesday or Thursday afternoon works for me.',
+    'Great, I have sent a calendar invite.',
+    'Could you share a bit more about your recent projects?',
+    'Sure, I have attached my portfolio link to my profile.',
+    'We would like to invite you to a technical interview.',
+    'Thank you, looking forward to it.',
+    'Is the position open to remote candidates?',
+    'What is the expected start date?',
+    'We have decided to move forward with your application.',
+]
+BENEFITS = ['Health insurance', 'Remote work', 'Flexible hours', 'Stock options', 'Training budget', 'Paid leave']
+
+
+def scaled(sizes, scale):
+    return {name: max(1, int(count * scale)) for name, count in sizes.items()}
+
+
+@contextmanager
+def _explicit_timestamps(*models):
+    """Make bulk_create keep the auto_now_add values set on the rows instead of stamping now"""
+    fields = [field for model in models for field in model._meta.concrete_fields if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def _batches(rows, size=BATCH_SIZE):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Seeder:
+    def __init__(self, sizes, seed=42, log=None):
+        self.sizes = sizes
+        self.random = random.Random(seed)
+        self.log = log or (lambda message: None)
+        self.password = make_password(SCENARIO_PASSWORD)
+        self.serial = 0
+        self.now = timezone.now()
+        self.start = self.now - timedelta(days=HISTORY_DAYS)
+
+    def _after(self, moment, days):
+        """A random time up to ``days`` after ``moment``, and not in the future"""
+        window = min(timedelta(days=days), self.now - moment)
+        return moment + window * self.random.random()
+
+    def _email(self):
+        self.serial += 1
+        return f'{EMAIL_PREFIX}{self.serial}@example.com'
+
+    def _name(self):
+        return f'{self.random.choice(FIRST_NAMES)} {self.random.choice(LAST_NAMES)}'
+
+    def _text(self, low, high):
+        return ' '.join(self.random.choices(SENTENCES, k=self.random.randint(low, high)))
+
+    def _users(self, count, seekers):
+        rnd = self.random
+        for _ in range(count):
+            email = self._email()
+            yield User(
+                username=email, email=email, password=self.password, name=self._name(),
+                skills=rnd.sample(SKILLS, rnd.randint(3, 10)) if seekers else [],
+                experience=f'{rnd.randint(0, 15)} years' if seekers else None,
+                education=rnd.choice(['BSc Computer Science', 'BA Economics', 'MSc Data Science', 'Diploma', None]) if seekers else None,
+                location=rnd.choice(LOCATIONS),
+            )
+
+    def _create_users(self, count, seekers):
+        ids = []
+        for batch in _batches(self._users(count, seekers)):
+            with transaction.atomic():
+                created = User.objects.bulk_create(batch)
+                if seekers:
+                    link_skills(User, [(user.id, user.skills) for user in created], replace=False)
+            ids.extend(user.id for user in created)
+        return ids
+
+    def seed_users(self):
+        self.seeker_ids = self._create_users(self.sizes['seekers'], seekers=True)
+        self.log(f'{len(self.seeker_ids)} job seekers')
+
+    def seed_companies(self):
+        rnd = self.random
+        user_ids = self._create_users(self.sizes['companies'], seekers=False)
+        companies = [
+            CompanyProfile(
+                user_id=user_id,
+                company_name=f'{rnd.choice(COMPANY_WORDS)} {rnd.choice(COMPANY_WORDS)} {rnd.choice(COMPANY_SUFFIXES)}',
+                email=f'jobs{user_id}@example.com',
+                industry=rnd.choice(INDUSTRIES),
+                location=rnd.choice(LOCATIONS),
+                description=self._text(1, 3),
+            )
+            for user_id in user_ids
+        ]
+        self.companies = []
+        for batch in _batches(companies):
+            self.companies.extend(CompanyProfile.objects.bulk_create(batch))
+        self.log(f'{len(self.companies)} companies')
+
+    def _job(self, company, posted_at):
+        rnd = self.random
+        level = rnd.choice(LEVELS)
+        salary_min = rnd.randrange(500, 8000, 250)
+        return Job(
+            company=company,
+            title=f'{level} {rnd.choice(ROLES)}'.strip(),
+            description=self._text(2, 6),
+            requirements=rnd.sample(SKILLS, rnd.randint(2, 8)),
+            location=rnd.choice(LOCATIONS),
+            salary_min=salary_min,
+            salary_max=salary_min + rnd.randrange(0, 4000, 250),
+            salary_type=rnd.choice(['Range', 'Fixed', 'Negotiable']),
+            employment_type=rnd.choice(['Full-time'] * 4 + ['Part-time', 'Contract', 'Internship', 'Temporary']),
+            experience_level=rnd.choice(['Entry', 'Mid', 'Mid', 'Senior', 'Director']),
+            benefits=rnd.sample(BENEFITS, rnd.randint(0, 3)),
+            is_remote=rnd.random() < 0.3,
+            company_snapshot=company.snapshot(),
+            posted_at=posted_at,
+        )
+
+    def seed_jobs(self):
+        rnd = self.random
+        span = self.now - self.start
+        offsets = sorted(rnd.random() for _ in range(self.sizes['jobs']))
+        jobs = (self._job(rnd.choice(self.companies), self.start + span * offset) for offset in offsets)
+        self.job_companies = {}
+        self.job_posted = {}
+        for batch in _batches(jobs):
+            with transaction.atomic():
+                created = Job.objects.bulk_create(batch)
+                by_company = {}
+                for job in created:
+                    by_company.setdefault(job.company_id, []).append(job)
+                    self.job_companies[job.id] = job.company_id
+                    self.job_posted[job.id] = job.posted_at
+                for jobs_of_company in by_company.values():
+                    refresh_company_cards(jobs_of_company[0].company, jobs=jobs_of_company)
+                link_skills(Job, [(job.id, job.requirements) for job in created], replace=False)
+        self.job_ids = list(self.job_companies)
+        self.log(f'{len(self.job_ids)} jobs')
+
+    def seed_applications(self):
+        rnd = self.random
+        company_users = {company.id: company.user_id for company in self.companies}
+        count = min(self.sizes['applications'], len(self.seeker_ids) * len(self.job_ids))
+        pairs = set()
+        while len(pairs) < count:
+            pairs.add((rnd.choice(self.seeker_ids), rnd.choice(self.job_ids)))
+        statuses = ['Pending'] * 5 + ['Reviewed'] * 3 + ['Accepted', 'Rejected']
+        applications = (
+            JobApplication(
+                applicant_id=applicant_id, job_id=job_id, status=rnd.choice(statuses),
+                cover_letter=self._text(1, 3) if rnd.random() < 0.6 else None,
+                applied_at=self._after(self.job_posted[job_id], APPLICATION_DELAY_DAYS),
+            )
+            for applicant_id, job_id in sorted(pairs)
+        )
+        self.applications = []  # (id, applicant_id, company_user_id, applied_at)
+        for batch in _batches(applications):
+            for application in JobApplication.objects.bulk_create(batch):
+                company_user_id = company_users[self.job_companies[application.job_id]]
+                self.applications.append(
+                    (application.id, application.applicant_id, company_user_id, application.applied_at),
+                )
+        self.log(f'{len(self.applications)} applications')
+
+    def seed_messages(self):
+        rnd = self.random
+        # Conversations are uneven: most applications get a few messages, some many
+        weights = [rnd.paretovariate(1.5) for _ in self.applications]
+        self.last_messages = {}  # application_id -> (text, timestamp)
+        self.unread = {}  # (application_id, recipient_id) -> count
+
+        def messages():
+            for application_id, applicant_id, company_user_id, applied_at in rnd.choices(
+                self.applications, weights=weights, k=self.sizes['messages'],
+            ):
+                sender, recipient = rnd.choice(((applicant_id, company_user_id), (company_user_id, applicant_id)))
+                is_read = rnd.random() < 0.8
+                if not is_read:
+                    self.unread[application_id, recipient] = self.unread.get((application_id, recipient), 0) + 1
+                yield Message(
+                    application_id=application_id, sender_id=sender, text=rnd.choice(MESSAGES), is_read=is_read,
+                    timestamp=self._after(applied_at, CONVERSATION_DAYS),
+                )
+
+        count = 0
+        for batch in _batches(messages()):
+            with transaction.atomic():
+                for message in Message.objects.bulk_create(batch):
+                    # Messages are not created in timestamp order; keep the latest
+                    last = self.last_messages.get(message.application_id)
+                    if last is None or message.timestamp >= last[1]:
+                        self.last_messages[message.application_id] = (message.text, message.timestamp)
+            count += len(batch)
+        self.log(f'{count} messages')
+
+    def seed_threads(self):
+        """One summary per participant of every application, as api.threads keeps them"""
+        def threads():
+            for application_id, applicant_id, company_user_id, applied_at in self.applications:
+                text, timestamp = self.last_messages.get(application_id, (None, None))
+                for participant, other in ((applicant_id, company_user_id), (company_user_id, applicant_id)):
+                    yield MessageThread(
+                        application_id=application_id, participant_id=participant, other_user_id=other,
+                        last_message=text, last_message_time=timestamp, activity_at=timestamp or applied_at,
+                        unread_count=self.unread.get((application_id, participant), 0),
+                    )
+
+        for batch in _batches(threads()):
+            with transaction.atomic():
+                MessageThread.objects.bulk_create(batch)
+        totals = {}
+        for (_, recipient_id), count in self.unread.items():
+            totals[recipient_id] = totals.get(recipient_id, 0) + count
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id, count=count) for user_id, count in totals.items()],
+            batch_size=BATCH_SIZE,
+        )
+        self.log(f'{2 * len(self.applications)} message threads')
+
+    def run(self):
+        with _explicit_timestamps(Job, JobApplication, Message):
+            self.seed_users()
+            self.seed_companies()
+            self.seed_jobs()
+            self.seed_applications()
+            self.seed_messages()
+            self.seed_threads()
+
+
+def already_seeded():
+    return User.objects.filter(email__startswith=EMAIL_PREFIX).exists()
@@ -0,0 +1,101 @@
+"""
+Golden checks and a micro-benchmark for the fast serialization path.
+
+For messages, applications and jobs, the first ``rows`` rows are serialized both
+ways: with the DRF serializer and JSONRenderer, and with the values_list()
+projection (api/projections.py) or stored card (api/cards.py) and ORJSONRenderer.
+The two must produce the same bytes. The renderer is also checked on its own
+against values chosen for where orjson and the stdlib differ. Both paths are then
+timed, query included, in CPU milliseconds per 1,000 rows.
+"""
+import datetime
+import decimal
+import time
+import uuid
+
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+
+from .models import Job, JobApplication, Message
+from .projections import application_records, message_records
+from .renderers import ORJSONRenderer
+from .serializers import JobApplicationSerializer, JobSerializer, MessageSerializer
+
+
+CASES = {
+    'messages': (
+        lambda rows: Message.objects.order_by('id')[:rows],
+        lambda queryset: MessageSerializer(queryset.select_related('sender'), many=True).data,
+        message_records,
+    ),
+    'applications': (
+        lambda rows: JobApplication.objects.order_by('id')[:rows],
+        lambda queryset: JobApplicationSerializer(queryset.select_related('job__company', 'applicant'), many=True).data,
+        application_records,
+    ),
+    'jobs': (
+        lambda rows: Job.objects.order_by('id')[:rows],
+        lambda queryset: JobSerializer(queryset.select_related('company'), many=True).data,
+        lambda queryset: list(queryset.values_list('card', flat=True)),
+    ),
+}
+
+RENDERER_SAMPLES = [
+    {'text': 'naïve café ☕ 😀', 'separators': 'line\u2028paragraph\u2029end', 'control': '\x00\x1f\x7f\t\n"\\/'},
+    [None, True, False, 0, -1, 2 ** 63 - 1, 0.1, 12.5, -0.0, 0.0001, round(2 / 3, 4)],
+    {'nested': {'list': [[], {}, [{'a': [1, {'b': None}]}]]}},
+    {'aware': timezone.now(), 'naive': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456),
+     'date': datetime.date(2024, 5, 1), 'time': datetime.time(9, 5)},
+    {'decimal': decimal.Decimal('12.50'), 'uuid': uuid.uuid4(), 'lazy': gettext_lazy('Not authorized.')},
+    {'big': 2 ** 70, 'int_keys': {1: 'one'}},
+]
+
+
+def golden_mismatches(rows):
+    """Descriptions of every output that differs between the two paths"""
+    drf, fast = JSONRenderer(), ORJSONRenderer()
+    mismatches = []
+    for index, sample in enumerate(RENDERER_SAMPLES):
+        if drf.render(sample) != fast.render(sample):
+            mismatches.append(f'renderer sample {index}: {drf.render(sample)!r} != {fast.render(sample)!r}')
+    for name, (queryset, serialize, project) in CASES.items():
+        expected = serialize(queryset(rows))
+        actual = project(queryset(rows))
+        if drf.render(expected) == fast.render(actual):
+            continue
+        for row, (want, got) in enumerate(zip(expected, actual)):
+            if drf.render(want) != fast.render(got):
+                mismatches.append(f'{name} row {row}: {drf.render(want)!r} != {fast.render(got)!r}')
+                break
+        else:
+            mismatches.append(f'{name}: {len(expected)} rows serialized, {len(actual)} projected')
+    return mismatches
+
+
+def _cpu_ms(function, rounds):
+    best = None
+    for _ in range(rounds):
+        start = time.process_time()
+        function()
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def run_serializer_benchmark(rows=1000, rounds=5):
+    drf, fast = JSONRenderer(), ORJSONRenderer()
+    results = {}
+    for name, (queryset, serialize, project) in CASES.items():
+        count = queryset(rows).count()
+        if not count:
+            continue
+        before = _cpu_ms(lambda: drf.render(serialize(queryset(rows))), rounds)
+        after = _cpu_ms(lambda: fast.render(project(queryset(rows))), rounds)
+        results[name] = {
+            'rows': count,
+            'serializer_ms_per_1000': round(before * 1000 / count, 2),
+            'projection_ms_per_1000': round(after * 1000 / count, 2),
+            'speedup': round(before / after, 1) if after else None,
+        }
+    return {'rounds': rounds, 'results': results}
@@ -1,6 +1,9 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from .models import User, CompanyProfile, Job, JobApplication, Message
+from .cards import company_info
+from .images import derivative_urls
+from .skills import clean_skills
 import json
 
 
@@ -32,10 +35,14 @@ class UserProfileSerializer(serializers.ModelSerializer):
     """Serializer for user profile"""
     skills = serializers.ListField(child=serializers.CharField(), required=False)
     resume = serializers.FileField(required=False, allow_null=True)
+    profile_picture_derivatives = serializers.SerializerMethodField()
     
     class Meta:
         model = User
-        fields = ['id', 'name', 'email', 'skills', 'experience', 'profile_picture', 'resume']
+        fields = ['id', 'name', 'email', 'skills', 'experience', 'profile_picture', 'profile_picture_derivatives', 'resume']
+
+    def get_profile_picture_derivatives(self, obj):
+        return derivative_urls(obj.profile_picture_derivatives)
 
 
 class UserUpdateSerializer(serializers.ModelSerializer):
@@ -48,6 +55,18 @@ class UserUpdateSerializer(serializers.ModelSerializer):
         fields = ['name', 'skills', 'location', 'experience', 'profile_picture', 
                  'education', 'phone', 'linkedin', 'portfolio', 'resume']
 
+    def validate_skills(self, value):
+        # Multipart uploads from older dashboards send one JSON-encoded list
+        return clean_skills(value)
+
+    def update(self, instance, validated_data):
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        # The instance is the cached request.user: saving every column would write back
+        # anything stored behind its back since, such as image derivatives
+        instance.save(update_fields=list(validated_data))
+        return instance
+
 
 class CompanyProfileCreateSerializer(serializers.ModelSerializer):
     """Serializer for creating company profile"""
@@ -64,13 +83,17 @@ class CompanyProfileSerializer(serializers.ModelSerializer):
     """Serializer for company profile"""
     job_listings = serializers.ListField(child=serializers.CharField(), required=False)
     logo = serializers.ImageField(required=False, allow_null=True)
+    logo_derivatives = serializers.SerializerMethodField()
     linkedin = serializers.CharField(required=False, allow_null=True)
     portfolio = serializers.CharField(required=False, allow_null=True)
     
     class Meta:
         model = CompanyProfile
         fields = ['id', 'company_name', 'email', 'industry', 'location', 
-                 'description', 'job_listings', 'logo', 'linkedin', 'portfolio']
+                 'description', 'job_listings', 'logo', 'logo_derivatives', 'linkedin', 'portfolio']
+
+    def get_logo_derivatives(self, obj):
+        return derivative_urls(obj.logo_derivatives)
 
 
 class CompanyUpdateSerializer(serializers.ModelSerializer):
@@ -97,48 +120,52 @@ class JobSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ['posted_at', 'company_snapshot', 'company_info']
 
+    def validate_requirements(self, value):
+        return value if value is None else clean_skills(value)
+
     def get_company_info(self, obj):
-        company = obj.company
-        return {
-            'company_name': company.company_name,
-            'industry': company.industry,
-            'description': company.description,
-            'logo': company.logo.url if company.logo else None,
-            'linkedin': company.linkedin,
-            'portfolio': company.portfolio,
-        } 
+        return company_info(obj.company)
+
+
+def decode_skills(skills):
+    """User.skills as a list, whichever shape it was stored in"""
+    # If it's a list with a single string that looks like a JSON array, parse it
+    if isinstance(skills, list) and len(skills) == 1 and isinstance(skills[0], str):
+        try:
+            val = json.loads(skills[0])
+            if isinstance(val, list):
+                return val
+        except Exception:
+            pass
+    if isinstance(skills, list):
+        return skills
+    if isinstance(skills, str):
+        try:
+            val = json.loads(skills)
+            if isinstance(val, list):
+                return val
+        except Exception:
+            pass
+    return []
 
 
 class ApplicantInfoSerializer(serializers.ModelSerializer):
     skills = serializers.SerializerMethodField()
     resume = serializers.FileField(required=False, allow_null=True)
     profile_picture = serializers.ImageField(required=False, allow_null=True)
+    profile_picture_derivatives = serializers.SerializerMethodField()
     class Meta:
         model = User
         fields = [
-            'id', 'name', 'email', 'skills', 'experience', 'profile_picture',
+            'id', 'name', 'email', 'skills', 'experience', 'profile_picture', 'profile_picture_derivatives',
             'education', 'location', 'phone', 'linkedin', 'portfolio', 'resume'
         ]
 
     def get_skills(self, obj):
-        # If it's a list with a single string that looks like a JSON array, parse it
-        if isinstance(obj.skills, list) and len(obj.skills) == 1 and isinstance(obj.skills[0], str):
-            try:
-                val = json.loads(obj.skills[0])
-                if isinstance(val, list):
-                    return val
-            except Exception:
-                pass
-        if isinstance(obj.skills, list):
-            return obj.skills
-        if isinstance(obj.skills, str):
-            try:
-                val = json.loads(obj.skills)
-                if isinstance(val, list):
-                    return val
-            except Exception:
-                pass
-        return []
+        return decode_skills(obj.skills)
+
+    def get_profile_picture_derivatives(self, obj):
+        return derivative_urls(obj.profile_picture_derivatives)
 
 class JobApplicationSerializer(serializers.ModelSerializer):
     applicant = ApplicantInfoSerializer(read_only=True)
@@ -0,0 +1,204 @@
+from django.core.signals import request_started
+from django.db import transaction
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+
+from .models import CompanyProfile, Job, JobApplication, Message, Skill, SkillAlias, User
+from .cards import refresh_job_card, refresh_company_cards
+from .threads import forget_message, open_threads, record_message, recount_unread
+from .events import publish
+from .versions import advance, bump
+from .db import configure_sqlite, reset_primary_pin
+from .instrumentation import install_query_recorder
+from .authentication import forget_user
+from .skills import link_skills
+from .matching import refresh_candidate, refresh_job, skill_aliases
+from .facets import job_facets
+from .images import derivatives_ready, schedule_derivatives
+
+
+@receiver([post_save, post_delete], sender=Job)
+def update_job_indexes(sender, instance, **kwargs):
+    """Advance the jobs stamp once the change commits and patch the matrix and facet index with it"""
+    job_id = instance.pk
+
+    def apply():
+        version = advance('jobs')
+        refresh_job(job_id, version)
+        job_facets.refresh(job_id, version)
+    transaction.on_commit(apply)
+
+
+@receiver(post_save, sender=User)
+def update_candidate_matrix(sender, instance, update_fields=None, **kwargs):
+    """A seeker's skills may have changed (logins only touch last_login)"""
+    if update_fields is None or 'skills' in update_fields:
+        user_id = instance.pk
+        transaction.on_commit(lambda: refresh_candidate(user_id))
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_delete, sender=CompanyProfile)
+def update_candidates_on_role_change(sender, instance, **kwargs):
+    """Users with a company profile are not candidates"""
+    user_id = instance.pk if sender is User else instance.user_id
+    transaction.on_commit(lambda: refresh_candidate(user_id))
+
+
+@receiver(post_save, sender=CompanyProfile)
+def drop_company_candidate(sender, instance, created, **kwargs):
+    # Editing a profile does not change the role
+    if created:
+        user_id = instance.user_id
+        transaction.on_commit(lambda: refresh_candidate(user_id))
+
+
+@receiver([post_save, post_delete], sender=Skill)
+@receiver([post_save, post_delete], sender=SkillAlias)
+def invalidate_skill_aliases(sender, **kwargs):
+    """Both matrices hold canonical skill names; they follow the skills stamp"""
+    # Now as well, so the rest of this request cleans skills with the edit
+    skill_aliases.invalidate()
+    bump('skills')
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    """Authentication caches users; stale entries are refused once the change commits"""
+    forget_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def forget_cached_company_user(sender, instance, **kwargs):
+    # Cached users carry their company profile
+    forget_user(instance.user_id)
+
+
+@receiver(post_save, sender=User)
+def link_user_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'skills' in update_fields):
+        link_skills(User, [(instance.pk, instance.skills)])
+
+
+@receiver(post_save, sender=Job)
+def link_job_skills(sender, instance, raw=False, update_fields=None, **kwargs):
+    if not raw and (update_fields is None or 'requirements' in update_fields):
+        link_skills(Job, [(instance.pk, instance.requirements)])
+
+
+@receiver(post_save, sender=Job)
+def update_job_card(sender, instance, raw=False, **kwargs):
+    if not raw:
+        refresh_job_card(instance)
+
+
+@receiver(post_save, sender=CompanyProfile)
+def update_company_job_cards(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        refresh_company_cards(instance)
+
+
+@receiver(post_save, sender=CompanyProfile)
+def build_logo_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_derivatives(instance, 'logo')
+
+
+@receiver(post_save, sender=User)
+def build_profile_picture_derivatives(sender, instance, raw=False, **kwargs):
+    if not raw:
+        schedule_derivatives(instance, 'profile_picture')
+
+
+@receiver(derivatives_ready, sender=CompanyProfile)
+def use_logo_derivatives(sender, instance, **kwargs):
+    refresh_company_cards(instance)
+    bump('companies', 'jobs')
+    # Stored with update(), so no post_save told authentication
+    forget_user(instance.user_id)
+
+
+@receiver(derivatives_ready, sender=User)
+def use_profile_picture_derivatives(sender, instance, **kwargs):
+    bump_user(instance.pk)
+    # Stored with update(), so no post_save told authentication
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=JobApplication)
+def create_message_threads(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        open_threads(instance)
+
+
+@receiver(post_save, sender=JobApplication)
+def push_application_status(sender, instance, created, raw=False, **kwargs):
+    if created or raw:
+        return
+    company_user_id = Job.objects.filter(pk=instance.job_id).values_list('company__user_id', flat=True).first()
+    publish(
+        [instance.applicant_id, company_user_id],
+        'application', {'id': instance.pk, 'job': instance.job_id, 'status': instance.status},
+    )
+
+
+@receiver(post_save, sender=Message)
+def update_message_threads(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        record_message(instance)
+
+
+@receiver(post_delete, sender=Message)
+def uncount_deleted_message(sender, instance, origin=None, **kwargs):
+    # Messages deleted with their application are recounted by recount_deleted_application
+    if isinstance(origin, Message) or getattr(origin, 'model', None) is Message:
+        forget_message(instance)
+
+
+@receiver(post_delete, sender=JobApplication)
+def recount_deleted_application(sender, instance, **kwargs):
+    company_user_id = Job.objects.filter(pk=instance.job_id).values_list('company__user_id', flat=True).first()
+    recount_unread([instance.applicant_id, company_user_id])
+
+
+@receiver([post_save, post_delete], sender=CompanyProfile)
+def bump_company_versions(sender, **kwargs):
+    # Job cards embed company info
+    bump('companies', 'jobs')
+
+
+@receiver([post_save, post_delete], sender=JobApplication)
+def bump_application_versions(sender, instance, **kwargs):
+    company_id = Job.objects.filter(pk=instance.job_id).values_list('company_id', flat=True).first()
+    bump(f'applicant:{instance.applicant_id}', f'company:{company_id}')
+
+
+@receiver([post_save, post_delete], sender=Message)
+def bump_message_versions(sender, instance, **kwargs):
+    bump(f'messages:{instance.application_id}')
+
+
+def bump_user(user_id):
+    """Bump the collections embedding the user's details.
+
+    Message lists and the user's own applications follow ``user:<id>``; applicant
+    lists are per company, so each company the user applied to is bumped.
+    """
+    company_ids = set(
+        JobApplication.objects.filter(applicant_id=user_id).order_by().values_list('job__company_id', flat=True)
+    )
+    bump(f'user:{user_id}', *(f'company:{company_id}' for company_id in company_ids))
+
+
+@receiver(post_save, sender=User)
+def bump_user_versions(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no response shows; new users appear nowhere yet
+    if created or (update_fields is not None and set(update_fields) <= {'last_login'}):
+        return
+    bump_user(instance.pk)
+
+
+connection_created.connect(configure_sqlite, dispatch_uid='api.db.configure_sqlite')
+request_started.connect(reset_primary_pin, dispatch_uid='api.db.reset_primary_pin')
+connection_created.connect(install_query_recorder, dispatch_uid='api.instrumentation.install_query_recorder')
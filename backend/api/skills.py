@@ -0,0 +1,147 @@
+"""
+Skill taxonomy.
+
+Seeker skills and job requirements are typed free-form, so one skill shows up as
+"Python", "python " and, from an old dashboard upload, '["Python"]'. Each skill has
+one Skill row under its canonical name, and SkillAlias maps other spellings ("js",
+"reactjs") onto it. ``matching.canonical_skill`` resolves both, for the links here,
+for ``clean_skills`` and for match scoring alike. Users and jobs are linked to their
+skills through ``skill_set``, so "users/jobs having skill X" is an indexed join.
+
+The JSON lists stay as the display copy, cleaned on write by ``clean_skills``
+(trimmed, deduplicated, JSON-encoded uploads unwrapped). The links are rebuilt from them
+whenever a user or job is saved (api/signals.py), by the bulk writers (job imports,
+seed_data), and by ``rebuild_skill_links`` after aliases change.
+"""
+import json
+
+from .matching import canonical_skill, parse_skills
+
+
+MAX_NAME_LENGTH = 100
+MAX_ENCODING_DEPTH = 5
+LINK_BATCH_SIZE = 1000
+# Stay under SQLite's limit on variables per statement
+_IN_CHUNK = 500
+
+SOURCE_FIELDS = {'user': 'skills', 'job': 'requirements'}
+
+
+def _unwrap(items):
+    """Undo JSON encoding that was applied, possibly repeatedly, before the list was split on commas"""
+    for _ in range(MAX_ENCODING_DEPTH):
+        text = ','.join(items)
+        if not text.lstrip().startswith(('[', '"')):
+            break
+        try:
+            value = json.loads(text)
+        except ValueError:
+            break
+        if isinstance(value, str):
+            value = [value]
+        if not isinstance(value, list):
+            break
+        items = [str(item) for item in value if item is not None]
+    return items
+
+
+def clean_skills(value):
+    """A skills/requirements blob as a flat list of trimmed strings, one per canonical skill"""
+    cleaned = []
+    seen = set()
+    for raw in _unwrap(parse_skills(value)):
+        text = ' '.join(raw.split())
+        term = canonical_skill(text)
+        if term and term not in seen:
+            seen.add(term)
+            cleaned.append(text)
+    return cleaned
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), _IN_CHUNK):
+        yield values[start:start + _IN_CHUNK]
+
+
+def _models(model):
+    field = model._meta.get_field('skill_set')
+    skill_model = field.related_model
+    return field.remote_field.through, field.m2m_field_name(), skill_model, skill_model.aliases.rel.related_model
+
+
+def _lookup(skill_model, alias_model, terms):
+    ids = {}
+    for chunk in _chunks(terms):
+        ids.update(alias_model.objects.filter(name__in=chunk).values_list('name', 'skill_id'))
+    rest = [term for term in terms if term not in ids]
+    for chunk in _chunks(rest):
+        ids.update(skill_model.objects.filter(name__in=chunk).values_list('name', 'id'))
+    return ids
+
+
+def resolve_skills(model, terms, create=True):
+    """Skill ids of normalized ``terms`` keyed by term; unknown terms become new skills unless ``create`` is false"""
+    _, _, skill_model, alias_model = _models(model)
+    terms = {term for term in terms if len(term) <= MAX_NAME_LENGTH}
+    ids = _lookup(skill_model, alias_model, terms)
+    missing = terms - ids.keys()
+    if missing and create:
+        skill_model.objects.bulk_create([skill_model(name=name) for name in missing], ignore_conflicts=True)
+        ids.update(_lookup(skill_model, alias_model, missing))
+    return ids
+
+
+def link_skills(model, rows, replace=True):
+    """Link ``model`` (User or Job) rows to the skills of their blobs, from ``(pk, blob)`` pairs.
+
+    ``replace=False`` skips deleting existing links, for rows that were just created.
+    """
+    through, source, _, _ = _models(model)
+    rows = [(pk, [canonical_skill(skill) for skill in clean_skills(blob)]) for pk, blob in rows]
+    ids = resolve_skills(model, {term for _, terms in rows for term in terms})
+    if replace:
+        for chunk in _chunks(pk for pk, _ in rows):
+            through.objects.filter(**{f'{source}_id__in': chunk}).delete()
+    links = {(pk, ids[term]) for pk, terms in rows for term in terms if term in ids}
+    through.objects.bulk_create(
+        [through(**{f'{source}_id': pk, 'skill_id': skill_id}) for pk, skill_id in links],
+        batch_size=LINK_BATCH_SIZE, ignore_conflicts=True,
+    )
+
+
+def rebuild_skill_links(model):
+    """Relink every row of ``model``; returns how many were processed"""
+    field = SOURCE_FIELDS[model._meta.model_name]
+    rows = model.objects.order_by('pk').values_list('pk', field).iterator(chunk_size=LINK_BATCH_SIZE)
+    batch = []
+    count = 0
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= LINK_BATCH_SIZE:
+            link_skills(model, batch)
+            count += len(batch)
+            batch = []
+    if batch:
+        link_skills(model, batch)
+        count += len(batch)
+    return count
+
+
+def skill_ids(model, names):
+    """Ids of the skills named by ``names`` (any spelling), or None if any is unknown"""
+    terms = [canonical_skill(name) for name in names]
+    ids = resolve_skills(model, terms, create=False)
+    if any(term not in ids for term in terms):
+        return None
+    return [ids[term] for term in terms]
+
+
+def having_skills(queryset, names):
+    """``queryset`` of users or jobs narrowed to rows linked to every skill in ``names``"""
+    ids = skill_ids(queryset.model, names)
+    if ids is None:
+        return queryset.none()
+    for skill_id in ids:
+        queryset = queryset.filter(skill_set=skill_id)
+    return queryset
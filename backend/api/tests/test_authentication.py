@@ -0,0 +1,69 @@
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, TestCase
+from rest_framework_simplejwt.settings import api_settings
+
+from api.authentication import CachedJWTAuthentication, UserRefreshToken, _cache_key
+from api.models import User
+from api.scenarios import client_for
+
+
+class CachedUserTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='seeker@example.com', email='seeker@example.com', password='secret-pass',
+        )
+        self.client = client_for(self.user)
+        self.token = UserRefreshToken.for_user(self.user).access_token
+
+    def test_cached_user_needs_no_query(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        with self.assertNumQueries(0):
+            CachedJWTAuthentication().get_user(self.token)
+
+    def test_deactivation_refuses_the_cached_user(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        # Another process still holds the entry; only the shared stamp tells it of the change
+        entry = cache.get(_cache_key(self.user.pk))
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        cache.set(_cache_key(self.user.pk), entry)
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def test_password_change_refuses_old_tokens(self):
+        # Tokens then carry a hash of the password they were issued under
+        with mock.patch.object(api_settings, 'CHECK_REVOKE_TOKEN', True):
+            client = client_for(self.user)
+            self.assertEqual(client.get('/api/auth/profile/').status_code, 200)
+            self.user.set_password('new-secret-pass')
+            with self.captureOnCommitCallbacks(execute=True):
+                self.user.save()
+            self.assertEqual(client.get('/api/auth/profile/').status_code, 401)
+
+    def test_entry_loaded_before_a_change_is_not_served_after_it(self):
+        # A request loads the user, another process commits a deactivation, then the first stores its entry
+        auth = CachedJWTAuthentication()
+        version, _ = auth._cached(self.user.pk, None)
+        stale = User.objects.get(pk=self.user.pk)
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+        cache.set(_cache_key(self.user.pk), (version, stale))
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 401)
+
+    def deactivate(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    async def test_async_views_refuse_the_cached_user(self):
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {self.token}'}
+        self.assertEqual((await client.get('/api/messages/unread-count/', headers=headers)).status_code, 200)
+        await sync_to_async(self.deactivate)()
+        self.assertEqual((await client.get('/api/messages/unread-count/', headers=headers)).status_code, 401)
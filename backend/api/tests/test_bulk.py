@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from api.facets import job_facets
+from api.models import CompanyProfile, Job, User
+from api.scenarios import client_for
+
+
+class BulkImportTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        self.company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        Job.objects.create(company=self.company, title='Existing', description='d', location='Remote')
+
+    def test_imported_jobs_reach_the_facet_index_after_commit(self):
+        job_facets.invalidate()
+        self.assertEqual(job_facets.get().query({})[1]['location'], {'remote': 1})
+        csv = 'title,description,location\nA,b,Remote\nC,d,Berlin\nE,f,\n'
+        with self.captureOnCommitCallbacks(execute=True):
+            response = client_for(self.company_user).post('/api/jobs/bulk/', data=csv, content_type='text/csv')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual((response.json()['created'], response.json()['error_count']), (2, 1))
+        self.assertEqual(job_facets.get().query({})[1]['location'], {'remote': 2, 'berlin': 1})
+
+    def test_dry_run_counts_valid_rows_without_creating_them(self):
+        csv = 'title,description,location\nA,b,Remote\nC,d,Berlin\n'
+        response = client_for(self.company_user).post(
+            '/api/jobs/bulk/?dry_run=true', data=csv, content_type='text/csv',
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created'], 2)
+        self.assertEqual(Job.objects.count(), 1)
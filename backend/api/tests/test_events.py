@@ -0,0 +1,143 @@
+import asyncio
+import datetime
+import json
+from unittest import mock
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import AsyncClient, SimpleTestCase, TestCase
+from rest_framework_simplejwt.utils import aware_utcnow
+
+from api import events
+from api.authentication import UserRefreshToken
+from api.events import SUBSCRIPTION_QUEUE_SIZE, InProcessBroker, format_sse, publish
+from api.models import User
+
+
+async def next_event(subscription):
+    return await asyncio.wait_for(subscription.get(), timeout=5)
+
+
+class InProcessBrokerTests(SimpleTestCase):
+
+    async def test_publish_fans_out_to_every_subscription_of_the_user(self):
+        broker = InProcessBroker()
+        tabs = [broker.subscribe(1), broker.subscribe(1)]
+        other = broker.subscribe(2)
+        broker.publish(1, {'type': 'message', 'data': {'id': 7}})
+        for tab in tabs:
+            self.assertEqual(await next_event(tab), {'type': 'message', 'data': {'id': 7}})
+        await asyncio.sleep(0)
+        self.assertTrue(other.queue.empty())
+
+    async def test_closed_subscriptions_stop_receiving(self):
+        broker = InProcessBroker()
+        first, second = broker.subscribe(1), broker.subscribe(1)
+        first.close()
+        broker.publish(1, {'type': 'unread', 'data': {'count': 1}})
+        self.assertEqual((await next_event(second))['type'], 'unread')
+        self.assertTrue(first.queue.empty())
+        second.close()
+        self.assertEqual(broker._subscribers, {})
+
+    async def test_slow_subscribers_lose_events_past_the_queue_size(self):
+        broker = InProcessBroker()
+        subscription = broker.subscribe(1)
+        for n in range(SUBSCRIPTION_QUEUE_SIZE + 5):
+            broker.publish(1, {'type': 'unread', 'data': {'count': n}})
+        await asyncio.sleep(0)
+        self.assertEqual(subscription.queue.qsize(), SUBSCRIPTION_QUEUE_SIZE)
+        self.assertEqual((await next_event(subscription))['data'], {'count': 0})
+
+
+class PublishTests(TestCase):
+
+    def test_publish_waits_for_commit_and_sends_once_per_user(self):
+        broker = mock.Mock()
+        with mock.patch.object(events, '_broker', broker):
+            with self.captureOnCommitCallbacks(execute=True):
+                publish([1, 2, 1], 'application', {'id': 3})
+                broker.publish.assert_not_called()
+        self.assertCountEqual(
+            broker.publish.call_args_list,
+            [mock.call(1, {'type': 'application', 'data': {'id': 3}}),
+             mock.call(2, {'type': 'application', 'data': {'id': 3}})],
+        )
+
+
+class FormatSseTests(SimpleTestCase):
+
+    def test_one_event_per_frame(self):
+        frame = format_sse({'type': 'message', 'data': {
+            'text': 'line one\nline two', 'at': datetime.datetime(2026, 1, 2, 3, 4, 5),
+        }})
+        self.assertTrue(frame.endswith('\n\n'))
+        lines = frame[:-2].split('\n')
+        # Newlines in the data stay JSON-escaped, so a frame has exactly one data line
+        self.assertEqual(lines[0], 'event: message')
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[1].startswith('data: '))
+        self.assertEqual(
+            json.loads(lines[1][len('data: '):]), {'text': 'line one\nline two', 'at': '2026-01-02T03:04:05'},
+        )
+
+
+class EventStreamTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seeker@example.com', email='seeker@example.com')
+        self.token = str(UserRefreshToken.for_user(self.user).access_token)
+        patcher = mock.patch.object(events, '_broker', InProcessBroker())
+        self.broker = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    async def test_stream_frames_published_events(self):
+        response = await AsyncClient().get('/api/events/stream/', {'token': self.token})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        frames = aiter(response.streaming_content)
+        self.assertEqual(await asyncio.wait_for(anext(frames), timeout=5), b'retry: 5000\n\n')
+        self.assertEqual(len(self.broker._subscribers[self.user.id]), 1)
+        self.broker.publish(self.user.id, {'type': 'unread', 'data': {'count': 2}})
+        frame = await asyncio.wait_for(anext(frames), timeout=5)
+        self.assertEqual(frame, b'event: unread\ndata: {"count": 2}\n\n')
+        await frames.aclose()
+
+    async def test_stream_requires_a_valid_token(self):
+        response = await AsyncClient().get('/api/events/stream/', {'token': 'invalid'})
+        self.assertEqual(response.status_code, 401)
+
+    def test_stream_requires_asgi(self):
+        self.assertEqual(self.client.get('/api/events/stream/', {'token': self.token}).status_code, 501)
+
+    async def open_stream(self):
+        response = await AsyncClient().get('/api/events/stream/', {'token': self.token})
+        self.assertEqual(response.status_code, 200)
+        frames = aiter(response.streaming_content)
+        self.assertEqual(await asyncio.wait_for(anext(frames), timeout=5), b'retry: 5000\n\n')
+        return frames
+
+    def deactivate(self):
+        self.user.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.save()
+
+    async def test_stream_ends_when_the_user_is_deactivated(self):
+        with mock.patch.object(events, 'KEEPALIVE_SECONDS', 0.01):
+            frames = await self.open_stream()
+            self.assertEqual(await asyncio.wait_for(anext(frames), timeout=5), b': keepalive\n\n')
+            await sync_to_async(self.deactivate)()
+            self.broker.publish(self.user.id, {'type': 'unread', 'data': {'count': 2}})
+            with self.assertRaises(StopAsyncIteration):
+                await asyncio.wait_for(anext(frames), timeout=5)
+        self.assertEqual(self.broker._subscribers, {})
+
+    async def test_stream_ends_when_the_token_expires(self):
+        with mock.patch.object(events, 'KEEPALIVE_SECONDS', 0.01):
+            frames = await self.open_stream()
+            later = aware_utcnow() + datetime.timedelta(days=1)
+            with mock.patch.object(events, 'aware_utcnow', return_value=later):
+                with self.assertRaises(StopAsyncIteration):
+                    await asyncio.wait_for(anext(frames), timeout=5)
+        self.assertEqual(self.broker._subscribers, {})
@@ -0,0 +1,44 @@
+from django.test import AsyncClient, TestCase
+
+from api.authentication import UserRefreshToken
+from api.exports import EXPORT_BUFFER_BYTES
+from api.models import CompanyProfile, Job, JobApplication, User
+from api.scenarios import client_for
+
+
+class ExportApplicantsTests(TestCase):
+
+    def setUp(self):
+        company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        JobApplication.objects.bulk_create(
+            JobApplication(
+                job=job, cover_letter='x' * 500,
+                applicant=User.objects.create_user(username=f'seeker{n}@example.com', email=f'seeker{n}@example.com'),
+            )
+            for n in range(300)
+        )
+        self.company_user = company_user
+        self.token = UserRefreshToken.for_user(company_user).access_token
+
+    def test_wsgi_export_streams_sync_chunks(self):
+        response = client_for(self.company_user).get('/api/companies/applicants/export/', {'output_format': 'ndjson'})
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.is_async)
+        self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 300)
+
+    async def test_asgi_export_streams_async_chunks(self):
+        response = await AsyncClient().get(
+            '/api/companies/applicants/export/', {'output_format': 'ndjson'},
+            headers={'Authorization': f'Bearer {self.token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        # Django buffers a sync iterator whole under ASGI; an async one is sent chunk by chunk
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertGreater(len(chunks), 1)
+        self.assertTrue(all(len(chunk) < 2 * EXPORT_BUFFER_BYTES for chunk in chunks))
+        self.assertEqual(len(b''.join(chunks).splitlines()), 300)
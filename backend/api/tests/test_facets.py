@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from api.facets import job_facets
+from api.models import CompanyProfile, Job, User
+from api.scenarios import client_for
+from api.versions import advance
+
+
+class JobFacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        self.company = CompanyProfile.objects.create(
+            user=user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+
+    def job(self, location, **fields):
+        return Job(company=self.company, title='Dev', description='d', location=location, **fields)
+
+    def test_location_filter_matches_the_counted_spellings(self):
+        Job.objects.bulk_create([self.job(location) for location in ('New  York', 'new york', ' NEW YORK', 'Newark')])
+        job_facets.invalidate()
+        self.assertEqual(job_facets.get().query({})[1]['location'], {'new york': 3, 'newark': 1})
+        response = client_for(None).get('/api/jobs/', {'location': 'New York'})
+        self.assertEqual(len(response.json()['results']), 3)
+        response = client_for(None).get('/api/jobs/facets/', {'location': 'new   YORK'})
+        self.assertEqual(response.json()['count'], 3)
+
+    def test_job_saves_patch_the_built_index_once_committed(self):
+        job_facets.invalidate()
+        index = job_facets.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(company=self.company, title='Dev', description='d', location='Berlin')
+        self.assertIs(job_facets.get(), index)
+        self.assertEqual(index.query({})[1]['location'], {'berlin': 1})
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.assertIs(job_facets.get(), index)
+        self.assertEqual(index.query({})[1]['location'], {})
+
+    def test_changes_from_other_processes_rebuild_the_index(self):
+        job_facets.invalidate()
+        index = job_facets.get()
+        # Another process's write: no signal here, only its stamp
+        Job.objects.bulk_create([self.job('Berlin')])
+        advance('jobs')
+        self.assertIsNot(job_facets.get(), index)
+        self.assertEqual(job_facets.get().query({})[1]['location'], {'berlin': 1})
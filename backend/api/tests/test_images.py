@@ -0,0 +1,65 @@
+import shutil
+import tempfile
+from io import BytesIO
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api.images import build_derivatives
+from api.models import User
+from api.scenarios import client_for
+
+
+def png(size=(600, 400)):
+    buffer = BytesIO()
+    Image.new('RGB', size, (200, 50, 50)).save(buffer, 'PNG')
+    return ContentFile(buffer.getvalue())
+
+
+class ProfilePictureDerivativeTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='seeker@example.com', email='seeker@example.com', name='Old')
+        self.user.profile_picture.save('me.png', png())
+        self.client = client_for(self.user)
+
+    def test_profile_edit_after_derivatives_keeps_them(self):
+        # Authentication now holds the user from before the derivatives were stored
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            build_derivatives(User, self.user.pk, 'profile_picture')
+        built = User.objects.get(pk=self.user.pk).profile_picture_derivatives
+        self.assertEqual(built['source'], self.user.profile_picture.name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.put('/api/auth/update/', {'name': 'New'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(user.name, 'New')
+        self.assertEqual(user.profile_picture_derivatives, built)
+        self.assertTrue(default_storage.exists(built['small']['webp']))
+
+    def test_profile_edit_saves_only_submitted_fields(self):
+        self.assertEqual(self.client.get('/api/auth/profile/').status_code, 200)
+        # Written behind the cached user's back, as the derivative worker does
+        User.objects.filter(pk=self.user.pk).update(location='Addis Ababa')
+        response = self.client.put('/api/auth/update/', {'name': 'New'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(User.objects.get(pk=self.user.pk).location, 'Addis Ababa')
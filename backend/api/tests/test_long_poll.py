@@ -0,0 +1,61 @@
+import asyncio
+
+from django.test import AsyncClient, TestCase
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from api import views
+from api.authentication import UserRefreshToken
+from api.models import CompanyProfile, Job, JobApplication, User
+from api.threads import MAX_LONG_POLL_SECONDS, long_poll_seconds
+
+
+class LongPollSecondsTests(TestCase):
+
+    def test_clamps_finite_values(self):
+        self.assertEqual(long_poll_seconds('5'), 5)
+        self.assertEqual(long_poll_seconds('-1'), 0)
+        self.assertEqual(long_poll_seconds('1e9'), MAX_LONG_POLL_SECONDS)
+
+    def test_rejects_non_finite_values(self):
+        for value in ('nan', 'NaN', 'inf', '-inf', 'Infinity', 'abc'):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                long_poll_seconds(value)
+
+
+class ApplicationMessagesWaitTests(TestCase):
+
+    def setUp(self):
+        self.seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com')
+        company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        self.application = JobApplication.objects.create(job=job, applicant=self.seeker)
+
+    def test_non_finite_wait_is_rejected(self):
+        for wait in ('nan', 'inf'):
+            with self.subTest(wait=wait):
+                request = APIRequestFactory().get(
+                    f'/api/applications/{self.application.id}/messages/', {'after_id': 0, 'wait': wait},
+                )
+                force_authenticate(request, user=self.seeker)
+                response = views.application_messages(request, application_id=self.application.id)
+                self.assertEqual(response.status_code, 400)
+
+
+class AsyncApplicationMessagesWaitTests(ApplicationMessagesWaitTests):
+
+    def setUp(self):
+        super().setUp()
+        self.token = UserRefreshToken.for_user(self.seeker).access_token
+
+    async def test_non_finite_wait_is_rejected(self):
+        client = AsyncClient()
+        for wait in ('nan', 'inf'):
+            with self.subTest(wait=wait):
+                response = await asyncio.wait_for(client.get(
+                    f'/api/applications/{self.application.id}/messages/', {'after_id': 0, 'wait': wait},
+                    headers={'Authorization': f'Bearer {self.token}'},
+                ), timeout=5)
+                self.assertEqual(response.status_code, 400)
@@ -0,0 +1,152 @@
+import datetime
+import random
+
+from django.test import TestCase
+
+from api.matching import (
+    MAX_CHANGED_ROWS, CandidateMatrix, SkillMatrix, candidate_matrix, canonical_skill, skill_aliases, skill_matrix,
+)
+from api.models import CompanyProfile, Job, Skill, SkillAlias, User
+from api.skills import clean_skills
+from api.versions import advance
+
+
+SKILLS = ['python', 'django', 'react', 'sql', 'go', 'rust', 'docker', 'aws']
+
+
+class CandidateMatrixUpdateTests(TestCase):
+
+    def test_patched_matrix_ranks_like_a_rebuilt_one(self):
+        rng = random.Random(7)
+        rows = {user_id: rng.sample(SKILLS, rng.randint(0, 4)) for user_id in range(1, 200)}
+        matrix = CandidateMatrix(sorted(rows.items()))
+        for _ in range(150):
+            # Changed skills, dropped seekers, and seekers new to the matrix
+            user_id = rng.randint(1, 260)
+            rows[user_id] = rng.sample(SKILLS, rng.randint(0, 4))
+            matrix.update(user_id, rows[user_id])
+        rebuilt = CandidateMatrix(sorted(rows.items()))
+        self.assertEqual(len(matrix), len(rebuilt))
+        for metric in ('cosine', 'jaccard'):
+            for requirements in (['python'], ['react', 'sql', 'unknown'], SKILLS, []):
+                with self.subTest(metric=metric, requirements=requirements):
+                    self.assertEqual(
+                        matrix.top_k(requirements, 50, metric=metric),
+                        rebuilt.top_k(requirements, 50, metric=metric),
+                    )
+                    self.assertEqual(
+                        matrix.top_k(requirements, 10, metric=metric, user_ids=[3, 250, 5, 999]),
+                        rebuilt.top_k(requirements, 10, metric=metric, user_ids=[3, 250, 5, 999]),
+                    )
+
+    def test_user_saves_patch_the_built_matrix(self):
+        seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com', skills=['go'])
+        candidate_matrix.invalidate()
+        matrix = candidate_matrix.get()
+        seeker.skills = ['python', 'django']
+        with self.captureOnCommitCallbacks(execute=True):
+            seeker.save()
+        self.assertIs(candidate_matrix.get(), matrix)
+        self.assertEqual(matrix.top_k(['python'], 10)[0], [seeker.id])
+        self.assertEqual(matrix.top_k(['go'], 10)[0], [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            CompanyProfile.objects.create(
+                user=seeker, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+            )
+        self.assertEqual(matrix.top_k(['python'], 10)[0], [])
+
+    def test_rebuilds_after_too_many_patches(self):
+        candidate_matrix.invalidate()
+        matrix = candidate_matrix.get()
+        for user_id in range(MAX_CHANGED_ROWS):
+            matrix.update(-user_id, ['python'])
+        candidate_matrix.update('candidates', advance('candidates'), 1, ['python'])
+        self.assertIsNot(candidate_matrix.get(), matrix)
+        candidate_matrix.invalidate()
+
+
+class SkillMatrixUpdateTests(TestCase):
+
+    def setUp(self):
+        user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        self.company = CompanyProfile.objects.create(
+            user=user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+
+    def test_patched_matrix_ranks_like_a_rebuilt_one(self):
+        rng = random.Random(11)
+        today = datetime.date(2026, 6, 1)
+        deadlines = [None, today, today - datetime.timedelta(days=1), today + datetime.timedelta(days=30)]
+        rows = {job_id: (rng.sample(SKILLS, rng.randint(0, 4)), rng.choice(deadlines)) for job_id in range(1, 200)}
+        matrix = SkillMatrix((job_id, *row) for job_id, row in sorted(rows.items()))
+        for _ in range(150):
+            # Changed requirements and deadlines, deleted jobs, and new ones
+            job_id = rng.randint(1, 260)
+            if rng.random() < 0.2:
+                rows.pop(job_id, None)
+                matrix.update(job_id, None, None)
+            else:
+                rows[job_id] = rng.sample(SKILLS, rng.randint(0, 4)), rng.choice(deadlines)
+                matrix.update(job_id, *rows[job_id])
+        rebuilt = SkillMatrix((job_id, *row) for job_id, row in sorted(rows.items()))
+        for metric in ('cosine', 'jaccard'):
+            for skills in (['python'], ['react', 'sql', 'unknown'], SKILLS, []):
+                with self.subTest(metric=metric, skills=skills):
+                    self.assertEqual(
+                        matrix.top_k(skills, 50, metric=metric, today=today),
+                        rebuilt.top_k(skills, 50, metric=metric, today=today),
+                    )
+
+    def test_job_saves_patch_the_built_matrix_once_committed(self):
+        skill_matrix.invalidate()
+        matrix = skill_matrix.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            job = Job.objects.create(
+                company=self.company, title='Dev', description='d', location='Remote', requirements=['python'],
+            )
+            # Not before the commit: a rebuild now could still miss the job
+            self.assertEqual(matrix.top_k(['python'], 10)[0], [])
+        self.assertIs(skill_matrix.get(), matrix)
+        self.assertEqual(matrix.top_k(['python'], 10)[0], [job.id])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            job.delete()
+        self.assertIs(skill_matrix.get(), matrix)
+        self.assertEqual(matrix.top_k(['python'], 10)[0], [])
+
+    def test_changes_from_other_processes_rebuild_the_matrix(self):
+        skill_matrix.invalidate()
+        matrix = skill_matrix.get()
+        # Another process's write: no signal here, only its stamp
+        job = Job.objects.bulk_create([Job(
+            company=self.company, title='Dev', description='d', location='Remote', requirements=['go'],
+        )])[0]
+        advance('jobs')
+        rebuilt = skill_matrix.get()
+        self.assertIsNot(rebuilt, matrix)
+        self.assertEqual(rebuilt.top_k(['go'], 10)[0], [job.id])
+
+        # A local patch after another change it did not see drops the matrix instead
+        advance('jobs')
+        with self.captureOnCommitCallbacks(execute=True):
+            Job.objects.filter(pk=job.pk).first().save()
+        self.assertIsNot(skill_matrix.get(), rebuilt)
+
+
+class SkillAliasTests(TestCase):
+
+    def test_aliases_resolve_for_cleaning_and_matching(self):
+        self.assertEqual(canonical_skill(' JS '), 'javascript')
+        self.assertEqual(clean_skills(['js', 'JavaScript', 'React.js', 'react']), ['js', 'React.js'])
+        jobs = SkillMatrix([(1, ['javascript', 'react'], None), (2, ['python'], None)])
+        self.assertEqual(jobs.top_k(['JS', 'reactjs'], 10)[:2], ([1], [1.0]))
+        seekers = CandidateMatrix([(1, ['k8s']), (2, ['kubernetes', 'go'])])
+        self.assertEqual(seekers.top_k(['Kubernetes'], 10)[0], [1, 2])
+
+    def test_alias_edits_take_effect(self):
+        self.assertEqual(canonical_skill('py'), 'py')
+        # The alias is rolled back without a post_delete
+        self.addCleanup(skill_aliases.invalidate)
+        SkillAlias.objects.create(name='py', skill=Skill.objects.get(name='python'))
+        self.assertEqual(canonical_skill('py'), 'python')
@@ -0,0 +1,90 @@
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import AsyncClient, TestCase, override_settings
+
+from api.authentication import UserRefreshToken
+from api.models import CompanyProfile, Job, JobApplication, User
+from api.scenarios import client_for
+
+
+class ServeMediaTests(TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(MEDIA_ROOT=cls.media_root, MEDIA_ACCEL='')
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com')
+        self.seeker.resume.save('secret.pdf', ContentFile(b'0123456789' * 10))
+        self.url = self.seeker.resume.url
+        company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        JobApplication.objects.create(job=job, applicant=self.seeker)
+        self.company_user = company_user
+        other_user = User.objects.create_user(username='other@example.com', email='other@example.com')
+        CompanyProfile.objects.create(
+            user=other_user, company_name='Other', email='other@example.com', industry='IT', location='Remote',
+        )
+        self.other_user = other_user
+        self.token = UserRefreshToken.for_user(self.seeker).access_token
+
+    def test_resume_readable_by_owner_and_applied_company(self):
+        for user in (self.seeker, self.company_user):
+            response = client_for(user).get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(b''.join(response.streaming_content), b'0123456789' * 10)
+
+    def test_resume_hidden_from_others(self):
+        for user in (None, self.other_user):
+            self.assertEqual(client_for(user).get(self.url).status_code, 404)
+
+    def test_dot_segments_do_not_bypass_authorization(self):
+        name = self.seeker.resume.name
+        for path in (
+            f'/api/media/./{name}',
+            f'/api/media/company_logos/../{name}',
+            f'/api/media/x/%2e%2e/{name}',
+            f'/api/media/x/%2E%2E/{name}',
+            f'/api/media//{name}',
+            f'/api/media/resumes//{name.split("/")[-1]}',
+        ):
+            with self.subTest(path=path):
+                self.assertEqual(client_for(None).get(path).status_code, 404)
+                self.assertEqual(client_for(self.other_user).get(path).status_code, 404)
+
+    def test_range_and_conditional_requests(self):
+        client = client_for(self.seeker)
+        response = client.get(self.url, HTTP_RANGE='bytes=10-19')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], 'bytes 10-19/100')
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(client.get(self.url, HTTP_RANGE='bytes=200-').status_code, 416)
+        etag = client.head(self.url)['ETag']
+        self.assertEqual(client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    async def test_asgi_download_streams_async_chunks(self):
+        client = AsyncClient()
+        headers = {'Authorization': f'Bearer {self.token}'}
+        response = await client.get(self.url, headers=headers)
+        self.assertEqual(response.status_code, 200)
+        # Django reads a sync FileResponse whole into memory under ASGI
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['Content-Length'], '100')
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'0123456789' * 10)
+        response = await client.get(self.url, headers={**headers, 'Range': 'bytes=10-19'})
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join([chunk async for chunk in response.streaming_content]), b'0123456789')
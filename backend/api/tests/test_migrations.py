@@ -0,0 +1,41 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class JobCardMigrationTests(TransactionTestCase):
+    """Cards built and moved to /api/media/ by 0009, 0013 and 0016, from their own copies of api.cards"""
+
+    start = [('api', '0008_job_posted_indexes')]
+
+    def setUp(self):
+        executor = MigrationExecutor(connection)
+        self.latest = executor.loader.graph.leaf_nodes('api')
+        executor.migrate(self.start)
+        apps = executor.loader.project_state(self.start).apps
+        User = apps.get_model('api', 'User')
+        CompanyProfile = apps.get_model('api', 'CompanyProfile')
+        Job = apps.get_model('api', 'Job')
+        user = User.objects.create(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+            logo='company_logos/acme.png',
+        )
+        self.job_id = Job.objects.create(
+            company=company, title='Dev', description='d', location='Remote',
+            company_snapshot={'company_name': 'Acme', 'logo': '/media/company_logos/old.png'},
+        ).pk
+
+    def tearDown(self):
+        MigrationExecutor(connection).migrate(self.latest)
+
+    def test_cards_and_snapshots_point_at_the_api_media_url(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(self.latest)
+        Job = executor.loader.project_state(self.latest).apps.get_model('api', 'Job')
+        job = Job.objects.get(pk=self.job_id)
+        self.assertEqual(job.company_snapshot['logo'], '/api/media/company_logos/old.png')
+        self.assertEqual(job.card['company_snapshot'], job.company_snapshot)
+        self.assertEqual(job.card['company_info']['logo'], '/api/media/company_logos/acme.png')
+        self.assertIsNone(job.card['company_info']['logo_derivatives'])
+        self.assertEqual(job.card['title'], 'Dev')
@@ -0,0 +1,61 @@
+import asyncio
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import AsyncClient, TestCase, override_settings
+
+from api.authentication import UserRefreshToken
+from api.models import User
+from api.scenarios import client_for
+
+
+def slow_records(applications):
+    time.sleep(0.1)
+    return []
+
+
+async def slow_unread_count(user):
+    await asyncio.sleep(0.1)
+    return 0
+
+
+class SlowRequestSamplingTests(TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory, ignore_errors=True)
+        settings_override = override_settings(
+            PROFILING_DIR=self.directory, PROFILING_SLOW_MS=20, PROFILING_SAMPLE_INTERVAL_MS=2,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.user = User.objects.create_user(username='seeker@example.com', email='seeker@example.com')
+        self.headers = {'Authorization': f'Bearer {UserRefreshToken.for_user(self.user).access_token}'}
+
+    def samples(self):
+        names = [name for name in os.listdir(self.directory) if name.endswith('.collapsed')]
+        self.assertEqual(len(names), 1)
+        with open(os.path.join(self.directory, names[0])) as samples:
+            return samples.read()
+
+    def test_wsgi_request(self):
+        with mock.patch('api.views.application_records', slow_records), self.assertLogs('api.profiling', 'WARNING'):
+            self.assertEqual(client_for(self.user).get('/api/jobs/my-applications/').status_code, 200)
+        self.assertIn('test_profiling.slow_records', self.samples())
+
+    async def test_asgi_request_to_a_sync_view(self):
+        with mock.patch('api.views.application_records', slow_records), self.assertLogs('api.profiling', 'WARNING'):
+            response = await AsyncClient().get('/api/jobs/my-applications/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('test_profiling.slow_records', self.samples())
+
+    async def test_asgi_request_to_an_async_view(self):
+        with mock.patch('api.async_views.aunread_count', slow_unread_count), self.assertLogs('api.profiling', 'WARNING'):
+            response = await AsyncClient().get('/api/messages/unread-count/', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        samples = self.samples()
+        self.assertIn('api.async_views.unread_message_count;', samples)
+        self.assertIn('test_profiling.slow_unread_count', samples)
@@ -0,0 +1,76 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+
+from api import views
+from api.instrumentation import assert_query_budget, collect_queries
+from api.queryplans import create_fixtures, grow_fixtures, prime_indexes
+from api.scenarios import SCENARIOS, client_for, send
+from api.urls import urlpatterns
+
+
+# Most queries each api/views.py endpoint may issue per request, authentication
+# included, with nothing cached. GET endpoints must also stay flat as rows are added.
+BUDGETS = {
+    'signup': 4,
+    'login': 2,
+    'profile': 1,
+    'update_profile': 10,
+    'company_profiles': 1,
+    'my_company_profile': 2,
+    'create_company_profile': 2,
+    'update_company_profile': 7,
+    'browse_jobs': 3,
+    'job_search': 3,
+    'job_facets': 0,
+    'recommended_jobs': 2,
+    'post_job': 8,
+    'bulk_import_jobs': 7,
+    'apply_to_job': 10,
+    'job_candidates': 7,
+    'company_applicants': 2,
+    'export_company_applicants': 2,
+    'update_application_status': 8,
+    'my_applications': 2,
+    'mark_messages_read': 6,
+}
+
+
+def _view_module(pattern):
+    callback = pattern.callback
+    return getattr(callback, 'view_class', getattr(callback, 'cls', callback)).__module__
+
+
+class QueryBudgetTests(TestCase):
+
+    def setUp(self):
+        self.fixtures = create_fixtures()
+        prime_indexes()
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_every_view_has_a_budget(self):
+        names = {p.name for p in urlpatterns if _view_module(p) == views.__name__}
+        self.assertEqual(names, set(BUDGETS))
+
+    def _count(self, client, method, path, data):
+        # Drops cached responses; the indexes are rebuilt under the fresh version stamps
+        prime_indexes()
+        with collect_queries() as stats:
+            response, _ = send(client, method, path, data, self.fixtures['ids'])
+        self.assertLess(response.status_code, 300, f'{method.upper()} {path}')
+        return stats.count
+
+    def test_views_stay_within_budget(self):
+        for name, budget in BUDGETS.items():
+            for method, path, role, data in SCENARIOS[name]:
+                with self.subTest(view=name, path=path), transaction.atomic():
+                    client = client_for(self.fixtures['users'][role])
+                    self.assertLessEqual(self._count(client, method, path, data), budget)
+                    if method == 'get':
+                        assert_query_budget(
+                            lambda: self._count(client, method, path, data),
+                            lambda: grow_fixtures(self.fixtures),
+                        )
+                    transaction.set_rollback(True)
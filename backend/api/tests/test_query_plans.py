@@ -0,0 +1,11 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+
+class QueryPlanAuditTests(TestCase):
+
+    def test_every_endpoint_passes_the_audit(self):
+        # Raises CommandError on a flagged plan, an N+1, an unexpected status or an uncovered URL
+        call_command('audit_query_plans', '--check', stdout=StringIO())
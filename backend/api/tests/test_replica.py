@@ -0,0 +1,64 @@
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from django.test import SimpleTestCase
+
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+
+SETUP = """
+from api.models import CompanyProfile, Job, User
+user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+company = CompanyProfile.objects.create(
+    user=user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+)
+Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+"""
+
+# Written after the copy, so only the primary has the second job
+LAG = """
+from api.models import CompanyProfile, Job
+Job.objects.create(company=CompanyProfile.objects.get(), title='Ops', description='o', location='Remote')
+"""
+
+CHECK = """
+from django.core.management import call_command
+from django.db import router
+from api.models import Job
+assert router.db_for_read(Job) == 'replica', router.db_for_read(Job)
+assert Job.objects.count() == 1, 'reads are not served by the replica'
+call_command('rebuild_job_cards')
+card = Job.objects.using('default').order_by('id').values_list('card', flat=True)[0]
+assert card['company_info']['company_name'] == 'Renamed', card
+"""
+
+
+class ReplicaProfileTests(SimpleTestCase):
+    """The production profile against two SQLite files, in subprocesses so the settings load with them"""
+
+    def _manage(self, env, *args):
+        result = subprocess.run(
+            [sys.executable, 'manage.py', *args], cwd=BACKEND_DIR, env=env,
+            capture_output=True, text=True, timeout=120,
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+    def test_reads_use_the_replica_and_card_rebuilds_write_the_primary(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            primary, replica = os.path.join(tmp, 'primary.sqlite3'), os.path.join(tmp, 'replica.sqlite3')
+            env = {**os.environ, 'DB_PROFILE': 'production', 'DB_PATH': primary, 'DB_REPLICA_PATH': ''}
+            env.pop('DJANGO_SETTINGS_MODULE', None)
+            self._manage(env, 'migrate', '-v0')
+            self._manage(env, 'shell', '-c', SETUP)
+            with sqlite3.connect(primary) as source, sqlite3.connect(replica) as target:
+                source.backup(target)
+            self._manage(env, 'shell', '-c', LAG)
+            # Written behind the app's back (on both, as replication would), so only a rebuild puts it in the cards
+            for path in (primary, replica):
+                with sqlite3.connect(path) as db:
+                    db.execute("UPDATE api_companyprofile SET company_name = 'Renamed'")
+            self._manage({**env, 'DB_REPLICA_PATH': replica}, 'shell', '-c', CHECK)
@@ -0,0 +1,70 @@
+import math
+
+from django.test import TestCase
+from rest_framework.renderers import JSONRenderer
+
+from api.cards import refresh_company_cards
+from api.models import CompanyProfile, Job, JobApplication, Message, User
+from api.renderers import ORJSONRenderer
+from api.serializerbench import golden_mismatches
+
+
+DERIVATIVES = {
+    'small': {'webp': 'derivatives/pic-128.webp', 'jpeg': 'derivatives/pic-128.jpg'},
+    'large': {'webp': 'derivatives/pic-512.webp', 'jpeg': 'derivatives/pic-512.jpg'},
+}
+
+
+class GoldenOutputTests(TestCase):
+    """The projections, cards and orjson renderer write the bytes of the DRF serializers"""
+
+    def setUp(self):
+        seeker = User.objects.create_user(
+            username='zoe@example.com', email='zoe@example.com', name='Zoë Ångström 😀',
+            location='Zürich', experience='Line\u2028separated\u2029text',
+            resume='resumes/zoë cv.pdf', profile_picture='profile_pictures/zoë.png',
+        )
+        # As older multipart uploads stored them, bypassing the cleaning on save
+        User.objects.filter(pk=seeker.pk).update(
+            skills=['["python", "django"]'], profile_picture_derivatives=DERIVATIVES,
+        )
+        # No skills, files or derivatives at all
+        bare = User.objects.create_user(username='bare@example.com', email='bare@example.com')
+        User.objects.filter(pk=bare.pk).update(skills=None)
+
+        company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=company_user, company_name='Société Générale ☕', email='hr@example.com', industry='IT',
+            location='Paris', description='Ünïcödé\u2028description', logo='company_logos/logo.png',
+        )
+        CompanyProfile.objects.filter(pk=company.pk).update(logo_derivatives=DERIVATIVES)
+        plain = CompanyProfile.objects.create(
+            user=User.objects.create_user(username='plain@example.com', email='plain@example.com'),
+            company_name='Plain', email='plain@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(
+            company=company, title='Développeur\u2029Python', description='日本語の説明\u2028', location='東京',
+            salary_min=50000, salary_max=70000, benefits=['Santé', None], is_remote=True,
+        )
+        Job.objects.filter(pk=job.pk).update(requirements='["python", "django"]')
+        Job.objects.create(company=plain, title='Bare', description='d', location='Remote', requirements=None)
+        for company_profile in (company, plain):
+            refresh_company_cards(CompanyProfile.objects.get(pk=company_profile.pk))
+
+        for applicant in (seeker, bare):
+            application = JobApplication.objects.create(job=job, applicant=applicant, cover_letter='Merci 🙏\u2028!')
+            Message.objects.create(application=application, sender=applicant, text='Bonjour\u2028ça va? "quoted" \\ /')
+            Message.objects.create(application=application, sender=company_user, text='')
+
+    def test_fast_path_matches_the_serializers(self):
+        self.assertEqual(golden_mismatches(rows=100), [])
+
+
+class NonFiniteFloatTests(TestCase):
+
+    def test_non_finite_floats_render_as_null(self):
+        # Documented difference: DRF's strict renderer raises instead
+        data = {'nan': math.nan, 'inf': math.inf, 'ninf': -math.inf}
+        self.assertEqual(ORJSONRenderer().render(data), b'{"nan":null,"inf":null,"ninf":null}')
+        with self.assertRaises(ValueError):
+            JSONRenderer().render(data)
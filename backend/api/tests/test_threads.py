@@ -0,0 +1,85 @@
+from django.test import TestCase
+
+from api.models import CompanyProfile, Job, JobApplication, Message, MessageThread, User
+from api.scenarios import client_for
+from api.threads import unread_count
+
+
+class MessageThreadPagingTests(TestCase):
+
+    def setUp(self):
+        self.company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        self.applications = []
+        for n in range(5):
+            seeker = User.objects.create_user(username=f'seeker{n}@example.com', email=f'seeker{n}@example.com')
+            application = JobApplication.objects.create(job=job, applicant=seeker)
+            Message.objects.create(application=application, sender=seeker, text=f'Hello {n}')
+            self.applications.append(application)
+        self.client = client_for(self.company_user)
+
+    def page(self, cursor=None):
+        params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+        data = self.client.get('/api/messages/threads/', params).json()
+        return [thread['application_id'] for thread in data['results']], data['next_cursor']
+
+    def test_activity_while_paging_moves_a_thread_to_the_first_page_without_repeats(self):
+        first, cursor = self.page()
+        self.assertEqual(first, [self.applications[4].id, self.applications[3].id])
+        # The oldest thread gets a message before the client asks for page 2
+        Message.objects.create(application=self.applications[0], sender=self.company_user, text='Reply')
+        seen = list(first)
+        while cursor:
+            ids, cursor = self.page(cursor)
+            seen.extend(ids)
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertNotIn(self.applications[0].id, seen)
+        self.assertEqual(self.page()[0][0], self.applications[0].id)
+
+
+class UnreadCountDeletionTests(TestCase):
+
+    def setUp(self):
+        self.company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=self.company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        self.job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        self.seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com')
+        self.application = JobApplication.objects.create(job=self.job, applicant=self.seeker)
+        self.messages = [
+            Message.objects.create(application=self.application, sender=self.seeker, text=f'Hello {n}')
+            for n in range(3)
+        ]
+        Message.objects.create(application=self.application, sender=self.company_user, text='Reply')
+        other_seeker = User.objects.create_user(username='other@example.com', email='other@example.com')
+        other = JobApplication.objects.create(job=Job.objects.create(
+            company=company, title='Ops', description='d', location='Remote',
+        ), applicant=other_seeker)
+        Message.objects.create(application=other, sender=other_seeker, text='Hi')
+
+    def thread_unread(self, user):
+        return MessageThread.objects.get(application=self.application, participant=user).unread_count
+
+    def test_deleting_unread_messages_decrements_the_recipient(self):
+        self.messages[0].delete()
+        self.assertEqual((unread_count(self.company_user), self.thread_unread(self.company_user)), (3, 2))
+        Message.objects.filter(pk=self.messages[1].pk).delete()
+        self.assertEqual((unread_count(self.company_user), self.thread_unread(self.company_user)), (2, 1))
+        self.assertEqual((unread_count(self.seeker), self.thread_unread(self.seeker)), (1, 1))
+
+    def test_deleting_a_read_message_leaves_the_counts(self):
+        Message.objects.filter(pk=self.messages[0].pk).update(is_read=True)
+        Message.objects.get(pk=self.messages[0].pk).delete()
+        self.assertEqual(unread_count(self.company_user), 4)
+
+    def test_deleting_the_application_recounts_both_participants(self):
+        self.application.delete()
+        self.assertEqual((unread_count(self.company_user), unread_count(self.seeker)), (1, 0))
+
+    def test_deleting_the_job_recounts_its_applicants(self):
+        self.job.delete()
+        self.assertEqual((unread_count(self.company_user), unread_count(self.seeker)), (1, 0))
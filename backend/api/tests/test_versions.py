@@ -0,0 +1,143 @@
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from api import versions
+from api.models import CompanyProfile, Job, JobApplication, User
+from api.scenarios import client_for
+
+
+class MyApplicationsValidatorTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com', name='Old')
+        company_user = User.objects.create_user(username='hr@example.com', email='hr@example.com')
+        company = CompanyProfile.objects.create(
+            user=company_user, company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+        )
+        job = Job.objects.create(company=company, title='Dev', description='d', location='Remote')
+        JobApplication.objects.create(job=job, applicant=self.seeker)
+        self.client = client_for(self.seeker)
+
+    def test_etag_changes_with_the_callers_profile(self):
+        response = self.client.get('/api/jobs/my-applications/')
+        etag = response['ETag']
+        self.assertEqual(self.client.get('/api/jobs/my-applications/', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.seeker.name = 'New'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.seeker.save()
+        response = self.client.get('/api/jobs/my-applications/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]['applicant']['name'], 'New')
+
+    def test_validated_by_etag_only(self):
+        # One-second Last-Modified dates would hide changes made within the same second
+        response = self.client.get('/api/jobs/my-applications/')
+        self.assertNotIn('Last-Modified', response)
+        last_modified = 'Fri, 01 Jan 2100 00:00:00 GMT'
+        self.assertEqual(
+            self.client.get('/api/jobs/my-applications/', HTTP_IF_MODIFIED_SINCE=last_modified).status_code, 200,
+        )
+
+
+
+class UserStampTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.seeker = User.objects.create_user(username='seeker@example.com', email='seeker@example.com', name='Old')
+        self.companies = []
+        for n in range(2):
+            company_user = User.objects.create_user(username=f'hr{n}@example.com', email=f'hr{n}@example.com')
+            self.companies.append(CompanyProfile.objects.create(
+                user=company_user, company_name=f'Acme {n}', email=f'hr{n}@example.com', industry='IT',
+                location='Remote',
+            ))
+        job = Job.objects.create(company=self.companies[0], title='Dev', description='d', location='Remote')
+        self.application = JobApplication.objects.create(job=job, applicant=self.seeker)
+        self.clients = [client_for(company.user) for company in self.companies]
+
+    def etag(self, client, path):
+        return client.get(path)['ETag']
+
+    def unchanged(self, client, path, etag):
+        return client.get(path, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def save(self, user, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            user.save(**kwargs)
+
+    def test_profile_change_reaches_only_the_companies_applied_to(self):
+        path = '/api/companies/applicants/'
+        etags = [self.etag(client, path) for client in self.clients]
+        self.seeker.name = 'New'
+        self.save(self.seeker)
+        self.assertFalse(self.unchanged(self.clients[0], path, etags[0]))
+        self.assertTrue(self.unchanged(self.clients[1], path, etags[1]))
+
+    def test_message_list_follows_both_participants(self):
+        path = f'/api/applications/{self.application.pk}/messages/'
+        etag = self.etag(self.clients[0], path)
+        self.save(self.companies[1].user)
+        self.assertTrue(self.unchanged(self.clients[0], path, etag))
+        self.seeker.name = 'New'
+        self.save(self.seeker)
+        self.assertFalse(self.unchanged(self.clients[0], path, etag))
+
+    def test_logins_bump_nothing(self):
+        path = '/api/companies/applicants/'
+        etag = self.etag(self.clients[0], path)
+        self.save(self.seeker, update_fields=['last_login'])
+        self.assertTrue(self.unchanged(self.clients[0], path, etag))
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@versions.cached_response(lambda request: ['test'])
+def cached_view(request):
+    return Response({'built': True})
+
+
+class CachedResponseTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    @override_settings(ALLOWED_HOSTS=['a.example.com', 'b.example.com'])
+    def test_entries_are_per_host(self):
+        CompanyProfile.objects.create(
+            user=User.objects.create_user(username='hr@example.com', email='hr@example.com'),
+            company_name='Acme', email='hr@example.com', industry='IT', location='Remote',
+            logo='company_logos/acme.png',
+        )
+        for host in ('a.example.com', 'b.example.com'):
+            response = client_for(None).get('/api/companies/profile/', HTTP_HOST=host)
+            self.assertEqual(response.json()[0]['logo'], f'http://{host}/api/media/company_logos/acme.png')
+
+    def test_only_the_rebuilding_request_releases_the_lock(self):
+        real_add = cache.add
+        locks = []
+        busy = True
+
+        def add(key, *args, **kwargs):
+            added = real_add(key, *args, **kwargs)
+            if key.startswith('response-lock:'):
+                locks.append(key)
+                # While busy, another worker holds the lock
+                return added and not busy
+            return added
+
+        with mock.patch.object(versions, 'REBUILD_WAIT_SECONDS', 0), mock.patch.object(versions.cache, 'add', add):
+            self.assertEqual(cached_view(APIRequestFactory().get('/cached/')).data, {'built': True})
+            self.assertIsNotNone(cache.get(locks[-1]))
+
+            cache.clear()
+            busy = False
+            cached_view(APIRequestFactory().get('/cached/'))
+            self.assertIsNone(cache.get(locks[-1]))
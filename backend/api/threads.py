@@ -0,0 +1,250 @@
+"""
+Message-thread summaries and unread counters.
+
+Every application has one MessageThread row per participant (the applicant and the
+company's user) holding the last message and that participant's unread count, and
+every user has an UnreadCounter with their total. Both are written in the same
+transaction as the message change, so message_threads is a single indexed query
+and unread_message_count a primary-key read. Deleting an unread message takes it
+back out of the counts. Deleting an application recounts both participants, since
+its threads may be gone before its messages are.
+"""
+import asyncio
+import math
+import threading
+import time
+
+from django.db import transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Greatest
+
+from .models import Message, MessageThread, UnreadCounter
+from .events import publish
+from .serializers import MessageSerializer
+from .versions import bump
+
+
+def application_participants(application):
+    """``(participant, other_user)`` pairs of an application's conversation"""
+    applicant = application.applicant
+    company_user = application.job.company.user
+    if applicant.pk == company_user.pk:
+        return [(applicant, applicant)]
+    return [(applicant, company_user), (company_user, applicant)]
+
+
+def open_threads(application):
+    MessageThread.objects.bulk_create(
+        [
+            MessageThread(
+                application=application,
+                participant=participant,
+                other_user=other,
+                activity_at=application.applied_at,
+            )
+            for participant, other in application_participants(application)
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def record_message(message):
+    """Update both participants' summaries for a newly created message"""
+    threads = MessageThread.objects.filter(application_id=message.application_id)
+    with transaction.atomic():
+        threads.update(
+            last_message=message.text,
+            last_message_time=message.timestamp,
+            activity_at=message.timestamp,
+        )
+        recipients = threads.exclude(participant_id=message.sender_id)
+        recipient_ids = list(recipients.values_list('participant_id', flat=True))
+        recipients.update(unread_count=F('unread_count') + 1)
+        UnreadCounter.objects.bulk_create(
+            [UnreadCounter(user_id=user_id) for user_id in recipient_ids], ignore_conflicts=True,
+        )
+        UnreadCounter.objects.filter(user_id__in=recipient_ids).update(count=F('count') + 1)
+        publish(
+            list(threads.values_list('participant_id', flat=True)),
+            'message', MessageSerializer(message).data,
+        )
+        publish_unread_counts(recipient_ids)
+        transaction.on_commit(lambda: message_waiters.notify(message.application_id))
+
+
+def mark_read(application, user):
+    """Mark messages ``user`` received in ``application`` as read; returns how many"""
+    with transaction.atomic():
+        count = Message.objects.filter(application=application, is_read=False).exclude(sender=user).update(is_read=True)
+        MessageThread.objects.filter(application=application, participant=user).update(unread_count=0)
+        if count:
+            bump(f'messages:{application.pk}')
+            UnreadCounter.objects.filter(user=user).update(count=Greatest(F('count') - count, Value(0)))
+            publish_unread_counts([user.pk])
+    return count
+
+
+def forget_message(message):
+    """Take a deleted unread message out of its recipient's thread and total"""
+    if message.is_read:
+        return
+    recipients = MessageThread.objects.filter(application_id=message.application_id).exclude(
+        participant_id=message.sender_id,
+    )
+    with transaction.atomic():
+        recipient_ids = list(recipients.values_list('participant_id', flat=True))
+        recipients.update(unread_count=Greatest(F('unread_count') - 1, Value(0)))
+        UnreadCounter.objects.filter(user_id__in=recipient_ids).update(count=Greatest(F('count') - 1, Value(0)))
+        publish_unread_counts(recipient_ids)
+
+
+def recount_unread(user_ids):
+    """Reset the users' totals from the Message table"""
+    user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+    with transaction.atomic():
+        for user_id in user_ids:
+            count = (
+                Message.objects.filter(is_read=False)
+                .filter(Q(application__applicant_id=user_id) | Q(application__job__company__user_id=user_id))
+                .exclude(sender_id=user_id)
+                .count()
+            )
+            UnreadCounter.objects.filter(user_id=user_id).update(count=count)
+        publish_unread_counts(user_ids)
+
+
+def publish_unread_counts(user_ids):
+    counts = dict(UnreadCounter.objects.filter(user_id__in=user_ids).values_list('user_id', 'count'))
+    for user_id in user_ids:
+        publish([user_id], 'unread', {'unread_count': counts.get(user_id, 0)})
+
+
+def unread_count(user):
+    return UnreadCounter.objects.filter(pk=user.pk).values_list('count', flat=True).first() or 0
+
+
+async def aunread_count(user):
+    return await UnreadCounter.objects.filter(pk=user.pk).values_list('count', flat=True).afirst() or 0
+
+
+def thread_summary(thread):
+    """message_threads item; needs ``application__job`` and ``other_user`` selected"""
+    return {
+        'application_id': thread.application_id,
+        'job_title': thread.application.job.title,
+        'other_user': {
+            'id': thread.other_user.id,
+            'name': thread.other_user.name,
+            'email': thread.other_user.email,
+        },
+        'last_message': thread.last_message,
+        'last_message_time': thread.last_message_time,
+        'unread_count': thread.unread_count,
+    }
+
+
+def actual_unread_counts():
+    """Recount unread messages per recipient from the Message table: ``{user_id: count}``"""
+    unread = Message.objects.filter(is_read=False)
+    counts = {}
+    for recipient in ('application__applicant', 'application__job__company__user'):
+        rows = (
+            unread.exclude(sender=F(recipient))
+            .values_list(recipient)
+            .annotate(n=Count('id'))
+            .order_by()
+        )
+        for user_id, n in rows:
+            counts[user_id] = counts.get(user_id, 0) + n
+    return counts
+
+
+class _MessageWaiters:
+    """Lets long-polling requests sleep until a message is posted to their application.
+
+    Only applications someone is waiting on are tracked. Wake-ups are process-local,
+    so waiters also re-check the database every LONG_POLL_RECHECK_SECONDS.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._waiting = {}  # application_id -> [generation, number of waiters]
+        self._async_waiting = {}  # application_id -> {(event loop, asyncio.Event)}
+
+    def wait(self, application_id, timeout):
+        with self._condition:
+            state = self._waiting.setdefault(application_id, [0, 0])
+            state[1] += 1
+            generation = state[0]
+            try:
+                self._condition.wait_for(lambda: state[0] != generation, timeout)
+            finally:
+                state[1] -= 1
+                if not state[1]:
+                    del self._waiting[application_id]
+
+    async def await_message(self, application_id, timeout):
+        """``wait`` for async views: suspends the coroutine instead of holding a thread"""
+        waiter = (asyncio.get_running_loop(), asyncio.Event())
+        with self._condition:
+            self._async_waiting.setdefault(application_id, set()).add(waiter)
+        try:
+            await asyncio.wait_for(waiter[1].wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._condition:
+                waiters = self._async_waiting.get(application_id)
+                if waiters is not None:
+                    waiters.discard(waiter)
+                    if not waiters:
+                        del self._async_waiting[application_id]
+
+    def notify(self, application_id):
+        with self._condition:
+            state = self._waiting.get(application_id)
+            if state is not None:
+                state[0] += 1
+                self._condition.notify_all()
+            for loop, event in self._async_waiting.get(application_id, ()):
+                try:
+                    loop.call_soon_threadsafe(event.set)
+                except RuntimeError:  # the waiter's event loop has shut down
+                    pass
+
+
+message_waiters = _MessageWaiters()
+
+LONG_POLL_RECHECK_SECONDS = 2.0
+MAX_LONG_POLL_SECONDS = 30
+
+
+def long_poll_seconds(value):
+    """``?wait=`` as seconds within [0, MAX_LONG_POLL_SECONDS]; ValueError unless a finite number"""
+    wait = float(value)
+    # nan survives min/max clamping, and neither nan nor inf ever times out a wait
+    if not math.isfinite(wait):
+        raise ValueError(f'wait must be finite, not {value!r}')
+    return min(max(wait, 0), MAX_LONG_POLL_SECONDS)
+
+
+def wait_for_messages(queryset, application_id, timeout):
+    """Evaluate ``queryset``, holding for up to ``timeout`` seconds until it returns rows"""
+    deadline = time.monotonic() + timeout
+    while True:
+        rows = list(queryset.all())
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            return rows
+        message_waiters.wait(application_id, min(remaining, LONG_POLL_RECHECK_SECONDS))
+
+
+async def await_messages(queryset, application_id, timeout):
+    """wait_for_messages for async views"""
+    deadline = time.monotonic() + timeout
+    while True:
+        rows = [row async for row in queryset.all()]
+        remaining = deadline - time.monotonic()
+        if rows or remaining <= 0:
+            return rows
+        await message_waiters.await_message(application_id, min(remaining, LONG_POLL_RECHECK_SECONDS))
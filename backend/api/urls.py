@@ -1,6 +1,9 @@
 from django.urls import path
 from . import views
-from .views import JobApplicationStatusUpdateView, my_applications, application_messages
+from . import async_views
+from .views import JobApplicationStatusUpdateView, my_applications
+from .events import event_stream
+from .media import serve_media
 
 urlpatterns = [
     # Auth endpoints
@@ -17,13 +20,25 @@ urlpatterns = [
 
     # Job endpoints
     path('jobs/', views.browse_jobs, name='browse_jobs'),  # GET: browse jobs
+    path('jobs/search/', views.job_search, name='job_search'),  # GET: ranked full-text search
+    path('jobs/facets/', views.job_facets_view, name='job_facets'),  # GET: facet counts for filter chips
+    path('jobs/recommended/', views.recommended_jobs, name='recommended_jobs'),  # GET: jobs ranked by skill match
     path('jobs/post/', views.post_job, name='post_job'),   # POST: post a job
+    path('jobs/bulk/', views.bulk_import_jobs, name='bulk_import_jobs'),  # POST: import jobs from CSV/NDJSON
     path('jobs/<int:job_id>/apply/', views.apply_to_job, name='apply_to_job'),  # POST: apply to a job
+    path('jobs/<int:job_id>/candidates/', views.job_candidates, name='job_candidates'),  # GET: candidates ranked by skill match
     path('companies/applicants/', views.company_applicants, name='company_applicants'),  # GET: view applicants
+    path('companies/applicants/export/', views.export_company_applicants, name='export_company_applicants'),  # GET: stream applicants as CSV/NDJSON
     path('companies/applicants/<int:pk>/', JobApplicationStatusUpdateView.as_view(), name='update_application_status'),
     path('jobs/my-applications/', my_applications, name='my_applications'),
-    path('applications/<int:application_id>/messages/', application_messages, name='application_messages'),
-    path('messages/threads/', views.message_threads, name='message_threads'),
-    path('messages/unread-count/', views.unread_message_count, name='unread_message_count'),
+    path('applications/<int:application_id>/messages/', async_views.application_messages, name='application_messages'),
+    path('messages/threads/', async_views.message_threads, name='message_threads'),
+    path('messages/unread-count/', async_views.unread_message_count, name='unread_message_count'),
     path('applications/<int:application_id>/mark-read/', views.mark_messages_read, name='mark_messages_read'),
+
+    # Uploaded files (MEDIA_URL); resumes only for their owner and companies they applied to
+    path('media/<path:name>', serve_media, name='serve_media'),
+
+    # Push events (Server-Sent Events, ASGI only)
+    path('events/stream/', event_stream, name='event_stream'),
 ] 
\ No newline at end of file
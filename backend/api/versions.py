@@ -0,0 +1,194 @@
+"""
+Collection version stamps and conditional GET.
+
+Each cached collection (all jobs, one applicant's applications, one thread's
+messages, ...) has a version stamp in Django's cache: the time of its last change,
+bumped by signal handlers after the writing transaction commits. A response's
+ETag is derived from the stamps it depends on, so an unchanged poll is answered
+``304 Not Modified`` from a cache read, before any query or serializer runs. No
+Last-Modified is sent: with its one-second resolution, a client revalidating with
+If-Modified-Since would be told that a change in the same second was not one.
+
+The same stamps key a response cache for public listings: a cached body is
+only ever read under the versions it was built from, so a bump invalidates it
+without deleting anything.
+
+Process-local copies of a collection (the matching matrices, the facet index) are
+rebuilt when its stamp differs from the one they were built under. The writing
+process patches its own copy instead: ``advance`` increments the stamp atomically,
+so it can tell whether its change was the only one since.
+
+Deployments with more than one process need a shared cache backend (see CACHES),
+otherwise a stamp bumped in one process is invisible to the others.
+"""
+import hashlib
+import time
+from functools import wraps
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from rest_framework.response import Response
+
+
+# Response cache: how long entries live, how long one rebuild may hold the lock,
+# and how long other requests wait for it when there is no stale copy to serve.
+RESPONSE_CACHE_TIMEOUT = 300
+REBUILD_LOCK_TIMEOUT = 10
+REBUILD_WAIT_SECONDS = 2.0
+REBUILD_POLL_SECONDS = 0.05
+
+
+def _key(name):
+    return f'version:{name}'
+
+
+def get_versions(names):
+    """Current stamp of every collection in ``names``, initialising unknown ones to now"""
+    keys = [_key(name) for name in names]
+    found = cache.get_many(keys)
+    missing = [key for key in keys if key not in found]
+    if missing:
+        now = time.time_ns()
+        for key in missing:
+            # add() keeps a stamp another request initialised in the meantime
+            cache.add(key, now, timeout=None)
+        found.update(cache.get_many(missing))
+    return [found.get(key, 0) for key in keys]
+
+
+def bump(*names):
+    """Mark collections as changed once the current transaction commits"""
+    def apply():
+        stamp = time.time_ns()
+        cache.set_many({_key(name): stamp for name in names}, timeout=None)
+    transaction.on_commit(apply)
+
+
+def advance(name):
+    """Count one committed change to ``name`` now; returns the new stamp, or None if it was lost.
+
+    Unlike ``bump``, which sets the time, this increments the stamp atomically. Call
+    it once the change has committed (from an ``on_commit`` callback).
+    """
+    get_versions([name])
+    try:
+        return cache.incr(_key(name))
+    except ValueError:
+        # Evicted since it was read
+        return None
+
+
+def clear_keeping(names):
+    """Clear the cache except the stamps of ``names``, so copies built under them stay current"""
+    kept = cache.get_many([_key(name) for name in names])
+    cache.clear()
+    cache.set_many(kept, timeout=None)
+
+
+def _etag(request, names, per_user):
+    versions = get_versions(names)
+    identity = [request.get_full_path(), request.user.pk if per_user else None, *names, *versions]
+    return quote_etag(hashlib.sha1(repr(identity).encode()).hexdigest())
+
+
+def _add_validators(response, etag, per_user):
+    response['ETag'] = etag
+    if per_user:
+        patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional(collections, per_user=True):
+    """Decorator adding an ETag and 304 handling to a GET view.
+
+    ``collections(request, *args, **kwargs)`` returns the names of the collections
+    the response depends on, or None to skip (e.g. when the caller is not allowed
+    to see them, so the view can produce its own error). Place it below
+    ``@api_view`` so authentication has already run.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            names = collections(request, *args, **kwargs) if request.method in ('GET', 'HEAD') else None
+            if not names:
+                return view(request, *args, **kwargs)
+            etag = _etag(request, names, per_user)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _add_validators(response, etag, per_user)
+        return wrapped
+    return decorator
+
+
+def aconditional(collections, per_user=True):
+    """``conditional`` for async views; ``collections`` is a coroutine function too"""
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            names = await collections(request, *args, **kwargs) if request.method in ('GET', 'HEAD') else None
+            if not names:
+                return await view(request, *args, **kwargs)
+            # Stamps are cache reads, which the local-memory backend answers without blocking
+            etag = _etag(request, names, per_user)
+            response = get_conditional_response(request, etag=etag)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+                if response.status_code != 200:
+                    return response
+            return _add_validators(response, etag, per_user)
+        return wrapped
+    return decorator
+
+
+def cached_response(collections, timeout=RESPONSE_CACHE_TIMEOUT):
+    """Decorator caching a public GET view's response data under versioned keys.
+
+    Only one request rebuilds a missing entry (guarded by a ``cache.add`` lock);
+    concurrent requests serve the previous version's data if there is one, or wait
+    briefly for the rebuild. Use only for responses that don't depend on the user.
+    Entries are keyed by the absolute URL: serializers write file URLs with the
+    request's scheme and host.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET':
+                return view(request, *args, **kwargs)
+            names = collections(request, *args, **kwargs)
+            path = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+            versions = get_versions(names)
+            key = f'response:{path}:' + hashlib.sha1(repr(versions).encode()).hexdigest()
+            latest_key = f'response-latest:{path}'
+            lock_key = f'response-lock:{key}'
+
+            data = cache.get(key)
+            if data is not None:
+                return Response(data)
+            locked = cache.add(lock_key, 1, timeout=REBUILD_LOCK_TIMEOUT)
+            if not locked:
+                stale = cache.get(latest_key)
+                if stale is not None:
+                    return Response(stale)
+                deadline = time.monotonic() + REBUILD_WAIT_SECONDS
+                while time.monotonic() < deadline:
+                    time.sleep(REBUILD_POLL_SECONDS)
+                    data = cache.get(key)
+                    if data is not None:
+                        return Response(data)
+                # The rebuilding request is slow or died; build it ourselves
+            try:
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200:
+                    cache.set_many({key: response.data, latest_key: response.data}, timeout=timeout)
+                return response
+            finally:
+                # A request that gave up waiting must not release the rebuilding request's lock
+                if locked:
+                    cache.delete(lock_key)
+        return wrapped
+    return decorator
@@ -2,19 +2,32 @@ from rest_framework import status, generics
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.shortcuts import get_object_or_404
-from .models import User, CompanyProfile, Job, JobApplication
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from .models import User, CompanyProfile, Job, JobApplication, MessageThread
 from .serializers import (
     UserCreateSerializer, UserLoginSerializer, UserProfileSerializer, UserUpdateSerializer,
     CompanyProfileCreateSerializer, CompanyProfileSerializer, CompanyUpdateSerializer, JobSerializer,
-    JobApplicationSerializer, MessageSerializer
+    JobApplicationSerializer, MessageSerializer, ApplicantInfoSerializer
 )
 from rest_framework.generics import UpdateAPIView
+from django.db import IntegrityError, transaction
 from django.db.models import Q, Max, Count
-import datetime
-from django.utils import timezone
+from .matching import METRICS, rank_candidates, recommend_jobs, skill_terms
+from .facets import job_facets, parse_facet_filters, facet_filter_q, annotate_salary_ref
+from .pagination import InvalidCursor, keyset_page
+from .search import search_jobs
+from .cards import job_cards
+from .bulk import BulkImportError, import_jobs
+from .exports import EXPORT_FORMATS, async_chunks, export_applicants
+from .threads import long_poll_seconds, mark_read, thread_summary, unread_count, wait_for_messages
+from .skills import having_skills
+from .projections import application_records, message_records, MESSAGE_COLUMNS, message_record
+from .versions import conditional, cached_response
+from .authentication import UserRefreshToken, user_company_id
+from django.utils.decorators import method_decorator
 
 
 @api_view(['POST'])
@@ -24,7 +37,7 @@ def signup(request):
     serializer = UserCreateSerializer(data=request.data)
     if serializer.is_valid():
         user = serializer.save()
-        refresh = RefreshToken.for_user(user)
+        refresh = UserRefreshToken.for_user(user)
         return Response({
             'access_token': str(refresh.access_token),
             'refresh_token': str(refresh),
@@ -49,10 +62,10 @@ def login(request):
         user = authenticate(username=email, password=password)
         
         if user:
-            refresh = RefreshToken.for_user(user)
+            refresh = UserRefreshToken.for_user(user)
             
-            # Check if user has a company profile
-            has_company_profile = hasattr(user, 'company_profile')
+            # The token already records whether the user has a company profile
+            has_company_profile = refresh['company_profile_id'] is not None
             
             return Response({
                 'access_token': str(refresh.access_token),
@@ -107,6 +120,11 @@ class CompanyProfileList(generics.ListAPIView):
     serializer_class = CompanyProfileSerializer
     permission_classes = [AllowAny]
 
+    @method_decorator(conditional(lambda request: ['companies'], per_user=False))
+    @method_decorator(cached_response(lambda request: ['companies']))
+    def get(self, request, *args, **kwargs):
+        return super().get(request, *args, **kwargs)
+
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -153,12 +171,12 @@ def update_company_profile(request):
 @permission_classes([IsAuthenticated])
 def post_job(request):
     """Endpoint for companies to post a new job"""
-    user = request.user
+    company_id = user_company_id(request.user)
     # Ensure user has a company profile
-    if not hasattr(user, 'company_profile'):
+    if company_id is None:
         return Response({'detail': 'Only companies can post jobs.'}, status=status.HTTP_403_FORBIDDEN)
     data = request.data.copy()
-    data['company'] = user.company_profile.id
+    data['company'] = company_id
     serializer = JobSerializer(data=data)
     if serializer.is_valid():
         serializer.save()
@@ -166,13 +184,226 @@ def post_job(request):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+IMPORT_CONTENT_TYPES = {
+    'text/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+IMPORT_EXTENSIONS = {'.csv': 'csv', '.ndjson': 'ndjson', '.jsonl': 'ndjson'}
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def bulk_import_jobs(request):
+    """Endpoint for companies to post many jobs from a CSV or NDJSON file.
+
+    Send the file as multipart field ``file`` or as the raw request body with a
+    text/csv or application/x-ndjson content type. Valid rows are created, invalid
+    ones reported by row number; ``?dry_run=true`` only validates.
+    """
+    user = request.user
+    if not hasattr(user, 'company_profile'):
+        return Response({'detail': 'Only companies can post jobs.'}, status=status.HTTP_403_FORBIDDEN)
+
+    content_type = request.content_type.split(';')[0].strip().lower()
+    if content_type == 'multipart/form-data':
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'detail': 'No file uploaded.'}, status=status.HTTP_400_BAD_REQUEST)
+        stream = upload
+        name = upload.name.lower()
+        fmt = next((f for ext, f in IMPORT_EXTENSIONS.items() if name.endswith(ext)), None)
+        fmt = IMPORT_CONTENT_TYPES.get(upload.content_type, fmt)
+    else:
+        # Read the body line by line instead of through request.data
+        stream = request._request
+        fmt = IMPORT_CONTENT_TYPES.get(content_type)
+    fmt = request.query_params.get('input_format', fmt)
+    dry_run = request.query_params.get('dry_run', '').lower() in ('1', 'true', 'yes')
+
+    try:
+        created, errors, error_count = import_jobs(user.company_profile, stream, fmt, dry_run=dry_run)
+    except BulkImportError as exc:
+        return Response({'detail': str(exc)}, status=status.HTTP_400_BAD_REQUEST)
+    body = {'created': created, 'error_count': error_count, 'errors': errors, 'dry_run': dry_run}
+    if created and not dry_run:
+        return Response(body, status=status.HTTP_201_CREATED)
+    return Response(body, status=status.HTTP_400_BAD_REQUEST if error_count else status.HTTP_200_OK)
+
+
 @api_view(['GET'])
 @permission_classes([AllowAny])
+@conditional(lambda request: ['jobs'], per_user=False)
+@cached_response(lambda request: ['jobs'])
 def browse_jobs(request):
-    """Endpoint for job-seekers to browse all jobs"""
-    jobs = Job.objects.all().order_by('-posted_at')
-    serializer = JobSerializer(jobs, many=True)
-    return Response(serializer.data) 
+    """Endpoint for job-seekers to browse jobs, newest first, one cursor page at a time.
+
+    Accepts the facet filters of jobs/facets/ plus a salary_min/salary_max range
+    (jobs whose salary overlaps it) and ``skill`` (repeat for jobs requiring all of
+    them, under any alias); follow ``next_cursor`` for the next page.
+    """
+    params = request.query_params
+    jobs = annotate_salary_ref(Job.objects.all()).filter(
+        facet_filter_q(parse_facet_filters(params), job_facets.get()),
+    )
+    try:
+        if params.get('salary_min'):
+            jobs = jobs.filter(salary_ref__gte=int(params['salary_min']))
+        if params.get('salary_max'):
+            jobs = jobs.filter(Q(salary_min__lte=int(params['salary_max'])) |
+                               Q(salary_min__isnull=True, salary_ref__lte=int(params['salary_max'])))
+    except ValueError:
+        return Response({'detail': 'salary_min and salary_max must be integers.'}, status=400)
+    if params.getlist('skill'):
+        jobs = having_skills(jobs, params.getlist('skill'))
+    try:
+        page, next_cursor = keyset_page(jobs.values('id', 'posted_at', 'card'), params, 'posted_at')
+    except InvalidCursor as exc:
+        return Response({'detail': str(exc)}, status=400)
+    return Response({'results': [row['card'] for row in page], 'next_cursor': next_cursor})
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def job_facets_view(request):
+    """Match count and per-facet value counts for the given filters (same params as browse_jobs)"""
+    job_ids, counts = job_facets.get().query(parse_facet_filters(request.query_params))
+    return Response({'count': len(job_ids), 'facets': counts})
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def recommended_jobs(request):
+    """Open jobs ranked by how well their requirements match the user's skills"""
+    metric = request.query_params.get('metric', 'cosine')
+    if metric not in METRICS:
+        return Response({'detail': f'metric must be one of: {", ".join(METRICS)}.'}, status=400)
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({'detail': 'page and page_size must be integers.'}, status=400)
+
+    ranked, total = recommend_jobs(request.user.skills, page_size, offset=(page - 1) * page_size, metric=metric)
+    cards = job_cards([job_id for job_id, _ in ranked])
+    results = []
+    for job_id, score in ranked:
+        card = cards.get(job_id)
+        if card is None:  # deleted since the matrix was built
+            continue
+        card['match_score'] = round(score, 4)
+        results.append(card)
+    return Response({
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'has_next': page * page_size < total,
+        'results': results,
+    })
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def job_candidates(request, job_id):
+    """Applicants (or, with ``scope=all``, all job seekers) ranked against a job's requirements.
+
+    ``skill`` (repeatable) keeps only candidates who have all of those skills.
+    """
+    job = get_object_or_404(Job, id=job_id)
+    if job.company_id != user_company_id(request.user):
+        return Response({'detail': 'Only the company that posted this job can rank candidates.'}, status=403)
+    metric = request.query_params.get('metric', 'cosine')
+    if metric not in METRICS:
+        return Response({'detail': f'metric must be one of: {", ".join(METRICS)}.'}, status=400)
+    scope = request.query_params.get('scope', 'applicants')
+    if scope not in ('applicants', 'all'):
+        return Response({'detail': 'scope must be applicants or all.'}, status=400)
+    status_filter = request.query_params.get('status')
+    if status_filter is not None:
+        if scope == 'all':
+            return Response({'detail': 'The status filter only applies to applicants.'}, status=400)
+        if status_filter not in dict(JobApplication.STATUS_CHOICES):
+            return Response({'detail': 'Invalid status.'}, status=400)
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({'detail': 'page and page_size must be integers.'}, status=400)
+
+    applicant_ids = None
+    skills = request.query_params.getlist('skill')
+    if scope == 'applicants':
+        applications = JobApplication.objects.filter(job=job)
+        if status_filter is not None:
+            applications = applications.filter(status=status_filter)
+        if skills:
+            applications = applications.filter(applicant__in=having_skills(User.objects.all(), skills))
+        applicant_ids = list(applications.values_list('applicant_id', flat=True))
+    elif skills:
+        seekers = having_skills(User.objects.filter(company_profile__isnull=True), skills)
+        applicant_ids = list(seekers.values_list('id', flat=True))
+    ranked, total = rank_candidates(
+        job.requirements, page_size, offset=(page - 1) * page_size, metric=metric, user_ids=applicant_ids,
+    )
+
+    page_ids = [user_id for user_id, _ in ranked]
+    users = User.objects.in_bulk(page_ids)
+    applications = {
+        a['applicant_id']: a
+        for a in JobApplication.objects.filter(job=job, applicant_id__in=page_ids).values('id', 'applicant_id', 'status', 'applied_at')
+    }
+    requirements = set(skill_terms(job.requirements))
+    results = []
+    for user_id, score in ranked:
+        user = users.get(user_id)
+        if user is None:  # deleted since the matrix was built
+            continue
+        application = applications.get(user_id)
+        results.append({
+            'applicant': ApplicantInfoSerializer(user).data,
+            'match_score': round(score, 4),
+            'matched_skills': [term for term in skill_terms(user.skills) if term in requirements],
+            'application': application and {
+                'id': application['id'],
+                'status': application['status'],
+                'applied_at': application['applied_at'],
+            },
+        })
+    return Response({
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'has_next': page * page_size < total,
+        'results': results,
+    })
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def job_search(request):
+    """Full-text job search, best match first, with a highlighted snippet per hit"""
+    query = request.query_params.get('q', '').strip()
+    if not query:
+        return Response({'detail': 'Search query (q) required.'}, status=400)
+    try:
+        page = max(int(request.query_params.get('page', 1)), 1)
+        page_size = min(max(int(request.query_params.get('page_size', 20)), 1), 100)
+    except ValueError:
+        return Response({'detail': 'page and page_size must be integers.'}, status=400)
+
+    hits, total = search_jobs(query, page_size, offset=(page - 1) * page_size)
+    cards = job_cards([job_id for job_id, _, _ in hits])
+    results = []
+    for job_id, score, snippet in hits:
+        card = cards.get(job_id)
+        if card is None:
+            continue
+        card['search_score'] = round(score, 4) if score is not None else None
+        card['snippet'] = snippet
+        results.append(card)
+    return Response({
+        'count': total,
+        'page': page,
+        'page_size': page_size,
+        'has_next': page * page_size < total,
+        'results': results,
+    })
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -183,24 +414,68 @@ def apply_to_job(request, job_id):
     if JobApplication.objects.filter(job=job, applicant=request.user).exists():
         return Response({'detail': 'You have already applied to this job.'}, status=400)
     cover_letter = request.data.get('cover_letter', '')
-    application = JobApplication.objects.create(
-        job=job,
-        applicant=request.user,
-        cover_letter=cover_letter
-    )
+    try:
+        # unique_job_applicant catches a concurrent duplicate that passed the check above
+        with transaction.atomic():
+            application = JobApplication.objects.create(
+                job=job,
+                applicant=request.user,
+                cover_letter=cover_letter
+            )
+    except IntegrityError:
+        return Response({'detail': 'You have already applied to this job.'}, status=400)
     serializer = JobApplicationSerializer(application)
     return Response(serializer.data, status=201)
 
+def _company_applicants_versions(request):
+    company_id = user_company_id(request.user)
+    if company_id is None:
+        return None
+    return [f'company:{company_id}', 'jobs']
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional(_company_applicants_versions)
 def company_applicants(request):
     """Endpoint for companies to view all applicants for their jobs"""
+    company_id = user_company_id(request.user)
+    if company_id is None:
+        return Response({'detail': 'Only companies can view applicants.'}, status=403)
+    applications = JobApplication.objects.filter(job__company_id=company_id).order_by('-applied_at')
+    return Response(application_records(applications))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_company_applicants(request):
+    """Stream all applicants for the company's jobs as CSV or NDJSON.
+
+    Query params: ``output_format`` (csv, the default, or ndjson), ``job`` and ``status``.
+    """
     if not hasattr(request.user, 'company_profile'):
         return Response({'detail': 'Only companies can view applicants.'}, status=403)
     company = request.user.company_profile
-    applications = JobApplication.objects.filter(job__company=company).select_related('job', 'applicant').order_by('-applied_at')
-    serializer = JobApplicationSerializer(applications, many=True)
-    return Response(serializer.data) 
+    fmt = request.query_params.get('output_format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return Response({'detail': f"output_format must be one of: {', '.join(EXPORT_FORMATS)}."}, status=400)
+    job_id = request.query_params.get('job')
+    if job_id is not None:
+        if not job_id.isdigit() or not Job.objects.filter(id=job_id, company=company).exists():
+            return Response({'detail': 'Job not found.'}, status=404)
+        job_id = int(job_id)
+    status_filter = request.query_params.get('status')
+    if status_filter is not None and status_filter not in dict(JobApplication.STATUS_CHOICES):
+        return Response({'detail': 'Invalid status.'}, status=400)
+
+    chunks = export_applicants(company, fmt, job_id=job_id, status=status_filter)
+    if isinstance(request._request, ASGIRequest):
+        # A sync iterator would be buffered whole before the first byte is sent
+        chunks = async_chunks(chunks)
+    response = StreamingHttpResponse(chunks, content_type=EXPORT_FORMATS[fmt])
+    response['Content-Disposition'] = f'attachment; filename="applicants.{fmt}"'
+    response['Cache-Control'] = 'no-store'
+    return response
+
 
 class JobApplicationStatusUpdateView(UpdateAPIView):
     queryset = JobApplication.objects.all()
@@ -209,99 +484,102 @@ class JobApplicationStatusUpdateView(UpdateAPIView):
 
     def get_queryset(self):
         # Only allow company to update applications for their jobs
-        user = self.request.user
-        if hasattr(user, 'company_profile'):
-            return JobApplication.objects.filter(job__company=user.company_profile)
+        company_id = user_company_id(self.request.user)
+        if company_id is not None:
+            return JobApplication.objects.filter(job__company_id=company_id)
         return JobApplication.objects.none() 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional(lambda request: [f'applicant:{request.user.pk}', f'user:{request.user.pk}', 'jobs'])
 def my_applications(request):
     """List all job applications for the authenticated job seeker"""
-    applications = JobApplication.objects.filter(applicant=request.user).select_related('job', 'job__company').order_by('-applied_at')
-    serializer = JobApplicationSerializer(applications, many=True)
-    return Response(serializer.data) 
+    applications = JobApplication.objects.filter(applicant=request.user).order_by('-applied_at')
+    return Response(application_records(applications))
+
+def _application_messages_versions(request, application_id):
+    # Long polls wait for new data rather than answering 304 straight away
+    if 'wait' in request.query_params:
+        return None
+    # Only participants get validators; anyone else falls through to the view's 403/404
+    other_user_id = (
+        MessageThread.objects.filter(application_id=application_id, participant=request.user)
+        .values_list('other_user_id', flat=True).first()
+    )
+    if other_user_id is None:
+        return None
+    # Senders' details are embedded
+    return [f'messages:{application_id}', f'user:{request.user.pk}', f'user:{other_user_id}']
+
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional(_application_messages_versions)
 def application_messages(request, application_id):
     """List or send messages for a job application (company or applicant only)"""
-    application = get_object_or_404(JobApplication, id=application_id)
+    application = get_object_or_404(JobApplication.objects.select_related('job'), id=application_id)
     user = request.user
     # Only allow applicant or company
-    if not (user == application.applicant or (hasattr(user, 'company_profile') and application.job.company == user.company_profile)):
+    if user.pk != application.applicant_id and application.job.company_id != user_company_id(user):
         return Response({'detail': 'Not authorized.'}, status=403)
     if request.method == 'GET':
-        messages = application.messages.select_related('sender').all()
-        serializer = MessageSerializer(messages, many=True)
-        return Response(serializer.data)
+        # ?after_id= returns only newer messages; adding ?wait=<seconds> long-polls for them
+        messages = application.messages.all()
+        try:
+            after_id = request.query_params.get('after_id')
+            after_id = int(after_id) if after_id is not None else None
+            wait = long_poll_seconds(request.query_params.get('wait', 0))
+        except ValueError:
+            return Response({'detail': 'after_id must be an integer and wait a number.'}, status=400)
+        if after_id is not None:
+            messages = messages.filter(id__gt=after_id).order_by('id')
+            if wait:
+                rows = wait_for_messages(messages.values_list(*MESSAGE_COLUMNS), application.id, wait)
+                return Response([message_record(row) for row in rows])
+        return Response(message_records(messages))
     elif request.method == 'POST':
         text = request.data.get('text', '').strip()
         if not text:
             return Response({'detail': 'Message text required.'}, status=400)
-        message = application.messages.create(sender=user, text=text)
+        # Thread summaries are updated by a post_save handler; commit both together
+        with transaction.atomic():
+            message = application.messages.create(sender=user, text=text)
         serializer = MessageSerializer(message)
         return Response(serializer.data, status=201) 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def message_threads(request):
-    """List all conversation threads for the current user (grouped by application and other user)"""
-    user = request.user
-    threads = []
-    company_profile = getattr(user, 'company_profile', None)
-    # Only include applications where user is applicant or company
-    if company_profile:
-        applications = JobApplication.objects.filter(Q(applicant=user) | Q(job__company=company_profile)).distinct()
-    else:
-        applications = JobApplication.objects.filter(applicant=user).distinct()
-    for app in applications:
-        # Determine the other user
-        if user == app.applicant:
-            other_user = app.job.company.user
-        else:
-            other_user = app.applicant
-        # Get last message
-        last_msg = app.messages.order_by('-timestamp').first()
-        # Count unread messages for this thread (not sent by current user)
-        unread_count = app.messages.filter(is_read=False).exclude(sender=user).count()
-        threads.append({
-            'application_id': app.id,
-            'job_title': app.job.title,
-            'other_user': {
-                'id': other_user.id,
-                'name': other_user.name,
-                'email': other_user.email,
-            },
-            'last_message': last_msg.text if last_msg else None,
-            'last_message_time': last_msg.timestamp if last_msg else None,
-            'unread_count': unread_count,
-        })
-    # Sort by last_message_time desc
-    threads.sort(
-        key=lambda t: t['last_message_time'] or timezone.make_aware(datetime.datetime.min, datetime.timezone.utc),
-        reverse=True
+    """List the current user's conversation threads, most recent activity first (cursor-paginated).
+
+    ``activity_at`` only moves forward, so a thread that gets a message while a client
+    pages moves above its cursor: later pages never repeat a thread but skip that one.
+    Clients re-read the first page on each message event to pick it up (Messages.jsx
+    merges pages by application_id).
+    """
+    threads = (
+        MessageThread.objects.filter(participant=request.user)
+        .select_related('application__job', 'other_user')
     )
-    return Response(threads) 
+    try:
+        page, next_cursor = keyset_page(threads, request.query_params, 'activity_at', default_page_size=50)
+    except InvalidCursor as exc:
+        return Response({'detail': str(exc)}, status=400)
+    return Response({'results': [thread_summary(thread) for thread in page], 'next_cursor': next_cursor})
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unread_message_count(request):
-    user = request.user
-    applications = JobApplication.objects.filter(Q(applicant=user) | Q(job__company=getattr(user, 'company_profile', None)))
-    count = 0
-    for app in applications:
-        count += app.messages.filter(is_read=False).exclude(sender=user).count()
-    return Response({'unread_count': count}) 
+    return Response({'unread_count': unread_count(request.user)})
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def mark_messages_read(request, application_id):
     user = request.user
-    application = get_object_or_404(JobApplication, id=application_id)
+    application = get_object_or_404(JobApplication.objects.select_related('job'), id=application_id)
     # Only allow applicant or company
-    if not (user == application.applicant or (hasattr(user, 'company_profile') and application.job.company == user.company_profile)):
+    if user.pk != application.applicant_id and application.job.company_id != user_company_id(user):
         return Response({'detail': 'Not authorized.'}, status=403)
     # Mark all messages not sent by user as read
-    application.messages.filter(is_read=False).exclude(sender=user).update(is_read=True)
+    mark_read(application, user)
     return Response({'status': 'success'}) 
\ No newline at end of file
@@ -2,6 +2,10 @@
 ASGI config for jobmatching project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Run it with an ASGI server (``uvicorn jobmatching.asgi:application``) to enable
+the ``/api/events/stream/`` push endpoint and to serve the polled message endpoints
+(api/async_views.py) without a thread per request; everything else works under
+WSGI too.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.0/howto/deployment/asgi/
@@ -5,6 +5,7 @@ Django settings for jobmatching project.
 from pathlib import Path
 from datetime import timedelta
 import os
+from decouple import config
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,6 +33,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api.instrumentation.SQLInstrumentationMiddleware',
+    'api.profiling.ProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -61,12 +64,58 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'jobmatching.wsgi.application'
+ASGI_APPLICATION = 'jobmatching.asgi.application'
 
 # Database
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        'NAME': config('DB_PATH', default=str(BASE_DIR / 'db.sqlite3')),
+    }
+}
+
+# DB_PROFILE=production tunes SQLite for concurrent traffic (applied per connection
+# by api.db.configure_sqlite): WAL lets reads proceed during a write, writers wait
+# busy_timeout ms for the lock instead of failing, and write transactions take the
+# lock at BEGIN so they never fail upgrading it midway.
+DB_PROFILE = config('DB_PROFILE', default='development')
+SQLITE_PRAGMAS = {}
+
+if DB_PROFILE == 'production':
+    DATABASES['default'].update({
+        'CONN_MAX_AGE': config('DB_CONN_MAX_AGE', default=600, cast=int),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {'transaction_mode': 'IMMEDIATE'},
+    })
+    SQLITE_PRAGMAS = {
+        'busy_timeout': config('DB_BUSY_TIMEOUT_MS', default=5000, cast=int),
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'mmap_size': config('DB_MMAP_SIZE', default=256 * 1024 * 1024, cast=int),
+        'cache_size': -config('DB_CACHE_SIZE_KB', default=64 * 1024, cast=int),  # negative = KiB
+        'temp_store': 'MEMORY',
+    }
+
+    # Optional read replica: a copy of the database kept current by the deployment.
+    # Reads go there through api.db.ReplicaRouter; writes stay on default.
+    DB_REPLICA_PATH = config('DB_REPLICA_PATH', default='')
+    if DB_REPLICA_PATH:
+        DATABASES['replica'] = {
+            **DATABASES['default'],
+            'NAME': DB_REPLICA_PATH,
+            'OPTIONS': {},
+            'TEST': {'MIRROR': 'default'},
+        }
+        DATABASE_ROUTERS = ['api.db.ReplicaRouter']
+
+# Cache (collection version stamps for conditional GET and the in-memory matching and
+# facet indexes, see api/versions.py). locmem is per process: multi-process deployments
+# need a shared backend.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'jobmatching',
+        'OPTIONS': {'MAX_ENTRIES': 10000},
     }
 }
 
@@ -99,8 +148,8 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
-# Media files
-MEDIA_URL = '/media/'
+# Media files, served with access control by api/media.py
+MEDIA_URL = '/api/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
 # Default primary key field type
@@ -109,11 +158,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
 }
 
 # JWT settings
@@ -149,4 +202,38 @@ CORS_ALLOWED_ORIGINS = [
     "http://127.0.0.1:5173",
 ]
 
-CORS_ALLOW_CREDENTIALS = True 
\ No newline at end of file
+CORS_ALLOW_CREDENTIALS = True
+
+# Push events (api/events.py): broker fanning events out to connected streams.
+# The in-process default needs a single ASGI worker; swap in a shared broker to scale out.
+EVENTS_BROKER = 'api.events.InProcessBroker'
+
+# Image derivatives (api/images.py): threads rendering resized logos and profile pictures.
+IMAGE_DERIVATIVE_WORKERS = 2
+
+# SQL instrumentation (api/instrumentation.py): Server-Timing headers with each
+# request's query count and SQL time, and the repeat count logged as a likely N+1.
+SQL_TIMING_HEADERS = DEBUG
+SQL_REPEAT_THRESHOLD = 5
+
+# Request profiling (api/profiling.py), off unless PROFILING_DIR is set. Requests with
+# a signed X-Profile header (manage.py profiling_token) are profiled with cProfile;
+# with PROFILING_SLOW_MS set, requests running longer than that are stack-sampled
+# (under ASGI: the thread running the request's sync code and its coroutine chain).
+PROFILING_DIR = config('PROFILING_DIR', default='')
+PROFILING_SLOW_MS = config('PROFILING_SLOW_MS', default=0, cast=int)
+PROFILING_SAMPLE_INTERVAL_MS = 5
+PROFILING_TOKEN_MAX_AGE = 3600
+PROFILING_MAX_FILES = 100
+PROFILING_MAX_BYTES = 100 * 1024 * 1024
+
+# JWT authentication (api/authentication.py): seconds a token's user, with their company
+# profile, stays cached. Saves bump the user's version stamp, which retires the entry in
+# every process sharing the cache (see CACHES).
+AUTH_USER_CACHE_SECONDS = 60
+
+# Media downloads (api/media.py): empty to stream files from Django, or 'x-accel-redirect'
+# (nginx: an internal location at MEDIA_ACCEL_PREFIX aliased to MEDIA_ROOT) / 'x-sendfile'
+# (Apache, lighttpd) to have the front proxy send the bytes once Django has authorized them.
+MEDIA_ACCEL = config('MEDIA_ACCEL', default='')
+MEDIA_ACCEL_PREFIX = '/protected-media/'
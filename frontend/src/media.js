@@ -0,0 +1,14 @@
+// URL of an uploaded image, preferring the backend's resized WebP derivative
+// (`logo_derivatives` / `profile_picture_derivatives`: small 128px, medium 256px, large 512px).
+// Falls back to the original upload until the derivatives have been rendered.
+export function imageUrl(original, derivatives, size = "small") {
+  const path = derivatives?.[size]?.webp || original;
+  return path ? `http://127.0.0.1:8000${path}` : null;
+}
+
+// Download URL of a resume. Resumes are private, so the link carries the access token:
+// a link opened in a new tab cannot send the Authorization header.
+export function resumeUrl(path) {
+  const token = localStorage.getItem("token");
+  return path ? `http://127.0.0.1:8000${path}?token=${encodeURIComponent(token || "")}` : null;
+}
@@ -7,6 +7,7 @@ import DialogActions from '@mui/material/DialogActions';
 import Button from '@mui/material/Button';
 import TextField from '@mui/material/TextField';
 import { useNavigate } from 'react-router-dom';
+import { imageUrl, resumeUrl } from "../media";
 
 const labelClass = "font-semibold text-gray-700 mr-2";
 const valueClass = "text-gray-800";
@@ -115,15 +116,12 @@ const Applicants = () => {
     setMessageError("");
     try {
       const token = localStorage.getItem("token");
-      await axios.post(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, { text: newMessage }, {
+      const res = await axios.post(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, { text: newMessage }, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setNewMessage("");
-      // Refresh messages
-      const res = await axios.get(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      setMessages(res.data);
+      // The created message is returned; no need to re-download the thread
+      setMessages((prev) => [...prev, res.data]);
     } catch (err) {
       setMessageError("Failed to send message");
     } finally {
@@ -148,8 +146,8 @@ const Applicants = () => {
 
   const renderApplicantDetails = (app) => {
     const a = app.applicant;
-    const profilePic = a.profile_picture ? `http://127.0.0.1:8000${a.profile_picture}` : null;
-    const resumeUrl = a.resume ? `http://127.0.0.1:8000${a.resume}` : null;
+    const profilePic = imageUrl(a.profile_picture, a.profile_picture_derivatives);
+    const resumeLink = resumeUrl(a.resume);
     return (
       <div className="flex flex-col md:flex-row gap-6 items-start md:items-center">
         <div className="flex-shrink-0">
@@ -192,7 +190,7 @@ const Applicants = () => {
             <div className="mt-2 flex flex-col gap-1">
               {a.linkedin && <a href={a.linkedin} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline font-semibold">LinkedIn</a>}
               {a.portfolio && <a href={a.portfolio} target="_blank" rel="noopener noreferrer" className="text-blue-600 hover:underline font-semibold">Portfolio</a>}
-              {resumeUrl && <a href={resumeUrl} target="_blank" rel="noopener noreferrer" className="text-green-700 hover:underline font-semibold">Download Resume</a>}
+              {resumeLink && <a href={resumeLink} target="_blank" rel="noopener noreferrer" className="text-green-700 hover:underline font-semibold">Download Resume</a>}
             </div>
           </div>
         </div>
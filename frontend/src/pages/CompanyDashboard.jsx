@@ -1,6 +1,8 @@
 import React, { useEffect, useState } from "react";
 import { useNavigate } from "react-router-dom";
 import axios from "axios";
+import { subscribeEvents } from "../realtime";
+import { imageUrl } from "../media";
 import Dialog from '@mui/material/Dialog';
 import DialogTitle from '@mui/material/DialogTitle';
 import DialogContent from '@mui/material/DialogContent';
@@ -34,6 +36,8 @@ const CompanyDashboard = () => {
   });
   const [jobError, setJobError] = useState("");
   const [jobs, setJobs] = useState([]);
+  const [nextJobsCursor, setNextJobsCursor] = useState(null);
+  const [loadingMoreJobs, setLoadingMoreJobs] = useState(false);
   const [requirementInput, setRequirementInput] = useState("");
   const [benefitInput, setBenefitInput] = useState("");
   const [showEditModal, setShowEditModal] = useState(false);
@@ -69,14 +73,41 @@ const CompanyDashboard = () => {
       });
   }, [navigate, token]);
 
+  // One page of the company's jobs, newest first; pass next_cursor for the page after it
+  const fetchJobsPage = (cursor) =>
+    axios.get('http://127.0.0.1:8000/api/jobs/', {
+      params: { company_id: companyData.id, page_size: 100, cursor },
+      headers: { Authorization: `Bearer ${token}` },
+    });
+
+  const reloadJobs = async () => {
+    try {
+      const res = await fetchJobsPage();
+      setJobs(res.data.results);
+      setNextJobsCursor(res.data.next_cursor);
+    } catch {
+      setJobs([]);
+      setNextJobsCursor(null);
+    }
+  };
+
+  const loadMoreJobs = async () => {
+    if (!nextJobsCursor || loadingMoreJobs) return;
+    setLoadingMoreJobs(true);
+    try {
+      const res = await fetchJobsPage(nextJobsCursor);
+      setJobs((prev) => [...prev, ...res.data.results]);
+      setNextJobsCursor(res.data.next_cursor);
+    } catch {
+      // Keep the cursor so the button can retry
+    } finally {
+      setLoadingMoreJobs(false);
+    }
+  };
+
   useEffect(() => {
     if (companyData && token) {
-      axios
-        .get(`http://127.0.0.1:8000/api/jobs/?company_id=${companyData.id}`, {
-          headers: { Authorization: `Bearer ${token}` },
-        })
-        .then((res) => setJobs(res.data.filter(j => j.company === companyData.id)))
-        .catch(() => setJobs([]));
+      reloadJobs();
     }
   }, [companyData, token]);
 
@@ -106,8 +137,7 @@ const CompanyDashboard = () => {
       } catch {}
     };
     fetchUnread();
-    const interval = setInterval(fetchUnread, 10000); // Poll every 10s
-    return () => clearInterval(interval);
+    return subscribeEvents({ unread: (data) => setUnreadCount(data.unread_count) }, fetchUnread);
   }, []);
 
   const handleLogout = () => {
@@ -191,10 +221,7 @@ const CompanyDashboard = () => {
       setBenefitInput("");
       // Refresh jobs
       if (companyData) {
-        const res = await axios.get(`http://127.0.0.1:8000/api/jobs/?company_id=${companyData.id}`, {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        setJobs(res.data.filter(j => j.company === companyData.id));
+        await reloadJobs();
       }
     } catch (err) {
       setJobError(err.response?.data?.detail || "Failed to post job");
@@ -262,7 +289,7 @@ const CompanyDashboard = () => {
                 <div className="flex items-center gap-6">
                   {companyData.logo ? (
                     <img
-                      src={`http://127.0.0.1:8000${companyData.logo}`}
+                      src={imageUrl(companyData.logo, companyData.logo_derivatives, 'medium')}
                       alt="Company Logo"
                       className="w-24 h-24 rounded-full object-cover border-2 border-blue-500"
                     />
@@ -313,6 +340,15 @@ const CompanyDashboard = () => {
                         <p className="text-gray-500 text-sm">Posted: {new Date(job.posted_at).toLocaleDateString()}</p>
                       </div>
                     ))}
+                    {nextJobsCursor && (
+                      <button
+                        className="w-full py-2 text-blue-600 hover:text-blue-800 font-semibold disabled:text-gray-400"
+                        onClick={loadMoreJobs}
+                        disabled={loadingMoreJobs}
+                      >
+                        {loadingMoreJobs ? 'Loading...' : 'Load more jobs'}
+                      </button>
+                    )}
                   </div>
                 ) : (
                   <p className="text-gray-500">No job listings available</p>
@@ -1,5 +1,7 @@
 import React, { useEffect, useState } from 'react';
 import axios from 'axios';
+import { subscribeEvents } from '../realtime';
+import { imageUrl } from '../media';
 import { useNavigate } from 'react-router-dom';
 import Dialog from '@mui/material/Dialog';
 import DialogTitle from '@mui/material/DialogTitle';
@@ -48,6 +50,7 @@ const JobSeekerDashboard = () => {
   const navigate = useNavigate();
   const [showJobsModal, setShowJobsModal] = useState(false);
   const [jobs, setJobs] = useState([]);
+  const [nextJobsCursor, setNextJobsCursor] = useState(null);
   const [loadingJobs, setLoadingJobs] = useState(false);
   const [jobsError, setJobsError] = useState("");
   const [currentJobIndex, setCurrentJobIndex] = useState(0);
@@ -136,8 +139,7 @@ const JobSeekerDashboard = () => {
       } catch {}
     };
     fetchUnread();
-    const interval = setInterval(fetchUnread, 10000); // Poll every 10s
-    return () => clearInterval(interval);
+    return subscribeEvents({ unread: (data) => setUnreadCount(data.unread_count) }, fetchUnread);
   }, []);
 
   const handleLogout = () => {
@@ -152,7 +154,8 @@ const JobSeekerDashboard = () => {
     setCurrentJobIndex(0);
     try {
       const res = await axios.get('http://127.0.0.1:8000/api/jobs/');
-      setJobs(res.data);
+      setJobs(res.data.results);
+      setNextJobsCursor(res.data.next_cursor);
     } catch (err) {
       setJobsError('Failed to load jobs');
     } finally {
@@ -160,6 +163,20 @@ const JobSeekerDashboard = () => {
     }
   };
 
+  // Fetch the next page of the deck before the user reaches the last card
+  const loadMoreJobs = async () => {
+    if (!nextJobsCursor) return;
+    const cursor = nextJobsCursor;
+    setNextJobsCursor(null);
+    try {
+      const res = await axios.get('http://127.0.0.1:8000/api/jobs/', { params: { cursor } });
+      setJobs((prev) => [...prev, ...res.data.results]);
+      setNextJobsCursor(res.data.next_cursor);
+    } catch {
+      setNextJobsCursor(cursor);
+    }
+  };
+
   const handleNextJob = () => {
     setCurrentJobIndex((prev) => (prev + 1 < jobs.length ? prev + 1 : 0));
     setSwipedCount((prev) => (prev + 1 < jobs.length ? prev + 1 : 0));
@@ -251,7 +268,11 @@ const JobSeekerDashboard = () => {
     if (showJobsModal) {
       setSwipedCount(0);
     }
-  }, [showJobsModal, jobs]);
+  }, [showJobsModal]);
+
+  useEffect(() => {
+    if (showJobsModal && jobs.length - swipedCount <= 3) loadMoreJobs();
+  }, [showJobsModal, jobs, swipedCount]);
 
   const handleSwipe = (direction, index) => {
     setSwipedCount((prev) => prev + 1);
@@ -295,7 +316,7 @@ const JobSeekerDashboard = () => {
                 <div className="flex flex-col sm:flex-row items-center gap-4 sm:gap-6">
                   {userData.profile_picture ? (
                     <img
-                      src={`http://127.0.0.1:8000${userData.profile_picture}`}
+                      src={imageUrl(userData.profile_picture, userData.profile_picture_derivatives, 'medium')}
                       alt="Profile"
                       className="w-24 h-24 rounded-full object-cover border-2 border-green-500"
                     />
@@ -403,7 +424,7 @@ const JobSeekerDashboard = () => {
                       <div className="w-full flex flex-col items-center p-6">
                         <div className="flex items-center gap-4 mb-4">
                           {jobs[swipedCount].company_info?.logo ? (
-                            <Avatar src={`http://127.0.0.1:8000${jobs[swipedCount].company_info.logo}`} sx={{ width: 56, height: 56 }} />
+                            <Avatar src={imageUrl(jobs[swipedCount].company_info.logo, jobs[swipedCount].company_info.logo_derivatives)} sx={{ width: 56, height: 56 }} />
                           ) : (
                             <Avatar sx={{ bgcolor: '#1976d2', width: 56, height: 56, fontSize: 28 }}>{jobs[swipedCount].company_info?.company_name?.split(' ').map(w => w[0]).join('').slice(0,2).toUpperCase() || 'C'}</Avatar>
                           )}
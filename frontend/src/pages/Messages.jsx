@@ -1,5 +1,6 @@
 import React, { useEffect, useState } from "react";
 import axios from "axios";
+import { subscribeEvents } from "../realtime";
 import { useNavigate, useLocation } from "react-router-dom";
 import { Box, List, ListItem, ListItemText, ListItemAvatar, Avatar, Badge, Divider, Typography, IconButton, TextField, Button, CircularProgress } from '@mui/material';
 import MessageIcon from '@mui/icons-material/Message';
@@ -11,6 +12,8 @@ const Messages = () => {
   const [selectedThread, setSelectedThread] = useState(null);
   const [messages, setMessages] = useState([]);
   const [loadingThreads, setLoadingThreads] = useState(true);
+  const [nextThreadsCursor, setNextThreadsCursor] = useState(null);
+  const [loadingMoreThreads, setLoadingMoreThreads] = useState(false);
   const [loadingMessages, setLoadingMessages] = useState(false);
   const [newMessage, setNewMessage] = useState("");
   const [messageError, setMessageError] = useState("");
@@ -20,24 +23,49 @@ const Messages = () => {
   const isMobile = useMediaQuery('(max-width: 600px)');
   const [showSidebar, setShowSidebar] = useState(true);
 
-  // Fetch threads
+  const fetchThreadsPage = (cursor) => {
+    const token = localStorage.getItem("token");
+    return axios.get("http://127.0.0.1:8000/api/messages/threads/", {
+      params: { cursor },
+      headers: { Authorization: `Bearer ${token}` },
+    });
+  };
+
+  // Fetch threads. Pages are ordered by latest activity, so a thread that gets a message
+  // moves to the top, above the cursor of the older pages: re-reading the first page on
+  // every message picks it up, and merging by application_id keeps it from showing twice.
   useEffect(() => {
+    let loaded = false;
     const fetchThreads = async () => {
-      setLoadingThreads(true);
+      if (!loaded) setLoadingThreads(true);
       try {
-        const token = localStorage.getItem("token");
-        const res = await axios.get("http://127.0.0.1:8000/api/messages/threads/", {
-          headers: { Authorization: `Bearer ${token}` },
-        });
-        setThreads(res.data);
+        const res = await fetchThreadsPage();
+        const first = res.data.results;
+        const ids = new Set(first.map(t => t.application_id));
+        if (!loaded) setNextThreadsCursor(res.data.next_cursor);
+        setThreads(prev => [...first, ...prev.filter(t => !ids.has(t.application_id))]);
+        loaded = true;
       } catch {}
       setLoadingThreads(false);
     };
     fetchThreads();
-    const interval = setInterval(fetchThreads, 10000);
-    return () => clearInterval(interval);
+    return subscribeEvents({ message: fetchThreads }, fetchThreads);
   }, []);
 
+  const loadMoreThreads = async () => {
+    if (!nextThreadsCursor || loadingMoreThreads) return;
+    setLoadingMoreThreads(true);
+    try {
+      const res = await fetchThreadsPage(nextThreadsCursor);
+      setThreads(prev => {
+        const ids = new Set(prev.map(t => t.application_id));
+        return [...prev, ...res.data.results.filter(t => !ids.has(t.application_id))];
+      });
+      setNextThreadsCursor(res.data.next_cursor);
+    } catch {}
+    setLoadingMoreThreads(false);
+  };
+
   // Auto-select thread if applicationId is passed in location.state
   useEffect(() => {
     if (location.state && location.state.applicationId && threads.length > 0) {
@@ -59,22 +87,32 @@ const Messages = () => {
       } catch {}
     };
     fetchUnread();
-    const interval = setInterval(fetchUnread, 10000);
-    return () => clearInterval(interval);
+    return subscribeEvents({ unread: (data) => setUnreadCount(data.unread_count) }, fetchUnread);
   }, []);
 
-  // Fetch messages for selected thread
+  // Fetch messages for selected thread: full history once, then only newer ones
   useEffect(() => {
     if (!selectedThread) return;
+    let lastId = null;
     const fetchMessages = async () => {
-      setLoadingMessages(true);
+      if (lastId === null) setLoadingMessages(true);
       setMessageError("");
       try {
         const token = localStorage.getItem("token");
         const res = await axios.get(`http://127.0.0.1:8000/api/applications/${selectedThread.application_id}/messages/`, {
           headers: { Authorization: `Bearer ${token}` },
+          params: lastId === null ? {} : { after_id: lastId },
         });
-        setMessages(res.data);
+        if (lastId === null) {
+          setMessages(res.data);
+        } else if (res.data.length) {
+          setMessages((prev) => {
+            const seen = new Set(prev.map((m) => m.id));
+            return [...prev, ...res.data.filter((m) => !seen.has(m.id))];
+          });
+        }
+        if (res.data.length) lastId = res.data[res.data.length - 1].id;
+        else if (lastId === null) lastId = 0;
         // Mark as read
         await axios.post(`http://127.0.0.1:8000/api/applications/${selectedThread.application_id}/mark-read/`, {}, {
           headers: { Authorization: `Bearer ${token}` },
@@ -85,8 +123,11 @@ const Messages = () => {
       setLoadingMessages(false);
     };
     fetchMessages();
-    const interval = setInterval(fetchMessages, 10000);
-    return () => clearInterval(interval);
+    return subscribeEvents({
+      message: (msg) => {
+        if (msg.application === selectedThread.application_id) fetchMessages();
+      },
+    }, fetchMessages);
   }, [selectedThread]);
 
   const handleSendMessage = async () => {
@@ -94,15 +135,11 @@ const Messages = () => {
     setMessageError("");
     try {
       const token = localStorage.getItem("token");
-      await axios.post(`http://127.0.0.1:8000/api/applications/${selectedThread.application_id}/messages/`, { text: newMessage }, {
+      const res = await axios.post(`http://127.0.0.1:8000/api/applications/${selectedThread.application_id}/messages/`, { text: newMessage }, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setNewMessage("");
-      // Refresh messages
-      const res = await axios.get(`http://127.0.0.1:8000/api/applications/${selectedThread.application_id}/messages/`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      setMessages(res.data);
+      setMessages((prev) => (prev.some((m) => m.id === res.data.id) ? prev : [...prev, res.data]));
     } catch {
       setMessageError("Failed to send message");
     }
@@ -154,6 +191,13 @@ const Messages = () => {
                   <Divider component="li" />
                 </React.Fragment>
               ))}
+              {nextThreadsCursor && (
+                <ListItem sx={{ justifyContent: 'center' }}>
+                  <Button onClick={loadMoreThreads} disabled={loadingMoreThreads}>
+                    {loadingMoreThreads ? 'Loading...' : 'Load more conversations'}
+                  </Button>
+                </ListItem>
+              )}
             </List>
           )}
         </Box>
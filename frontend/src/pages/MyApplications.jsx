@@ -55,15 +55,12 @@ const MyApplications = () => {
     setMessageError("");
     try {
       const token = localStorage.getItem("token");
-      await axios.post(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, { text: newMessage }, {
+      const res = await axios.post(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, { text: newMessage }, {
         headers: { Authorization: `Bearer ${token}` },
       });
       setNewMessage("");
-      // Refresh messages
-      const res = await axios.get(`http://127.0.0.1:8000/api/applications/${selectedApp.id}/messages/`, {
-        headers: { Authorization: `Bearer ${token}` },
-      });
-      setMessages(res.data);
+      // The created message is returned; no need to re-download the thread
+      setMessages((prev) => [...prev, res.data]);
     } catch (err) {
       setMessageError("Failed to send message");
     } finally {
@@ -0,0 +1,36 @@
+// Subscribe to events pushed by the backend (/api/events/stream/, served under ASGI).
+// While the stream is unavailable (e.g. a WSGI dev server) `poll` runs every 10s instead.
+// Returns an unsubscribe function suitable as a useEffect cleanup.
+export function subscribeEvents(handlers, poll) {
+  const token = localStorage.getItem("token");
+  let interval = null;
+  const startPolling = () => {
+    if (poll && !interval) {
+      poll();
+      interval = setInterval(poll, 10000);
+    }
+  };
+  const stopPolling = () => {
+    if (interval) {
+      clearInterval(interval);
+      interval = null;
+    }
+  };
+
+  if (!token || typeof EventSource === "undefined") {
+    startPolling();
+    return stopPolling;
+  }
+  const source = new EventSource(
+    `http://127.0.0.1:8000/api/events/stream/?token=${encodeURIComponent(token)}`
+  );
+  source.onopen = stopPolling;
+  source.onerror = startPolling;
+  Object.entries(handlers).forEach(([type, handler]) => {
+    source.addEventListener(type, (e) => handler(JSON.parse(e.data)));
+  });
+  return () => {
+    source.close();
+    stopPolling();
+  };
+}